@@ -0,0 +1,81 @@
+"""
+Benchmark of the construction of scenes with many objects (e.g., markers).
+
+Usage::
+
+    python benchmarks/scene_construction.py [--objects N] [--repeat R]
+
+The spatial factories (e.g., :func:`libcarna.geometry`) are compared with the creation of a new subclass for each
+object, as it was done by the factories previously, and with the bulk creation of all objects by
+:func:`libcarna.geometries`.
+"""
+import argparse
+import timeit
+
+import numpy as np
+
+import libcarna
+
+
+GEOMETRY_TYPE_OPAQUE = 2
+
+
+def _legacy_geometry(geometry_type: int, parent: libcarna.base.Node, **kwargs) -> libcarna.base.Geometry:
+    """
+    Create a geometry by creating a new subclass for each object (the previous behavior of the factories).
+    """
+    class Geometry(libcarna.base.Geometry, libcarna._spatial._spatial_mixin):
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+
+    geometry = Geometry(geometry_type)
+    libcarna._spatial._setup_spatial(geometry, parent, **kwargs)
+    return geometry
+
+
+def build_scene(factory, positions: np.ndarray, mesh, material) -> libcarna.base.Node:
+    root = libcarna.node()
+    for position in positions:
+        geometry = factory(
+            GEOMETRY_TYPE_OPAQUE,
+            parent=root,
+            local_transform=libcarna.base.math.translation(*position),
+        )
+        geometry.put_feature(libcarna.mesh_renderer.DEFAULT_ROLE_MESH, mesh)
+        geometry.put_feature(libcarna.mesh_renderer.DEFAULT_ROLE_MATERIAL, material)
+    return root
+
+
+def build_scene_bulk(positions: np.ndarray, mesh, material) -> libcarna.base.Node:
+    root = libcarna.node()
+    transforms = np.tile(np.eye(4, dtype=np.float32), (len(positions), 1, 1))
+    transforms[:, :3, 3] = positions
+    libcarna.geometries(GEOMETRY_TYPE_OPAQUE, transforms, parent=root, mesh=mesh, material=material)
+    return root
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--objects', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    positions = np.random.default_rng(0).uniform(-100, 100, size=(args.objects, 3))
+    mesh = libcarna.meshes.create_box(1, 1, 1)
+    material = libcarna.material('solid', color=libcarna.color.RED)
+
+    builders = {
+        'per-object subclass': lambda: build_scene(_legacy_geometry, positions, mesh, material),
+        'libcarna.geometry': lambda: build_scene(libcarna.geometry, positions, mesh, material),
+        'libcarna.geometries': lambda: build_scene_bulk(positions, mesh, material),
+    }
+    results = dict()
+    for name, builder in builders.items():
+        results[name] = min(timeit.Timer(builder).repeat(repeat=args.repeat, number=1))
+        speedup = results['per-object subclass'] / results[name]
+        print(f'{name:>20}: {results[name] * 1000:8.1f} ms for {args.objects} objects ({speedup:.2f}x)')
+
+
+if __name__ == '__main__':
+    main()
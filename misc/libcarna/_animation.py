@@ -8,6 +8,8 @@ import numpy as np
 import libcarna
 from ._alias import kwalias
 from ._axes import AxisHint, resolve_axis_hint
+from ._frame_cache import frame_cache
+from ._trace import span
 
 
 
@@ -22,15 +24,81 @@ class animate:
         n_frames: Number of frames to be rendered.
     """
 
+    reused_frames: int
+    """
+    Number of frames that were reused during the most recent rendering (see :meth:`render`).
+    """
+
     def __init__(self, *step_functions: list[Callable[[float], None]], n_frames: int = 25):
         self.step_functions = step_functions
         self.n_frames = n_frames
+        self.reused_frames = 0
+
+    def frame_times(self) -> np.ndarray:
+        """
+        Get the values of `t` that are passed to the step functions, one for each frame of the animation.
+        """
+        return np.linspace(1, 0, num=self.n_frames, endpoint=False)[::-1]
+
+    def prepare(self) -> np.ndarray:
+        """
+        Let the step functions precompute their values for all frames at once (e.g., :class:`keyframes`).
+
+        Returns:
+            The values of `t` of the frames (see :meth:`frame_times`).
+        """
+        frame_times = self.frame_times()
+        for step in self.step_functions:
+            if hasattr(step, 'prepare'):
+                step.prepare(frame_times)
+        return frame_times
+
+    def render(
+            self,
+            r: 'libcarna.renderer',
+            *args,
+            reuse_frames: bool | frame_cache = False,
+            **kwargs,
+        ) -> Iterable[np.ndarray]:
+        """
+        Render the frames of the animation.
+
+        Arguments:
+            r: The renderer to be used.
+            *args: Positional arguments passed to :meth:`renderer.render` (e.g., the camera and the root node).
+            reuse_frames: If `True`, frames are only rendered if the scene differs from the previously rendered frames
+                (e.g., not for frames of a hold segment, or repeated frames of a periodic motion). Otherwise, a copy of
+                the previously rendered frame is yielded. The previously rendered frames are kept in a
+                :class:`frame_cache` (with its default memory budget), or in the given :class:`frame_cache`, so that
+                the memory used is bounded. The number of reused frames is available as :attr:`reused_frames` after
+                rendering.
+            **kwargs: Keyword arguments passed to :meth:`renderer.render`.
+        """
+        self.reused_frames = 0
+        if reuse_frames is True:
+            reuse_frames = frame_cache()
+        elif reuse_frames is False:
+            reuse_frames = None
+        for frame_idx, t in enumerate(self.prepare()):
+            with span('animate.step', frame=frame_idx):
+                for step in self.step_functions:
+                    step(t)
+
+            # Reuse the frame, if the scene is the same as for a previously rendered frame
+            frame_key = None
+            if reuse_frames is not None:
+                with span('animate.reuse', frame=frame_idx):
+                    frame_key = r.frame_key(*args, **kwargs)
+                    frame = None if frame_key is None else reuse_frames.get(frame_key)
+                if frame is not None:
+                    self.reused_frames += 1
+                    yield frame
+                    continue
 
-    def render(self, r: 'libcarna.renderer', *args, **kwargs) -> Iterable[np.ndarray]:
-        for t in np.linspace(1, 0, num=self.n_frames, endpoint=False)[::-1]:
-            for step in self.step_functions:
-                step(t)
-            yield r.render(*args, **kwargs)
+            frame = r.render(*args, **kwargs)
+            if frame_key is not None:
+                reuse_frames.put(frame_key, frame)
+            yield frame
 
     @staticmethod
     def rotate_local(spatial: libcarna.base.Spatial, axis: AxisHint = 'y') -> Callable[[float], None]:
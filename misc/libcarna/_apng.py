@@ -0,0 +1,255 @@
+import os
+import struct
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from fractions import Fraction
+from typing import BinaryIO
+
+import numpy as np
+
+
+_PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# PNG color types by the number of channels
+_COLOR_TYPES = {1: 0, 2: 4, 3: 2, 4: 6}
+_COLOR_TYPE_PALETTE = 3
+
+
+def _chunk(chunk_type: bytes, data: bytes) -> bytes:
+    return struct.pack('>I', len(data)) + chunk_type + data + struct.pack('>I', zlib.crc32(chunk_type + data))
+
+
+def _filter_up(image: np.ndarray) -> bytes:
+    """
+    Apply the PNG "Up" filter to all rows of an `(H, W, C)` image at once, and prepend the filter type to each row.
+    """
+    rows = image.reshape(image.shape[0], -1)
+    filtered = np.empty((rows.shape[0], rows.shape[1] + 1), np.uint8)
+    filtered[:, 0] = 2  # filter type "Up"
+    filtered[:, 1:] = rows
+    filtered[1:, 1:] -= rows[:-1]  # wraps around, as required by the PNG specification
+    return filtered.tobytes()
+
+
+def _filter_none(rows: np.ndarray) -> bytes:
+    """
+    Prepend the filter type "None" to each row of an `(H, N)` array of bytes (recommended for palette images).
+    """
+    filtered = np.zeros((rows.shape[0], rows.shape[1] + 1), np.uint8)
+    filtered[:, 1:] = rows
+    return filtered.tobytes()
+
+
+def _pack_indices(indices: np.ndarray, bit_depth: int) -> np.ndarray:
+    """
+    Pack the rows of an `(H, W)` array of palette indices into bytes, using `bit_depth` bits per index.
+    """
+    if bit_depth == 8:
+        return indices
+    indices_per_byte = 8 // bit_depth
+    indices = np.pad(indices, ((0, 0), (0, -indices.shape[1] % indices_per_byte)))
+    indices = indices.reshape(indices.shape[0], -1, indices_per_byte).astype(np.uint16)
+    shifts = (8 - bit_depth) - bit_depth * np.arange(indices_per_byte, dtype=np.uint16)
+    return np.bitwise_or.reduce(indices << shifts, axis=2).astype(np.uint8)
+
+
+def _color_keys(frame: np.ndarray) -> np.ndarray:
+    """
+    Pack the colors of an `(H, W, 3)` or `(H, W, 4)` frame into an `(H, W)` array of integers.
+    """
+    keys = frame[:, :, 0].astype(np.uint32) << 16 | frame[:, :, 1].astype(np.uint32) << 8 | frame[:, :, 2]
+    if frame.shape[2] == 4:
+        keys |= frame[:, :, 3].astype(np.uint32) << 24
+    return keys
+
+
+def _compress(data: np.ndarray, palette: dict[int, int] | None, bit_depth: int, compress_level: int) -> bytes:
+    """
+    Filter and compress the image data of a frame.
+    """
+    if palette is None:
+        return zlib.compress(_filter_up(data), compress_level)
+    else:
+        keys, inverse = np.unique(_color_keys(data), return_inverse=True)
+        indices = np.array([palette[key] for key in keys.tolist()], np.uint8)[inverse].reshape(data.shape[:2])
+        return zlib.compress(_filter_none(_pack_indices(indices, bit_depth)), compress_level)
+
+
+class _apng_writer:
+    """
+    Write frames to an animated PNG incrementally, so that the frames do not need to be kept in memory.
+
+    To reduce the size of the file, each frame is cropped to the bounding box of the pixels that changed since the
+    previous frame. If the first `palette_frames` frames have at most 256 colors in total (e.g., single images or
+    short loops), the frames are written with a palette. The frames are compressed in parallel.
+
+    The number of frames is written to the header of the file. If it is neither known in advance, nor all frames fit
+    into the first `palette_frames` frames, the file must be seekable, so that the number can be written when the file
+    is closed.
+    """
+
+    def __init__(
+            self,
+            fp: BinaryIO,
+            fps: float = 25,
+            n_frames: int | None = None,
+            compress_level: int = 6,
+            palette_frames: int = 32,
+            workers: int | None = None,
+        ):
+        self.fp = fp
+        self.n_frames = n_frames
+        self.compress_level = compress_level
+        self.palette_frames = palette_frames
+        self.frame_count = 0
+        delay = Fraction(1) / Fraction(fps).limit_denominator(1000)
+        delay = delay.limit_denominator(0xFFFF)
+        self._delay = (delay.numerator, delay.denominator)
+        self._sequence_number = 0
+        self._shape = None
+        self._actl_offset = None
+        self._palette = None
+        self._bit_depth = 8
+        self._previous = None
+
+        # Frames are buffered, until it is decided whether a palette is used
+        self._buffer = list()
+        self._colors = set()
+        self._header_written = False
+
+        # Frames that are being compressed, in the order of the frames
+        self._workers = workers or min(4, os.cpu_count())
+        self._executor = ThreadPoolExecutor(self._workers)
+        self._pending = deque()
+
+    def _write_header(self, palette_colors: list[int] | None):
+        height, width, channels = self._shape
+        self.fp.write(_PNG_SIGNATURE)
+        if palette_colors is None:
+            color_type = _COLOR_TYPES[channels]
+        else:
+            color_type = _COLOR_TYPE_PALETTE
+            self._palette = {key: idx for idx, key in enumerate(palette_colors)}
+            self._bit_depth = next(bits for bits in (1, 2, 4, 8) if len(palette_colors) <= 2 ** bits)
+        self.fp.write(_chunk(
+            b'IHDR',
+            struct.pack('>IIBBBBB', width, height, self._bit_depth, color_type, 0, 0, 0),
+        ))
+        if palette_colors is not None:
+            colors = np.array(palette_colors, np.uint32)
+            rgb = np.stack([colors >> 16, colors >> 8, colors], axis=1).astype(np.uint8)
+            self.fp.write(_chunk(b'PLTE', rgb.tobytes()))
+            if channels == 4:
+                alpha = (colors >> 24).astype(np.uint8)
+                self.fp.write(_chunk(b'tRNS', alpha.tobytes()))
+        if self.n_frames is None and palette_colors is None:
+            assert self.fp.seekable(), 'The number of frames must be known in advance for unseekable files'
+            self._actl_offset = self.fp.tell()
+        n_frames = len(self._buffer) if palette_colors is not None else self.n_frames
+        self.fp.write(_chunk(b'acTL', struct.pack('>II', n_frames or 0, 0)))
+        self._header_written = True
+
+        # Encode the buffered frames
+        buffer, self._buffer = self._buffer, None
+        for frame in buffer:
+            self._encode(frame)
+
+    def _next_sequence_number(self) -> int:
+        sequence_number = self._sequence_number
+        self._sequence_number += 1
+        return sequence_number
+
+    def write(self, frame: np.ndarray):
+        """
+        Write a frame (an `(H, W)` or `(H, W, C)` array of unsigned 8-bit integers).
+        """
+        frame = np.asarray(frame)
+        if frame.ndim == 2:
+            frame = frame[:, :, None]
+        assert frame.dtype == np.uint8, f'Frames must be of type uint8, got {frame.dtype}'
+        if self._shape is None:
+            self._shape = frame.shape
+        assert frame.shape == self._shape, f'Frame shape {frame.shape} differs from the first frame {self._shape}'
+        self.frame_count += 1
+
+        # Buffer the frame, while the frames can still be written with a palette
+        if not self._header_written:
+            if frame.shape[2] >= 3 and len(self._buffer) < self.palette_frames:
+                self._colors.update(np.unique(_color_keys(frame)).tolist())
+                self._buffer.append(frame)
+                if len(self._colors) > 256:
+                    self._colors = None
+                    self._write_header(None)
+                return
+            self._buffer.append(frame)
+            self._write_header(None)
+            return
+        self._encode(frame)
+
+    def _encode(self, frame: np.ndarray):
+        """
+        Crop the frame to the pixels that changed since the previous frame, and queue it for compression.
+        """
+        if self._previous is None:
+            y0, y1, x0, x1 = 0, frame.shape[0], 0, frame.shape[1]
+        else:
+            changed = np.any(frame != self._previous, axis=2)
+            rows = np.flatnonzero(changed.any(axis=1))
+            if len(rows) == 0:
+                y0, y1, x0, x1 = 0, 1, 0, 1  # frames must not be empty
+            else:
+                cols = np.flatnonzero(changed.any(axis=0))
+                y0, y1, x0, x1 = rows[0], rows[-1] + 1, cols[0], cols[-1] + 1
+        self._previous = frame
+        region = frame[y0:y1, x0:x1]
+        future = self._executor.submit(_compress, region, self._palette, self._bit_depth, self.compress_level)
+        self._pending.append((x0, y0, x1 - x0, y1 - y0, future))
+
+        # Limit the number of frames, that are being compressed
+        while len(self._pending) > 2 * self._workers:
+            self._write_frame(*self._pending.popleft())
+
+    def _write_frame(self, x: int, y: int, width: int, height: int, future):
+        data = future.result()
+
+        # Write the frame control chunk (each frame replaces its region of the previous frame)
+        self.fp.write(_chunk(b'fcTL', struct.pack(
+            '>IIIIIHHBB',
+            self._next_sequence_number(),
+            width,
+            height,
+            x,
+            y,
+            *self._delay,
+            0,  # dispose operation: none
+            0,  # blend operation: source
+        )))
+
+        # Write the frame data (the first frame is the default image)
+        if self._sequence_number == 1:
+            self.fp.write(_chunk(b'IDAT', data))
+        else:
+            self.fp.write(_chunk(b'fdAT', struct.pack('>I', self._next_sequence_number()) + data))
+
+    def close(self):
+        """
+        Finish the animated PNG. The file itself is not closed.
+        """
+        try:
+            if self.frame_count == 0:
+                raise ValueError('No frames were written')
+            if not self._header_written:
+                self._write_header(sorted(self._colors))
+            while self._pending:
+                self._write_frame(*self._pending.popleft())
+        finally:
+            self._executor.shutdown()
+        self.fp.write(_chunk(b'IEND', b''))
+        if self._actl_offset is not None:
+            end = self.fp.tell()
+            self.fp.seek(self._actl_offset)
+            self.fp.write(_chunk(b'acTL', struct.pack('>II', self.frame_count, 0)))
+            self.fp.seek(end)
+        elif self.n_frames is not None and self.frame_count != self.n_frames:
+            raise ValueError(f'Expected {self.n_frames} frames, got {self.frame_count}')
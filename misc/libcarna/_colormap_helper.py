@@ -1,4 +1,5 @@
-from typing import Iterable
+import functools
+from typing import Literal
 
 import matplotlib as mpl
 import numpy as np
@@ -7,23 +8,163 @@ import libcarna
 from ._colorbar import colorbar
 
 
-def _sample_colormap(mpl_cmap: mpl.colors.Colormap, n_samples: int) -> list[libcarna.color]:
+def _ramp_weights(t: np.ndarray, ramp: tuple[float, float], rampdegree: int) -> np.ndarray:
     """
-    Sample a colormap from matplotlib and return the list of colors.
+    Evaluate the ramp function (see :meth:`colormap_helper.linear_spline`) at positions `t` between 0 and 1.
     """
-    return [libcarna.color(mpl_cmap(i)) for i in np.linspace(0, 1, n_samples)]
+    ramp_width = max(ramp) - min(ramp)
+    return np.clip((t - min(ramp)) / ramp_width, 0, 1) ** rampdegree
 
 
-def _mpl_colormaps() -> Iterable[str]:
+def _apply_ramp(
+        colors: list[libcarna.color],
+        ramp: tuple[float, float] | None,
+        rampdegree: int,
+    ) -> list[libcarna.color]:
     """
-    Get all non-discrete colormaps from matplotlib. Yield pairs of the name and the corresponding colormap.
+    Weight the alpha values of the colors by a ramp function (see :meth:`colormap_helper.linear_spline`).
     """
-    for cmap_name in mpl.colormaps():
+    if ramp is None:
+        return list(colors)
+    weights = _ramp_weights(np.linspace(0, 1, len(colors)), ramp, rampdegree)
+    return [
+        libcarna.color(color.r, color.g, color.b, round(color.a * weight))
+        for color, weight in zip(colors, weights)
+    ]
+
+
+@functools.lru_cache(maxsize=8)
+def _eligible_colormaps(cmap_names: tuple[str, ...]) -> tuple[str, ...]:
+    """
+    Get the names of all non-discrete colormaps, among the colormaps registered in matplotlib.
+    """
+    eligible_cmap_names = list()
+    for cmap_name in cmap_names:
         mpl_cmap = mpl.colormaps[cmap_name]
         if isinstance(mpl_cmap, mpl.colors.LinearSegmentedColormap) or (
             isinstance(mpl_cmap, mpl.colors.ListedColormap) and mpl_cmap.N >= 256
         ):
-            yield cmap_name, mpl_cmap
+            eligible_cmap_names.append(cmap_name)
+    return tuple(eligible_cmap_names)
+
+
+def _mpl_colormaps() -> tuple[str, ...]:
+    """
+    Get the names of all non-discrete colormaps from matplotlib. The colormaps are only inspected again, if the
+    registered colormaps have changed (e.g., if a custom colormap was registered).
+    """
+    return _eligible_colormaps(tuple(mpl.colormaps()))
+
+
+@functools.lru_cache(maxsize=256)
+def _sampled_colormap(
+        cmap_name: str,
+        n_samples: int,
+        ramp: tuple[float, float] | None,
+        rampdegree: int,
+    ) -> np.ndarray:
+    """
+    Sample a colormap from matplotlib and apply the ramp function. Returns a read-only `(N, 4)` array of colors, that
+    is cached by all arguments.
+    """
+    t = np.linspace(0, 1, n_samples)
+
+    # Convert the colors by `libcarna.color`, so that they are quantized exactly like colors passed to `linear_spline`
+    mpl_cmap = mpl.colormaps[cmap_name]
+    colors = [libcarna.color(mpl_cmap(ti)) for ti in t]
+    lut = np.array([(color.r, color.g, color.b, color.a) for color in colors], np.uint8)
+    if ramp is not None:
+        lut[:, 3] = np.round(lut[:, 3] * _ramp_weights(t, ramp, rampdegree))
+    lut.flags.writeable = False
+    return lut
+
+
+def _histogram_percentile(histogram: np.ndarray, q: float, start: int = 0) -> float:
+    """
+    Compute the `q`-th percentile of the normalized intensities from a histogram, only taking into account the bins
+    from `start` on.
+    """
+    cumsum = np.cumsum(histogram[start:])
+    if cumsum[-1] == 0:
+        return start / (len(histogram) - 1)
+    return (start + np.searchsorted(cumsum, cumsum[-1] * q / 100)) / (len(histogram) - 1)
+
+
+def _auto_transfer_function(
+        histogram: np.ndarray,
+        mode: Literal['tissue', 'percentile'],
+        percentiles: tuple[float, float],
+    ) -> tuple[tuple[float, float], tuple[float, float]]:
+    """
+    Place the color limits and the opacity ramp (relative to the color limits) based on a histogram of the normalized
+    intensities.
+    """
+    n_bins = len(histogram)
+    match mode:
+        case 'percentile':
+            cmin = _histogram_percentile(histogram, percentiles[0])
+            cmax = _histogram_percentile(histogram, percentiles[1])
+            start = int(round(cmin * (n_bins - 1)))
+            ramp_end = _histogram_percentile(histogram, 50, start)
+        case 'tissue':
+            # The largest peak of the smoothed histogram is the background, that is faded out until the first valley
+            kernel = np.exp(-np.linspace(-2, 2, 9) ** 2)
+            smoothed = np.convolve(histogram, kernel / kernel.sum(), mode='same')
+            start = int(np.argmax(smoothed))
+            while start + 1 < n_bins and smoothed[start + 1] < smoothed[start]:
+                start += 1
+            if start + 1 >= n_bins:
+                return _auto_transfer_function(histogram, 'percentile', percentiles)
+            cmin = start / (n_bins - 1)
+            cmax = _histogram_percentile(histogram, percentiles[1], start)
+
+            # The opacity is ramped up until the peak of the tissue
+            ramp_end = (start + np.argmax(smoothed[start:])) / (n_bins - 1)
+        case _:
+            raise ValueError(f'Unsupported mode: "{mode}"')
+    cmax = max(cmax, cmin + 1 / (n_bins - 1))
+    ramp_end = np.clip((ramp_end - cmin) / (cmax - cmin), 1 / (n_bins - 1), 1)
+    return (cmin, cmax), (0., float(ramp_end))
+
+
+def _resample(lut: np.ndarray, resolution: int) -> np.ndarray:
+    """
+    Resample an `(N, 4)` lookup table to `resolution` colors, by linear interpolation (like a linear spline).
+    """
+    if len(lut) == resolution:
+        return lut
+    t = np.linspace(0, 1, len(lut))
+    t_resampled = np.linspace(0, 1, resolution)
+    resampled = np.column_stack([np.interp(t_resampled, t, lut[:, channel]) for channel in range(4)])
+    return np.round(resampled).astype(np.uint8)
+
+
+def _preintegrate(lut: np.ndarray, width: float, resolution: int) -> np.ndarray:
+    """
+    Approximate a pre-integrated transfer function, by integrating each color of an `(N, 4)` lookup table over an
+    interval of intensities around it, that has the given `width` (relative to the whole lookup table). The opacities
+    are integrated as extinction coefficients, and the colors are weighted by the extinction.
+
+    The lookup table is resampled to `resolution` colors (the resolution of the color map) first, so that the result
+    does not depend on the number of colors of the lookup table.
+    """
+    lut = _resample(lut, resolution)
+    radius = int(round(width * (len(lut) - 1) / 2))
+    if radius <= 0:
+        return lut
+    rgba = lut.astype(np.float64) / 255
+    extinction = -np.log1p(-np.minimum(rgba[:, 3], 1 - 1e-6))
+    weighted = np.column_stack([rgba[:, :3] * extinction[:, None], extinction])
+
+    # Compute the box integrals using the cumulative sum
+    weighted = np.pad(weighted, ((radius + 1, radius), (0, 0)), mode='edge')
+    weighted[0] = 0
+    cumsum = np.cumsum(weighted, axis=0)
+    mean = (cumsum[2 * radius + 1:] - cumsum[:-2 * radius - 1]) / (2 * radius + 1)
+    mean_extinction = mean[:, 3:]
+    color = np.where(mean_extinction > 0, mean[:, :3] / np.maximum(mean_extinction, 1e-12), rgba[:, :3])
+    alpha = -np.expm1(-mean_extinction)
+    return np.round(np.clip(np.column_stack([color, alpha]), 0, 1) * 255).astype(np.uint8)
 
 
 class colormap_helper:
@@ -33,18 +174,20 @@ class colormap_helper:
             colormap: libcarna.base.ColorMap,
             cmap: str | libcarna.base.ColorMap | None = None,
             clim: tuple[float | None, float | None] | None = None,
+            preintegration: float = 0,
         ):
         self.colormap = colormap
-        self.cmap_choices = list()
+        self.cmap_choices = _mpl_colormaps()
+        self.cmap_name = None
+        self._preintegration = preintegration
+        self._colors = None  # the colors written to the color map, before the pre-integration
+        self._written = None  # the colors actually written to the color map
         cmap = cmap or 'viridis'
 
-        # Import colormaps
-        for cmap_name, _ in _mpl_colormaps():
-            self.cmap_choices.append(cmap_name)
-
         # Set the requested colormap
         if isinstance(cmap, libcarna.base.ColorMap):
             self.colormap.set(cmap)
+            self._update()
         elif isinstance(cmap, str) and cmap in self.cmap_choices:
             self(cmap)
         else:
@@ -54,20 +197,64 @@ class colormap_helper:
         if clim is not None:
             self.limits(*clim)
 
-    def __call__(self, cmap_name: str, n_samples: int = 50, **kwargs):
+    def __call__(
+            self,
+            cmap_name: str,
+            n_samples: int = 50,
+            ramp: tuple[float, float] | None = None,
+            rampdegree: int = 1,
+        ):
+        """
+        Write a matplotlib colormap to the color map (see :meth:`linear_spline` for `ramp` and `rampdegree`). The
+        sampled colors are cached, so that writing the same colormap repeatedly (e.g., for many stages) is cheap.
+        """
         if cmap_name in self.cmap_choices:
-            mpl_cmap = mpl.colormaps[cmap_name]
-            n_samples = n_samples or self.default_n_samples
-            colors = _sample_colormap(mpl_cmap, n_samples)
-            self.linear_spline(*colors, **kwargs)
+            ramp = None if ramp is None else tuple(ramp)
+            self._write(_sampled_colormap(cmap_name, n_samples, ramp, rampdegree))
+            self.cmap_name = cmap_name
         else:
             raise ValueError(f'Unknown color map: "{cmap_name}" (available: {", ".join(self.cmap_choices)})')
+
+    def auto(
+            self,
+            volume: libcarna.base.Node,
+            mode: Literal['tissue', 'percentile'] = 'tissue',
+            cmap: str | None = None,
+            percentiles: tuple[float, float] = (1, 99),
+            rampdegree: int = 1,
+        ) -> tuple[float, float]:
+        """
+        Set the color limits and an opacity ramp automatically, based on the histogram of the intensities of a volume
+        (see :func:`volume`). This only takes the histogram into account, so it is cheap enough to be used for each
+        volume that is displayed.
+
+        Arguments:
+            volume: The volume, as created by :func:`volume`.
+            mode: If `'tissue'`, the largest peak of the histogram is considered as the background (e.g., air), and the
+                color map starts at the first valley above it, with the opacity ramped up to the next peak. If
+                `'percentile'`, the color limits are placed at the `percentiles` of the intensities, with the opacity
+                ramped up to the median intensity within the limits.
+            cmap: The matplotlib colormap to use. If `None`, the most recently used colormap is used (or
+                `'viridis'`).
+            percentiles: The lower and upper percentiles of the intensities used for the color limits (only the upper
+                percentile is used in `'tissue'` mode).
+            rampdegree: The degree of the opacity ramp (see :meth:`linear_spline`).
+
+        Returns:
+            The color limits, in the raw intensities of the volume.
+        """
+        assert hasattr(volume, 'histogram'), 'The volume must be created by libcarna.volume'
+        clim, ramp = _auto_transfer_function(volume.histogram, mode, percentiles)
+        self(cmap or self.cmap_name or 'viridis', ramp=ramp, rampdegree=rampdegree)
+        self.limits(*clim)
+        return tuple(volume.raw(clim).tolist())
         
     def clear(self):
         """
         Clear the color map.
         """
         self.colormap.clear()
+        self._colors = self._written = None
         
     def linear_segment(
             self,
@@ -79,12 +266,14 @@ class colormap_helper:
         """
         Write a linear segment to the color map.
         """
+        self.colormap.write_lut(self._source())  # write the segment to the colors before the pre-integration
         self.colormap.write_linear_segment(
             intensity_first,
             intensity_last,
             color_first,
             color_last,
         )
+        self._write(self.colormap.to_array())
 
     def linear_spline(self, *colors, ramp: tuple[float, float] | None = None, rampdegree: int = 1):
         """
@@ -96,15 +285,51 @@ class colormap_helper:
                 with 0 at `ramp[0]` and ends with 1 at `ramp[1]`.
             rampdegree: The degree of the ramp function. 1 is linear, 2 is quadratic, etc.
         """
-        colors = list(colors)
-        if ramp is not None:
-            ramp_width = max(ramp) - min(ramp)
-            ramp_func = lambda t: np.clip((t - min(ramp)) / ramp_width, 0, 1) ** rampdegree
-            colors = [
-                libcarna.color(color.r, color.g, color.b, round(color.a * ramp_func(t)))
-                for color, t in zip(colors, np.linspace(0, 1, len(colors)))
-            ]
-        self.colormap.write_linear_spline(colors)
+        self.colormap.write_linear_spline(_apply_ramp(colors, ramp, rampdegree))
+        self._write(self.colormap.to_array())
+
+    @property
+    def preintegration(self) -> float:
+        """
+        Width of the interval of normalized intensities, over which the color map is integrated for each sample (see
+        :class:`dvr`). If 0, the color map is used as is.
+        """
+        return self._preintegration
+
+    @preintegration.setter
+    def preintegration(self, preintegration: float):
+        assert preintegration >= 0, f'preintegration must not be negative, got {preintegration}'
+        self._preintegration = preintegration
+        self._update()
+
+    def _source(self) -> np.ndarray:
+        """
+        Get the colors of the color map before the pre-integration. If the color map was written directly (i.e. not
+        through this helper), the colors of the color map are used.
+        """
+        colors = self.colormap.to_array()
+        if self._written is None or not np.array_equal(colors, self._written):
+            self._colors = colors
+        return self._colors
+
+    def _write(self, colors: np.ndarray):
+        """
+        Write colors to the color map, and pre-integrate them, if :attr:`preintegration` is enabled.
+        """
+        self._colors = colors
+        cmin, cmax = self.limits()
+        width = self._preintegration / max(cmax - cmin, 1e-6)
+        if width > 0:
+            self._written = _preintegrate(colors, width, len(self.colormap.to_array()))
+        else:
+            self._written = colors
+        self.colormap.write_lut(self._written)
+
+    def _update(self):
+        """
+        Pre-integrate the color map again (e.g., after the color limits or :attr:`preintegration` have changed).
+        """
+        self._write(self._source())
 
     def limits(self, *args) -> tuple[float | None, float | None] | None:
         """
@@ -118,14 +343,32 @@ class colormap_helper:
                 self.colormap.minimum_intensity = cmin
             if cmax is not None:
                 self.colormap.maximum_intensity = cmax
+            if self._preintegration > 0:
+                self._update()
         else:
             raise ValueError('limits() takes 0 or 2 arguments, but {} were given'.format(len(args)))
+
+    def getstate(self) -> dict:
+        """
+        Get a picklable representation of the color map, that can be restored using :meth:`setstate`. The colors are
+        represented before the pre-integration.
+        """
+        return dict(
+            colors=self._source(),
+            limits=self.limits(),
+        )
+
+    def setstate(self, state: dict):
+        """
+        Restore the color map from a representation obtained by :meth:`getstate`.
+        """
+        self.limits(*state['limits'])
+        self._write(np.asarray(state['colors'], np.uint8))
         
     def bar(self, volume: libcarna.base.Node, **kwargs) -> colorbar:
         """
-        Return a colorbar object for the colormap.
+        Return a colorbar object for the colormap. The colorbar shows the colors before the pre-integration.
         """
         normalized_intensity_limits = self.limits()
         raw_intensity_limits = volume.raw(normalized_intensity_limits)
-        colorlist = self.colormap.color_list
-        return colorbar(colorlist, *raw_intensity_limits, **kwargs)
+        return colorbar(self._source(), *raw_intensity_limits, **kwargs)
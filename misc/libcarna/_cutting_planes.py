@@ -63,3 +63,13 @@ class cutting_planes(libcarna.presets.CuttingPlanesStage):
             cmap=self.cmap.colormap,
             clim=None,  # uses the color limits from `cmap`
         )
+
+    def __reduce__(self):
+        return cutting_planes, (self.volume_geometry_type, self.plane_geometry_type), dict(
+            enabled=self.enabled,
+            cmap=self.cmap.getstate(),
+        )
+
+    def __setstate__(self, state: dict):
+        self.enabled = state['enabled']
+        self.cmap.setstate(state['cmap'])
@@ -73,3 +73,25 @@ class drr(libcarna.presets.DRRStage):
             upper_multiplier=self.upper_multiplier,
             render_inverse=self.render_inverse,
         )
+
+    def __reduce__(self):
+        return drr, (self.geometry_type,), dict(
+            enabled=self.enabled,
+            sample_rate=self.sample_rate,
+            water_attenuation=self.water_attenuation,
+            base_intensity=self.base_intensity,
+            lower_threshold=self.lower_threshold,
+            upper_threshold=self.upper_threshold,
+            upper_multiplier=self.upper_multiplier,
+            render_inverse=self.render_inverse,
+        )
+
+    def __setstate__(self, state: dict):
+        self.enabled = state['enabled']
+        self.sample_rate = state['sample_rate']
+        self.water_attenuation = state['water_attenuation']
+        self.base_intensity    = state['base_intensity']
+        self.lower_threshold   = state['lower_threshold']
+        self.upper_threshold   = state['upper_threshold']
+        self.upper_multiplier  = state['upper_multiplier']
+        self.render_inverse    = state['render_inverse']
@@ -19,6 +19,14 @@ class dvr(libcarna.presets.DVRStage):
             more translucency.
         diffuse_light: Diffuse light value for the volume rendering. Larger values result in more diffuse light
             (alias: `diffuse`). Ambient light is one minus diffuse light.
+        preintegration: Expected slope of the normalized intensities along the rays, i.e. the change of the normalized
+            intensity across the size of the volume (alias: `preint`). The change of intensity between two samples is
+            estimated as `preintegration / sample_rate`, and the color map is integrated over intervals of intensities
+            of that width. This approximates a pre-integrated transfer function, so that narrow features of the color
+            map are not missed between two samples, which reduces artifacts at lower sample rates. The pre-integration
+            is updated when the sample rate or the color limits change, and applies to all color maps written through
+            :attr:`cmap` (color maps written to :attr:`color_map` directly are pre-integrated by the next update). If
+            0, the color map is used as is.
 
     Example:
 
@@ -36,6 +44,7 @@ class dvr(libcarna.presets.DVRStage):
     @kwalias('sample_rate', 'sr')
     @kwalias('translucency', 'transl')
     @kwalias('diffuse_light', 'diffuse')
+    @kwalias('preintegration', 'preint')
     def __init__(
             self,
             geometry_type: int,
@@ -45,22 +54,72 @@ class dvr(libcarna.presets.DVRStage):
             sample_rate: int = libcarna.presets.VolumeRenderingStage.DEFAULT_SAMPLE_RATE,
             translucency: float = 0,
             diffuse_light: float = libcarna.presets.DVRStage.DEFAULT_DIFFUSE_LIGHT,
+            preintegration: float = 0,
         ):
+        assert preintegration >= 0, f'preintegration must not be negative, got {preintegration}'
         super().__init__(geometry_type)
-        self.cmap = colormap_helper(self.color_map, cmap, clim)
+        self._preintegration = preintegration
+        self.cmap = colormap_helper(self.color_map, cmap, clim, preintegration=preintegration / sample_rate)
         self.sample_rate = sample_rate
         self.translucency = translucency
         self.diffuse_light = diffuse_light
 
+    @property
+    def sample_rate(self) -> int:
+        """
+        Sample rate for volume rendering (see :class:`dvr`).
+        """
+        return libcarna.presets.DVRStage.sample_rate.fget(self)
+
+    @sample_rate.setter
+    def sample_rate(self, sample_rate: int):
+        libcarna.presets.DVRStage.sample_rate.fset(self, sample_rate)
+        self.cmap.preintegration = self._preintegration / sample_rate
+
+    @property
+    def preintegration(self) -> float:
+        """
+        Expected slope of the normalized intensities along the rays, that is used for the pre-integration of the color
+        map (see :class:`dvr`).
+        """
+        return self._preintegration
+
+    @preintegration.setter
+    def preintegration(self, preintegration: float):
+        assert preintegration >= 0, f'preintegration must not be negative, got {preintegration}'
+        self._preintegration = preintegration
+        self.cmap.preintegration = preintegration / self.sample_rate
+
     def replicate(self):
         """
         Replicate the DVR.
         """
-        return dvr(
+        replica = dvr(
             self.geometry_type,
             cmap=self.cmap.colormap,
             clim=None,  # uses the color limits from `cmap`
             sample_rate=self.sample_rate,
             translucency=self.translucency,
             diffuse_light=self.diffuse_light,
+            preintegration=self.preintegration,
         )
+        replica.cmap.setstate(self.cmap.getstate())  # the color map is pre-integrated from the original colors
+        return replica
+
+    def __reduce__(self):
+        return dvr, (self.geometry_type,), dict(
+            enabled=self.enabled,
+            cmap=self.cmap.getstate(),
+            sample_rate=self.sample_rate,
+            translucency=self.translucency,
+            diffuse_light=self.diffuse_light,
+            preintegration=self.preintegration,
+        )
+
+    def __setstate__(self, state: dict):
+        self.enabled = state['enabled']
+        self.sample_rate = state['sample_rate']
+        self.preintegration = state['preintegration']
+        self.cmap.setstate(state['cmap'])
+        self.translucency = state['translucency']
+        self.diffuse_light = state['diffuse_light']
@@ -0,0 +1,30 @@
+import threading
+
+import libcarna
+
+
+# Process-wide default context (the first one created), and the default contexts of the individual threads
+_default_context: libcarna.egl_context | None = None
+_thread_contexts = threading.local()
+_lock = threading.Lock()
+
+
+def default_egl_context() -> libcarna.egl_context:
+    """
+    Get the default :class:`egl_context` of the calling thread. It is created on first use, and used by each
+    :class:`renderer` that is created without an explicit `gl_context`.
+
+    All default contexts of a process share their objects (e.g., volume textures and shader programs), so a volume
+    that is rendered by multiple renderers is uploaded to the GPU only once. Each thread gets its own default context,
+    because an OpenGL context can only be current in one thread at a time.
+    """
+    global _default_context
+    ctx = getattr(_thread_contexts, 'ctx', None)
+    if ctx is None:
+        with _lock:
+            if _default_context is None:
+                ctx = _default_context = libcarna.egl_context()
+            else:
+                ctx = libcarna.egl_context(share=_default_context)
+        _thread_contexts.ctx = ctx
+    return ctx
@@ -0,0 +1,623 @@
+import abc
+import io
+import itertools
+import os
+import pathlib
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Iterable,
+    Literal,
+)
+
+import numpy as np
+import skvideo
+
+from ._apng import _apng_writer
+from ._trace import span
+
+
+Target = str | os.PathLike | BinaryIO
+
+QualityLiteral = Literal['low', 'medium', 'high', 'lossless']
+
+_QUALITIES = ('low', 'medium', 'high', 'lossless')
+
+
+def _ffmpeg_executable() -> str:
+    """
+    Get the path of the FFmpeg executable (the one used by scikit-video, if it is configured).
+    """
+    path = os.path.join(skvideo.getFFmpegPath(), 'ffmpeg')
+    if os.path.isfile(path):
+        return path
+    path = shutil.which('ffmpeg')
+    if path is None:
+        raise FileNotFoundError('FFmpeg is required for video encoding, but it was not found.')
+    return path
+
+
+def _close_on_exit(obj: Any, exc_type: type[BaseException] | None):
+    """
+    Close an encoder or a :class:`video_writer` when its ``with`` block is left. If the block raised an exception,
+    errors of closing (e.g., that no frames were written) are suppressed, so that the original exception propagates.
+    """
+    if exc_type is None:
+        obj.close()
+    else:
+        try:
+            obj.close()
+        except Exception:
+            pass
+
+
+class encoder(abc.ABC):
+    """
+    Base class of encoders, that write frames to a file (or a file-like object) one by one, so that the frames do not
+    need to be kept in memory. Encoders are registered by :func:`register_encoder`.
+
+    Arguments:
+        target: Path or binary file-like object (e.g., a :class:`io.BytesIO` buffer, or a socket opened by
+            :meth:`socket.socket.makefile`) to write to. File-like objects are not closed.
+        fps: The frames per second.
+        quality: Quality preset. Can be `'low'`, `'medium'`, `'high'`, or `'lossless'`. Lossless encoders ignore the
+            preset, and lossy encoders use their highest quality for `'lossless'`.
+    """
+
+    extension: str
+    """
+    File extension of the encoded files.
+    """
+
+    mimetype: str
+    """
+    MIME type of the encoded files.
+    """
+
+    html_element: Literal['img', 'video']
+    """
+    HTML element used to display the encoded files.
+    """
+
+    lossless: bool = False
+    """
+    Whether the encoder can encode the frames without loss (for the `'lossless'` quality preset).
+    """
+
+    alpha: bool = False
+    """
+    Whether the encoder preserves the alpha channel of RGBA frames.
+    """
+
+    palette: bool = False
+    """
+    Whether the encoder reduces the colors of the frames to a palette (e.g., GIF). Such encoders are only selected by
+    :func:`select_format` for the `'low'` and `'medium'` quality presets.
+    """
+
+    streamable: bool = True
+    """
+    Whether the encoded data is written while the frames are encoded, even if the target is not seekable (e.g., a
+    socket). Otherwise, the encoded data is written to file-like objects when the encoding is finished.
+    """
+
+    seekable: bool = False
+    """
+    Whether the encoded files support seeking during playback.
+    """
+
+    def __init__(self, target: Target, fps: float = 25, quality: QualityLiteral = 'high'):
+        assert quality in _QUALITIES, f'Unknown quality preset: {quality}'
+        self.target = target
+        self.fps = fps
+        self.quality = quality
+
+    @abc.abstractmethod
+    def write(self, frame: np.ndarray):
+        """
+        Encode a frame.
+        """
+
+    @abc.abstractmethod
+    def close(self):
+        """
+        Finish the encoding.
+        """
+
+    def __enter__(self) -> 'encoder':
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, *args: Any):
+        _close_on_exit(self, exc_type)
+
+
+class apng_encoder(encoder):
+    """
+    Encode frames as an animated PNG (lossless).
+
+    Each frame only stores the region that changed since the previous frame. If the first `palette_frames` frames
+    have at most 256 colors in total (e.g., single images or short loops), a palette is used instead of storing the
+    colors of each pixel. The frames are compressed by a pool of threads.
+
+    Arguments:
+        target: Path or binary file-like object to write to. File-like objects must be seekable, unless `n_frames` is
+            given, or all frames are written with a palette.
+        fps: The frames per second.
+        quality: Quality preset (ignored, because the encoding is always lossless).
+        n_frames: The number of frames, if known in advance.
+        palette_frames: The maximum number of frames, that are kept in memory until it is known whether a palette can
+            be used. If 0, palettes are never used.
+        workers: Number of threads used for compressing frames. Defaults to the number of CPUs (at most 4).
+    """
+
+    extension = '.png'
+    mimetype = 'image/apng'
+    html_element = 'img'
+    lossless = True
+    alpha = True
+
+    def __init__(
+            self,
+            target: Target,
+            fps: float = 25,
+            quality: QualityLiteral = 'high',
+            n_frames: int | None = None,
+            palette_frames: int = 32,
+            workers: int | None = None,
+        ):
+        super().__init__(target, fps, quality)
+        if hasattr(target, 'write'):
+            self._fp = target
+            self._owns_fp = False
+        else:
+            self._fp = open(target, 'wb')
+            self._owns_fp = True
+        self._writer = _apng_writer(
+            self._fp,
+            fps=fps,
+            n_frames=n_frames,
+            palette_frames=palette_frames,
+            workers=workers,
+        )
+
+    def write(self, frame: np.ndarray):
+        with span('encode.apng.frame'):
+            self._writer.write(frame)
+
+    def close(self):
+        try:
+            self._writer.close()
+        finally:
+            if self._owns_fp:
+                self._fp.close()
+
+
+class _ffmpeg_encoder(encoder):
+    """
+    Base class of encoders, that pipe the frames through FFmpeg.
+    """
+
+    container: str
+    """
+    FFmpeg output format.
+    """
+
+    def __init__(self, target: Target, fps: float = 25, quality: QualityLiteral = 'high'):
+        super().__init__(target, fps, quality)
+        self._process = None
+        self._copier = None
+        self._tempfile = None
+
+    @abc.abstractmethod
+    def _output_args(self, channels: int) -> list[str]:
+        """
+        FFmpeg arguments of the output (e.g., the codec), for frames with `channels` channels.
+        """
+
+    def _start(self, frame: np.ndarray):
+        height, width = frame.shape[:2]
+        channels = 1 if frame.ndim == 2 else frame.shape[2]
+        args = [
+            _ffmpeg_executable(),
+            '-y',
+            '-loglevel', 'error',
+            '-f', 'rawvideo',
+            '-pix_fmt', {1: 'gray', 3: 'rgb24', 4: 'rgba'}[channels],
+            '-s', f'{width}x{height}',
+            '-r', str(self.fps),
+            '-i', 'pipe:0',
+            *self._output_args(channels),
+            '-r', str(self.fps),
+            '-f', self.container,
+        ]
+        stdout = subprocess.DEVNULL
+        if not hasattr(self.target, 'write'):
+            args.append(str(pathlib.Path(self.target)))
+        elif self.streamable:
+            args.append('pipe:1')
+            stdout = subprocess.PIPE
+        else:
+            self._tempfile = tempfile.NamedTemporaryFile(suffix=self.extension)
+            args.append(self._tempfile.name)
+        self._process = subprocess.Popen(args, stdin=subprocess.PIPE, stdout=stdout, stderr=subprocess.PIPE)
+
+        # Copy the output of FFmpeg to the target, while frames are written
+        if stdout == subprocess.PIPE:
+            self._copier = threading.Thread(
+                target=shutil.copyfileobj,
+                args=(self._process.stdout, self.target),
+                daemon=True,
+            )
+            self._copier.start()
+
+    def write(self, frame: np.ndarray):
+        frame = np.asarray(frame)
+        assert frame.dtype == np.uint8, f'Frames must be of type uint8, got {frame.dtype}'
+        with span(f'encode.{self.container}.frame'):
+            if self._process is None:
+                self._start(frame)
+            self._process.stdin.write(np.ascontiguousarray(frame).tobytes())
+
+    def close(self):
+        if self._process is None:
+            raise ValueError('No frames were written')
+        try:
+            self._process.stdin.close()
+            if self._copier is not None:
+                self._copier.join()
+            returncode = self._process.wait()
+            errors = self._process.stderr.read().decode(errors='replace')
+            self._process.stderr.close()
+            if returncode != 0:
+                raise RuntimeError(f'FFmpeg failed with exit code {returncode}: {errors}')
+            if self._tempfile is not None:
+                shutil.copyfileobj(self._tempfile, self.target)
+        finally:
+            if self._tempfile is not None:
+                self._tempfile.close()
+
+
+class h264_encoder(_ffmpeg_encoder):
+    """
+    Encode frames as an H.264 video in an MP4 container (lossy), using FFmpeg.
+
+    Videos written to paths are optimized for progressive playback (the index is at the beginning of the file). Videos
+    written to file-like objects are fragmented, so that they can be written without seeking.
+    """
+
+    extension = '.mp4'
+    mimetype = 'video/mp4'
+    html_element = 'video'
+    container = 'mp4'
+    seekable = True
+
+    crf: dict[str, int] = dict(low=34, medium=28, high=23, lossless=16)
+    """
+    Constant rate factors of the quality presets (lower is better).
+    """
+
+    def _output_args(self, channels: int) -> list[str]:
+        args = [
+            '-vcodec', 'h264',
+            '-pix_fmt', 'yuv420p',
+            '-crf', str(self.crf[self.quality]),
+            '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2',  # yuv420p requires even dimensions
+        ]
+        if hasattr(self.target, 'write'):
+            args += ['-movflags', 'frag_keyframe+empty_moov']
+        else:
+            args += ['-movflags', '+faststart']
+        return args
+
+
+class vp9_encoder(_ffmpeg_encoder):
+    """
+    Encode frames as a VP9 video in a WebM container (lossy), using FFmpeg. VP9 videos are usually smaller than H.264
+    videos of the same quality, and preserve the alpha channel, but encoding is slower.
+    """
+
+    extension = '.webm'
+    mimetype = 'video/webm'
+    html_element = 'video'
+    container = 'webm'
+    alpha = True
+    seekable = True
+
+    crf: dict[str, int] = dict(low=46, medium=38, high=31, lossless=15)
+    """
+    Constant rate factors of the quality presets (lower is better).
+    """
+
+    def _output_args(self, channels: int) -> list[str]:
+        return [
+            '-vcodec', 'libvpx-vp9',
+            '-pix_fmt', 'yuva420p' if channels == 4 else 'yuv420p',
+            '-crf', str(self.crf[self.quality]),
+            '-b:v', '0',  # constant quality mode
+            '-row-mt', '1',
+            '-deadline', 'good',
+            '-cpu-used', '4',
+        ]
+
+
+class webp_encoder(_ffmpeg_encoder):
+    """
+    Encode frames as an animated WebP image, using FFmpeg. For the `'lossless'` quality preset, the frames are encoded
+    without loss (usually smaller than :class:`apng_encoder`), otherwise with loss.
+    """
+
+    extension = '.webp'
+    mimetype = 'image/webp'
+    html_element = 'img'
+    container = 'webp'
+    lossless = True
+    alpha = True
+    streamable = False
+
+    quality_factor: dict[str, int] = dict(low=50, medium=75, high=90, lossless=100)
+    """
+    Quality factors of the quality presets (higher is better).
+    """
+
+    def _output_args(self, channels: int) -> list[str]:
+        lossless = self.quality == 'lossless'
+        return [
+            '-vcodec', 'libwebp_anim',
+            '-pix_fmt', 'bgra' if lossless else ('yuva420p' if channels == 4 else 'yuv420p'),
+            '-lossless', '1' if lossless else '0',
+            '-quality', str(self.quality_factor[self.quality]),
+            '-compression_level', '6' if lossless else '4',
+            '-loop', '0',
+        ]
+
+
+class gif_encoder(_ffmpeg_encoder):
+    """
+    Encode frames as an animated GIF (lossy), using FFmpeg. A palette is computed for each frame, so that the frames
+    can be encoded one by one. GIFs are widely supported, but usually larger than videos.
+    """
+
+    extension = '.gif'
+    mimetype = 'image/gif'
+    html_element = 'img'
+    container = 'gif'
+    palette = True
+
+    max_colors: dict[str, int] = dict(low=64, medium=128, high=256, lossless=256)
+    """
+    Maximum numbers of colors of the quality presets.
+    """
+
+    def _output_args(self, channels: int) -> list[str]:
+        max_colors = self.max_colors[self.quality]
+        return [
+            '-filter_complex',
+            f'split[a][b];[a]palettegen=stats_mode=single:max_colors={max_colors}[p];[b][p]paletteuse=new=1',
+            '-loop', '0',
+        ]
+
+
+encoders: dict[str, type[encoder]] = dict()
+"""
+Registry of the encoders by their format names (e.g., `'h264'`), see :func:`register_encoder`.
+"""
+
+
+def register_encoder(format: str, encoder_cls: type[encoder] | None = None) -> Callable | type[encoder]:
+    """
+    Register an encoder for a format, so that it can be used by :func:`encode`, :class:`video_writer`, and
+    :func:`imshow`. An existing encoder of the same format is replaced.
+
+    Can be used as a decorator:
+
+    .. code-block:: python
+
+        @libcarna.register_encoder('my_format')
+        class my_encoder(libcarna.encoder):
+            ...
+    """
+    if encoder_cls is None:
+        return lambda encoder_cls: register_encoder(format, encoder_cls)
+    assert issubclass(encoder_cls, encoder), f'Encoders must be derived from libcarna.encoder, got {encoder_cls}'
+    encoders[format] = encoder_cls
+    return encoder_cls
+
+
+register_encoder('apng', apng_encoder)
+register_encoder('gif', gif_encoder)
+register_encoder('h264', h264_encoder)
+register_encoder('vp9', vp9_encoder)
+register_encoder('webp', webp_encoder)
+
+
+def _resolve_encoder(format: str) -> type[encoder]:
+    encoder_cls = encoders.get(format, None)
+    if encoder_cls is None:
+        raise ValueError(f'Format "{format}" not supported.')
+    return encoder_cls
+
+
+def select_format(
+        frames: list[np.ndarray],
+        fps: float = 25,
+        quality: QualityLiteral = 'high',
+        formats: Iterable[str] | None = None,
+        html_element: Literal['img', 'video'] | None = None,
+    ) -> str:
+    """
+    Select the format, that yields the smallest output for the given frames and quality preset.
+
+    The frames are encoded with each candidate format, and the format with the smallest output is selected. Formats
+    that do not meet the quality preset are skipped (only lossless formats are candidates for `'lossless'`, formats
+    with a palette are no candidates for `'high'` and `'lossless'`, and only formats that preserve the alpha channel
+    are candidates for RGBA frames). Formats that fail (e.g., if FFmpeg is not installed, or was built without the
+    codec) are skipped too.
+
+    Since each candidate format is trial-encoded, the selection is considerably slower than encoding with a fixed
+    format.
+
+    Arguments:
+        frames: Frames to encode. To keep the selection fast, pass a few representative frames.
+        fps: The frames per second.
+        quality: Quality preset (see :class:`encoder`).
+        formats: Candidate formats. Defaults to all registered formats.
+        html_element: If given, only formats that are displayed by this HTML element are candidates.
+    """
+    has_alpha = any(np.ndim(frame) == 3 and np.shape(frame)[2] == 4 for frame in frames)
+    sizes = dict()
+    for format in (formats or list(encoders.keys())):
+        encoder_cls = _resolve_encoder(format)
+        if quality == 'lossless' and not encoder_cls.lossless:
+            continue
+        if quality in ('high', 'lossless') and encoder_cls.palette:
+            continue
+        if has_alpha and not encoder_cls.alpha:
+            continue
+        if html_element is not None and encoder_cls.html_element != html_element:
+            continue
+        buf = io.BytesIO()
+        try:
+            with span('encode.select', format=format):
+                with encoder_cls(buf, fps=fps, quality=quality) as encoder:
+                    for frame in frames:
+                        encoder.write(frame)
+        except (RuntimeError, OSError):
+            continue
+        sizes[format] = len(buf.getvalue())
+    assert len(sizes) > 0, f'No format meets the requirements (quality: {quality}, alpha: {has_alpha})'
+    return min(sizes, key=sizes.get)
+
+
+class video_writer:
+    """
+    Encode frames on a background thread, while the frames are being rendered. The frames are passed to the
+    background thread through a bounded queue, so that the memory used does not grow with the number of frames.
+
+    Arguments:
+        target: Path or binary file-like object to write to (e.g., a socket opened by :meth:`socket.socket.makefile`).
+        format: The format of the encoded frames (see :attr:`encoders`).
+        fps: The frames per second.
+        quality: Quality preset (see :class:`encoder`).
+        queue_size: Maximum number of frames, that wait for being encoded. If the queue is full, :meth:`write` blocks.
+        **kwargs: Additional arguments passed to the encoder.
+
+    Example:
+
+        .. code-block:: python
+
+            with libcarna.video_writer('animation.mp4', format='h264') as writer:
+                for frame in animation.render(r, camera):
+                    writer.write(frame)
+    """
+
+    def __init__(
+            self,
+            target: Target,
+            format: str = 'h264',
+            fps: float = 25,
+            quality: QualityLiteral = 'high',
+            queue_size: int = 8,
+            **kwargs: Any,
+        ):
+        encoder_cls = _resolve_encoder(format)
+        assert queue_size > 0, f'queue_size must be positive, got {queue_size}'
+        self.encoder = encoder_cls(target, fps=fps, quality=quality, **kwargs)
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._error = None
+        self._thread = threading.Thread(target=self._encode, daemon=True)
+        self._thread.start()
+
+    def _encode(self):
+        while True:
+            frame = self._queue.get()
+            if frame is None:
+                break
+            if self._error is None:
+                try:
+                    self.encoder.write(frame)
+                except BaseException as error:
+                    self._error = error
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise self._error
+
+    def write(self, frame: np.ndarray):
+        """
+        Put a frame into the queue of frames to be encoded.
+        """
+        self._raise_error()
+        self._queue.put(frame)
+
+    def close(self):
+        """
+        Wait until all frames are encoded, and finish the encoding.
+        """
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        if self._error is not None:
+
+            # Release the resources of the encoder, but report the original error
+            try:
+                self.encoder.close()
+            except BaseException:
+                pass
+            raise self._error
+        self.encoder.close()
+
+    def __enter__(self) -> 'video_writer':
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, *args: Any):
+        _close_on_exit(self, exc_type)
+
+
+def encode(
+        frames: Iterable[np.ndarray] | np.ndarray,
+        target: Target,
+        format: str = 'h264',
+        fps: float = 25,
+        quality: QualityLiteral = 'high',
+        **kwargs: Any,
+    ) -> str:
+    """
+    Encode frames (e.g., from :meth:`animate.render`) to a file or a binary file-like object. The frames are encoded
+    on a background thread, while the next frames are being rendered (see :class:`video_writer`).
+
+    Arguments:
+        frames: Iterable of frames, or a single frame (3D array).
+        target: Path or binary file-like object to write to.
+        format: The format of the encoded frames (see :attr:`encoders`). If `'smallest'`, the format that yields the
+            smallest output for the first few frames is used (see :func:`select_format`).
+        fps: The frames per second.
+        quality: Quality preset (see :class:`encoder`).
+        **kwargs: Additional arguments passed to :class:`video_writer`.
+
+    Returns:
+        The format used.
+    """
+    if isinstance(frames, np.ndarray):
+        if frames.ndim == 3:
+            frames = [frames]
+        elif frames.ndim != 4:
+            raise ValueError('Array must be 3D or 4D data.')
+    frames = iter(frames)
+    sample = list(itertools.islice(frames, 8 if format == 'smallest' else 1))
+    if len(sample) == 0:
+        raise ValueError('No frames to encode.')
+    frames = itertools.chain(sample, frames)
+    if format == 'smallest':
+        format = select_format(sample, fps=fps, quality=quality)
+    with video_writer(target, format=format, fps=fps, quality=quality, **kwargs) as writer:
+        for frame in frames:
+            writer.write(frame)
+    return format
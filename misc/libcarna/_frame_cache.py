@@ -0,0 +1,145 @@
+import hashlib
+import pickle
+from collections import OrderedDict
+from typing import Iterable
+
+import numpy as np
+
+import libcarna
+
+
+def _stage_state(stage: libcarna.base.RenderStage) -> dict | None:
+    """
+    Get the parameters of a stage (as they are pickled), or `None` if the stage does not support pickling.
+    """
+    if not hasattr(stage, '__setstate__'):
+        return None
+    return stage.__reduce__()[2]
+
+
+class _frame_key(bytes):
+    """
+    Key that identifies a rendered frame. The key keeps the geometry features of the scene alive (see
+    :func:`libcarna.base.scene_state`), so that the IDs of the features are not re-used for other features, as long as
+    the key is used (e.g., by a :class:`frame_cache`).
+    """
+
+    def __new__(cls, digest: bytes, pins: list[libcarna.base.FeaturePin]):
+        key = super().__new__(cls, digest)
+        key.pins = pins
+        return key
+
+
+def _scene_key(
+        camera: libcarna.base.Camera,
+        root: libcarna.base.Node | None,
+        stages: Iterable[libcarna.base.RenderStage],
+        *args,
+    ) -> _frame_key | None:
+    """
+    Compute a key that identifies the frame rendered for the given scene and stages. Additional arguments (e.g., the
+    resolution) are included in the key. Returns `None` if a key cannot be computed, because some stage does not
+    support pickling.
+    """
+    stage_states = [_stage_state(stage) for stage in stages]
+    if any(state is None for state in stage_states):
+        return None
+    scene_state, pins = libcarna.base.scene_state(camera, root)
+    digest = hashlib.blake2b(scene_state, digest_size=32)
+    digest.update(pickle.dumps((stage_states, args)))
+    return _frame_key(digest.digest(), pins)
+
+
+class frame_cache:
+    """
+    Cache of rendered frames, that can be used by a :class:`renderer` to skip rendering of frames that were already
+    rendered (e.g., when re-rendering a loop, or when a notebook cell is re-run).
+
+    A frame is identified by the view and projection matrices of the camera, the world transforms of all objects in the
+    scene, the geometries and their features (e.g., volumes), and the parameters of the stages (e.g., sample rate,
+    color map, color limits, thresholds). Changes of features in place (e.g., changing the parameters of a material)
+    are not detected, use :meth:`clear` in that case. The cached frames keep the geometry features of their scenes
+    alive (e.g., volume textures), until they are evicted or the cache is cleared.
+
+    Arguments:
+        max_bytes: Maximum total size of the cached frames. The least recently used frames are evicted first.
+    """
+
+    max_bytes: int
+    """
+    Maximum total size of the cached frames.
+    """
+
+    nbytes: int
+    """
+    Total size of the cached frames.
+    """
+
+    hits: int
+    """
+    Number of cache hits.
+    """
+
+    misses: int
+    """
+    Number of cache misses.
+    """
+
+    evictions: int
+    """
+    Number of frames evicted from the cache.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 ** 2):
+        self.max_bytes = max_bytes
+        self._frames = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    @property
+    def hit_rate(self) -> float:
+        """
+        Fraction of lookups that were cache hits (0 if there were no lookups yet).
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.
+
+    def get(self, key: bytes) -> np.ndarray | None:
+        """
+        Get a copy of the cached frame for `key`, or `None` if there is no such frame.
+        """
+        frame = self._frames.get(key)
+        if frame is None:
+            self.misses += 1
+            return None
+        else:
+            self.hits += 1
+            self._frames.move_to_end(key)
+            return frame.copy()
+
+    def put(self, key: bytes, frame: np.ndarray):
+        """
+        Put a copy of `frame` into the cache. Frames larger than :attr:`max_bytes` are not cached.
+        """
+        if frame.nbytes > self.max_bytes:
+            return
+        if key in self._frames:
+            self.nbytes -= self._frames.pop(key).nbytes
+        while self.nbytes + frame.nbytes > self.max_bytes:
+            _, evicted = self._frames.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+            self.evictions += 1
+        self._frames[key] = frame.copy()
+        self.nbytes += frame.nbytes
+
+    def clear(self):
+        """
+        Remove all frames from the cache. The statistics are kept.
+        """
+        self._frames.clear()
+        self.nbytes = 0
@@ -1,14 +1,25 @@
 import base64
 import io
-import tempfile
+import itertools
 from typing import (
     Any,
     Iterable,
+    Literal,
 )
 
-import numpngw
 import numpy as np
-import skvideo.io
+
+from ._encoding import (
+    QualityLiteral,
+    _resolve_encoder,
+    encode,
+    select_format,
+)
+from ._media import (
+    _get_default_media_cache,
+    _get_default_media_server,
+)
+from ._trace import span
 
 try:
     from IPython.core.display import HTML as IPythonHTML
@@ -16,65 +27,59 @@ except ImportError:
     IPythonHTML = None
     
 
-def _render_html_apng(array: np.ndarray | Iterable[np.ndarray], fps: float = 25) -> str:
-
-    # The image is a single frame, create an animation with a single frame
-    if isinstance(array, np.ndarray) and array.ndim == 3:
-        return _render_html_apng([array], fps=fps)
-    
-    # Assume that the image is a list of frames, create a temporal stack
-    elif not isinstance(array, np.ndarray):
-        return _render_html_apng(np.array(list(array)), fps=fps)
-    
-    # The image is a temporal stack, create an animated PNG
-    elif isinstance(array, np.ndarray) and array.ndim == 4:
-        buf = io.BytesIO()
-        numpngw.write_apng(buf, array, delay=1000 / fps, use_palette=False)
-        buf.seek(0)
-        buf_base64_str = base64.b64encode(buf.read()).decode('ascii')
-        return f'<img src="data:image/apng;base64, {buf_base64_str}"/>'
-    
-    # The image is not a valid type
-    else:
-        raise ValueError('Array must be 3D or 4D data.')
-    
+def _render_html(
+        array: np.ndarray | Iterable[np.ndarray],
+        format: str = 'auto',
+        fps: float = 25,
+        quality: QualityLiteral = 'high',
+        media: Literal['inline', 'file', 'server'] = 'inline',
+    ) -> str:
 
-def _render_html_h264(array: np.ndarray | Iterable[np.ndarray], fps: float = 25) -> str:
+    # Single images are displayed as images (not as videos)
+    single_image = isinstance(array, np.ndarray) and (array.ndim == 3 or (array.ndim == 4 and array.shape[0] == 1))
+    frames = iter([array] if isinstance(array, np.ndarray) and array.ndim == 3 else array)
+    if format == 'auto':
+        format = 'apng' if single_image else 'h264'
+    elif format == 'smallest':
+        sample = list(itertools.islice(frames, 8))
+        format = select_format(sample, fps=fps, quality=quality, html_element='img' if single_image else None)
+        frames = itertools.chain(sample, frames)
 
-    # The image is a single frame, create an animation with a single frame
-    if isinstance(array, np.ndarray) and array.ndim == 3:
-        return _render_html_h264([array], fps=fps)
-    
-    # Encode video
-    with tempfile.NamedTemporaryFile(suffix='.mp4') as mp4_file:
-        with skvideo.io.FFmpegWriter(
-            mp4_file.name,
-            outputdict={
-                '-vcodec': 'h264', 
-                '-pix_fmt': 'yuv420p',
-                '-r': str(fps),
-            },
-        ) as writer:
-            for frame in array:
-                writer.writeFrame(frame)
-        buf = mp4_file.read()
+    # Encode the frames
+    encoder_cls = _resolve_encoder(format)
+    with span(f'imshow.{format}'):
+        if media == 'inline':
+            buf = io.BytesIO()
+            encode(frames, buf, format=format, fps=fps, quality=quality)
+            buf_base64_str = base64.b64encode(buf.getvalue()).decode('ascii')
+            src = f'data:{encoder_cls.mimetype};base64, {buf_base64_str}'
+        elif media == 'file':
+            src = _get_default_media_cache().encode(frames, format=format, fps=fps, quality=quality).as_posix()
+        elif media == 'server':
+            path = _get_default_media_cache().encode(frames, format=format, fps=fps, quality=quality)
+            src = _get_default_media_server().url(path)
+        else:
+            raise ValueError(f'Unknown media mode: {media}')
 
     # Produce HTML
-    buf_base64_str = base64.b64encode(buf).decode('ascii')
-    return(
-        '<video autoplay loop muted style="max-width: 100%;">'
-        f'<source type="video/mp4" src="data:video/mp4;base64, {buf_base64_str}"/>'
-        '</video>'
-    )
-
+    if encoder_cls.html_element == 'img':
+        return f'<img src="{src}"/>'
+    else:
+        return (
+            '<video autoplay loop muted style="max-width: 100%;">'
+            f'<source type="{encoder_cls.mimetype}" src="{src}"/>'
+            '</video>'
+        )
 
-html_plugins = dict(
-    apng=_render_html_apng,
-    h264=_render_html_h264,
-)
-    
 
-def imshow(array: np.ndarray | Iterable[np.ndarray], *colorbars, fps: float = 25, format: str = 'auto') -> Any:
+def imshow(
+        array: np.ndarray | Iterable[np.ndarray],
+        *colorbars,
+        fps: float = 25,
+        format: str = 'auto',
+        quality: QualityLiteral = 'high',
+        media: Literal['inline', 'file', 'server'] = 'inline',
+    ) -> Any:
     """
     Display an image or a sequence of images in a Jupyter notebook.
 
@@ -83,30 +88,29 @@ def imshow(array: np.ndarray | Iterable[np.ndarray], *colorbars, fps: float = 25
             (stack of RGB images), or an iterable of 3D arrays (sequence of RGB images).
         colorbars: Optional colorbars to display alongside the image.
         fps: The frames per second for the animation. Default is 25.
-        format: The format to use for displaying the image. Can be `'apng'` or `'h264'`. Default is `'auto'`, which
-            will use `'apng'` for single images, and `'h264'` for image stacks or sequences.
+        format: The format to use for displaying the image (see :attr:`encoders`, e.g., `'apng'`, `'h264'`, `'vp9'`,
+            `'webp'`, or `'gif'`). Default is `'auto'`, which will use `'apng'` for single images, and `'h264'` for
+            image stacks or sequences. If `'smallest'`, the format that yields the smallest output for the quality
+            preset is used (only formats displayed as images are considered for single images). This requires
+            trial-encoding the first frames with each candidate format (see :func:`select_format`).
+        quality: Quality preset (see :class:`encoder`).
+        media: How the encoded media is passed to the notebook. If `'inline'`, it is embedded into the notebook (as a
+            base64 data URI). If `'file'`, it is written to a :class:`media_cache` in the ``libcarna_media`` directory
+            (relative to the working directory, i.e. usually the directory of the notebook), and only referenced by the
+            notebook, so that the notebook stays small and the notebook server streams the media to the browser. If
+            `'server'`, the media is written to the same cache, but served by a :class:`media_server` on the local
+            machine, for notebook servers that do not serve files (the browser must run on the same machine).
     """
     assert IPythonHTML is not None, 'Please install IPython to use this function.'
-
-    if format == 'auto':
-        if isinstance(array, np.ndarray) and (array.ndim == 3 or (array.ndim == 4 and array.shape[0] == 1)):
-            format = 'apng'
-        else:
-            format = 'h264'
-
-    # Resolve the format to the proper plugin
-    _render_html = html_plugins.get(format, None)
-    if _render_html is None:
-        raise ValueError(f'Format "{format}" not supported.')
     
-    # Delegate to the selected plugin
+    # Delegate to the selected encoder
     nl = '\n'  # Python <3.12 does not allow backslashes in f-strings expressions
     return IPythonHTML(
         f"""
         <div style="display: inline-flex; padding: 0.5em;">
             <div style="display: inline-block; font-size: 0;">
-                {_render_html(array, fps=fps)}
+                {_render_html(array, format=format, fps=fps, quality=quality, media=media)}
             </div>
             {nl.join(cb.tohtml() for cb in colorbars)}
         </div>
-        """)
\ No newline at end of file
+        """)
@@ -0,0 +1,295 @@
+from typing import (
+    Any,
+    Callable,
+    Literal,
+)
+
+import numpy as np
+
+import libcarna
+
+
+EasingLiteral = Literal['linear', 'step', 'ease_in', 'ease_out', 'ease_in_out']
+
+_EASINGS: dict[str, Callable[[np.ndarray], np.ndarray]] = dict(
+    linear=lambda u: u,
+    step=lambda u: np.zeros_like(u),
+    ease_in=lambda u: u ** 2,
+    ease_out=lambda u: 1 - (1 - u) ** 2,
+    ease_in_out=lambda u: u ** 2 * (3 - 2 * u),
+)
+
+
+def _quaternion_from_matrix(mat: np.ndarray) -> np.ndarray:
+    """
+    Convert a rotation matrix (3x3, or the upper-left block of a 4x4 matrix) to a unit quaternion `(w, x, y, z)`.
+    """
+    m = np.asarray(mat, dtype=float)[:3, :3]
+    trace = np.trace(m)
+    if trace > 0:
+        s = 2 * np.sqrt(trace + 1)
+        q = (s / 4, (m[2, 1] - m[1, 2]) / s, (m[0, 2] - m[2, 0]) / s, (m[1, 0] - m[0, 1]) / s)
+    elif m[0, 0] > m[1, 1] and m[0, 0] > m[2, 2]:
+        s = 2 * np.sqrt(1 + m[0, 0] - m[1, 1] - m[2, 2])
+        q = ((m[2, 1] - m[1, 2]) / s, s / 4, (m[0, 1] + m[1, 0]) / s, (m[0, 2] + m[2, 0]) / s)
+    elif m[1, 1] > m[2, 2]:
+        s = 2 * np.sqrt(1 + m[1, 1] - m[0, 0] - m[2, 2])
+        q = ((m[0, 2] - m[2, 0]) / s, (m[0, 1] + m[1, 0]) / s, s / 4, (m[1, 2] + m[2, 1]) / s)
+    else:
+        s = 2 * np.sqrt(1 + m[2, 2] - m[0, 0] - m[1, 1])
+        q = ((m[1, 0] - m[0, 1]) / s, (m[0, 2] + m[2, 0]) / s, (m[1, 2] + m[2, 1]) / s, s / 4)
+    q = np.array(q)
+    return q / np.linalg.norm(q)
+
+
+def _decompose_rotation_scale(mat: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Decompose the upper-left 3x3 block of a transform into a rotation matrix and the scale factors of the axes.
+
+    The directions of axes with zero scale are undefined, so they are completed to an orthonormal basis from the
+    other axes (or the identity is used, if all axes have zero scale).
+    """
+    m = np.asarray(mat, dtype=float)[:3, :3]
+    scale = np.linalg.norm(m, axis=0)
+    valid = scale > 1e-12
+    rotation = m / np.where(valid, scale, 1)
+    if valid.sum() == 0:
+        rotation = np.eye(3)
+    elif valid.sum() == 1:
+        i = np.flatnonzero(valid)[0]
+        j, k = (i + 1) % 3, (i + 2) % 3
+        helper = np.eye(3)[np.argmin(np.abs(rotation[:, i]))]  # least parallel to the valid axis
+        rotation[:, j] = np.cross(helper, rotation[:, i])
+        rotation[:, j] /= np.linalg.norm(rotation[:, j])
+        rotation[:, k] = np.cross(rotation[:, i], rotation[:, j])
+    elif valid.sum() == 2:
+        k = np.flatnonzero(~valid)[0]
+        i, j = (k + 1) % 3, (k + 2) % 3
+        rotation[:, k] = np.cross(rotation[:, i], rotation[:, j])
+    return rotation, scale
+
+
+def _matrices_from_quaternions(q: np.ndarray) -> np.ndarray:
+    """
+    Convert an (N, 4) array of unit quaternions `(w, x, y, z)` to an (N, 3, 3) array of rotation matrices.
+    """
+    w, x, y, z = q.T
+    return np.stack([
+        np.stack([1 - 2 * (y * y + z * z), 2 * (x * y - w * z), 2 * (x * z + w * y)], axis=-1),
+        np.stack([2 * (x * y + w * z), 1 - 2 * (x * x + z * z), 2 * (y * z - w * x)], axis=-1),
+        np.stack([2 * (x * z - w * y), 2 * (y * z + w * x), 1 - 2 * (x * x + y * y)], axis=-1),
+    ], axis=-2)
+
+
+def _slerp(q0: np.ndarray, q1: np.ndarray, u: np.ndarray) -> np.ndarray:
+    """
+    Spherical linear interpolation between the (N, 4) arrays of unit quaternions `q0` and `q1`.
+    """
+    dot = np.sum(q0 * q1, axis=1)
+    q1 = np.where(dot[:, None] < 0, -q1, q1)  # take the shorter arc
+    dot = np.clip(np.abs(dot), 0, 1)
+    theta = np.arccos(dot)
+    sin_theta = np.sin(theta)
+    nearly_parallel = sin_theta < 1e-6
+    safe_sin_theta = np.where(nearly_parallel, 1, sin_theta)
+    w0 = np.where(nearly_parallel, 1 - u, np.sin((1 - u) * theta) / safe_sin_theta)
+    w1 = np.where(nearly_parallel, u, np.sin(u * theta) / safe_sin_theta)
+    q = w0[:, None] * q0 + w1[:, None] * q1
+    return q / np.linalg.norm(q, axis=1, keepdims=True)
+
+
+class _track:
+    """
+    Keyframes of a single channel (e.g., the position).
+    """
+
+    def __init__(self, default: np.ndarray, slerp: bool = False):
+        self.default = np.asarray(default, dtype=float)
+        self.slerp = slerp
+        self.keys = dict()
+
+    def add(self, t: float, value: np.ndarray, easing: str):
+        self.keys[float(t)] = (np.asarray(value, dtype=float), easing)
+
+    def interpolate(self, t: np.ndarray) -> np.ndarray:
+        """
+        Interpolate the channel for all times in `t` at once.
+        """
+        if len(self.keys) == 0:
+            return np.broadcast_to(self.default, (len(t),) + self.default.shape)
+        key_times = np.array(sorted(self.keys))
+        key_values = np.stack([self.keys[key_t][0] for key_t in key_times])
+        key_easings = np.array([self.keys[key_t][1] for key_t in key_times])
+
+        # Find the segment of each time, and the relative position within the segment
+        idx0 = np.clip(np.searchsorted(key_times, t, side='right') - 1, 0, len(key_times) - 1)
+        idx1 = np.minimum(idx0 + 1, len(key_times) - 1)
+        duration = key_times[idx1] - key_times[idx0]
+        u = np.where(duration > 0, (t - key_times[idx0]) / np.where(duration > 0, duration, 1), 0)
+        u = np.clip(u, 0, 1)
+
+        # Apply the easing of each segment
+        for easing in np.unique(key_easings):
+            mask = key_easings[idx0] == easing
+            u[mask] = _EASINGS[easing](u[mask])
+
+        # Interpolate the values
+        v0 = key_values[idx0]
+        v1 = key_values[idx1]
+        if self.slerp:
+            return _slerp(v0, v1, u)
+        else:
+            u = u.reshape(u.shape + (1,) * (v0.ndim - 1))
+            return v0 + u * (v1 - v0)
+
+
+class keyframes:
+    """
+    Create a step function for an :class:`animate` object, that interpolates between keyframes.
+
+    The interpolated values are computed for all frames at once, when the animation is rendered (see
+    :meth:`transforms`). Positions and scales are interpolated linearly, rotations are interpolated spherically
+    (slerp). The interpolation between two keyframes is shaped by the easing curve of the first keyframe.
+
+    Arguments:
+        target: Either a spatial object (e.g., a camera), in which case the keyframes specify its `position`,
+            `rotation`, and `scale`, or a function with a single argument, in which case the keyframes specify the
+            `value` passed to the function (e.g., ``lambda clim: mip.cmap.limits(*clim)``). Channels of a spatial
+            object without keyframes are kept as they are in the current local transform of the object.
+        easing: Default easing curve of the keyframes. Can be `'linear'`, `'step'` (hold the value until the next
+            keyframe), `'ease_in'`, `'ease_out'`, or `'ease_in_out'`.
+
+    Example:
+
+        .. code-block:: python
+
+            camera_keyframes = libcarna.keyframes(camera, easing='ease_in_out')
+            camera_keyframes.key(0, position=(0, 0, 100))
+            camera_keyframes.key(
+                0.5,
+                position=(0, 0, 50),
+                rotation=libcarna.math.rotation((0, 1, 0), radians=np.pi / 2),
+            )
+            camera_keyframes.key(1, position=(0, 0, 100))
+
+            clim_keyframes = libcarna.keyframes(lambda clim: mip.cmap.limits(*clim))
+            clim_keyframes.key(0, value=(0, 1)).key(1, value=(0.2, 0.6))
+
+            animation = libcarna.animate(camera_keyframes, clim_keyframes, n_frames=100)
+    """
+
+    def __init__(self, target: libcarna.base.Spatial | Callable[[Any], None], easing: EasingLiteral = 'linear'):
+        assert easing in _EASINGS, f'Unknown easing: {easing}'
+        self.target = target
+        self.easing = easing
+        self._prepared = None
+        if isinstance(target, libcarna.base.Spatial):
+            base_transform = np.asarray(target.local_transform, dtype=float)
+            rotation, scale = _decompose_rotation_scale(base_transform)
+            self._tracks = dict(
+                position=_track(base_transform[:3, 3]),
+                rotation=_track(_quaternion_from_matrix(rotation), slerp=True),
+                scale=_track(scale),
+            )
+        else:
+            assert callable(target), f'Target must be a spatial object or a function, got {type(target)}'
+            self._tracks = dict(value=_track(0.))
+
+    def key(
+            self,
+            t: float,
+            *,
+            position: tuple[float, float, float] | None = None,
+            rotation: np.ndarray | None = None,
+            scale: float | tuple[float, float, float] | None = None,
+            value: Any = None,
+            easing: EasingLiteral | None = None,
+        ) -> 'keyframes':
+        """
+        Add a keyframe (or replace the keyframe at the same time).
+
+        Arguments:
+            t: Time of the keyframe, in the range [0, 1] (like the `t` of the :class:`animate` step functions).
+            position: Position of the spatial object.
+            rotation: Rotation of the spatial object, either as a quaternion `(w, x, y, z)`, or as a rotation matrix
+                (3x3 or 4x4, e.g., obtained by :func:`libcarna.math.rotation`).
+            scale: Scale of the spatial object (uniform, or for each axis).
+            value: Value passed to the target function.
+            easing: Easing curve of the interpolation from this keyframe to the next one. Defaults to the easing of
+                the :class:`keyframes` object.
+
+        Returns:
+            The :class:`keyframes` object itself, so that calls can be chained.
+        """
+        easing = easing or self.easing
+        assert easing in _EASINGS, f'Unknown easing: {easing}'
+        channels = dict(position=position, rotation=rotation, scale=scale, value=value)
+        for name, channel_value in channels.items():
+            if channel_value is None:
+                continue
+            if name not in self._tracks:
+                raise ValueError(f'Keyframes of {type(self.target).__name__} do not support "{name}"')
+            if name == 'rotation':
+                channel_value = np.asarray(channel_value, dtype=float)
+                if channel_value.shape == (4,):
+                    channel_value = channel_value / np.linalg.norm(channel_value)
+                else:
+                    channel_value = _quaternion_from_matrix(channel_value)
+            elif name == 'scale':
+                channel_value = np.broadcast_to(np.asarray(channel_value, dtype=float), (3,))
+            elif name == 'value' and len(self._tracks['value'].keys) == 0:
+                self._tracks['value'].default = np.zeros_like(np.asarray(channel_value, dtype=float))
+            self._tracks[name].add(t, channel_value, easing)
+        self._prepared = None
+        return self
+
+    def values(self, t: np.ndarray) -> np.ndarray:
+        """
+        Interpolate the `value` keyframes for all times in `t` at once.
+
+        Returns:
+            Array of shape `(N,) + shape`, where `N` is the number of times and `shape` the shape of the values.
+        """
+        assert 'value' in self._tracks, 'Keyframes of spatial objects have no values, use transforms() instead'
+        return self._tracks['value'].interpolate(np.asarray(t, dtype=float).reshape(-1))
+
+    def transforms(self, t: np.ndarray) -> np.ndarray:
+        """
+        Compute the local transforms of the spatial object for all times in `t` at once.
+
+        Returns:
+            Array of shape `(N, 4, 4)`, where `N` is the number of times.
+        """
+        assert 'value' not in self._tracks, 'Keyframes of functions have no transforms, use values() instead'
+        t = np.asarray(t, dtype=float).reshape(-1)
+        position = self._tracks['position'].interpolate(t)
+        rotation = _matrices_from_quaternions(self._tracks['rotation'].interpolate(t))
+        scale = self._tracks['scale'].interpolate(t)
+        transforms = np.zeros((len(t), 4, 4))
+        transforms[:, :3, :3] = rotation * scale[:, None, :]
+        transforms[:, :3, 3] = position
+        transforms[:, 3, 3] = 1
+        return transforms
+
+    def prepare(self, t: np.ndarray):
+        """
+        Precompute the interpolated transforms or values for all times in `t`, so that calling the step function
+        with any of these times is a lookup. This is done by :class:`animate` before rendering.
+        """
+        t = np.asarray(t, dtype=float).reshape(-1)
+        results = self.values(t) if 'value' in self._tracks else self.transforms(t)
+        self._prepared = dict(zip(t.tolist(), results))
+
+    def _compute(self, t: float) -> np.ndarray:
+        if self._prepared is not None:
+            result = self._prepared.get(float(t))
+            if result is not None:
+                return result
+        return self.values([t])[0] if 'value' in self._tracks else self.transforms([t])[0]
+
+    def __call__(self, t: float):
+        result = self._compute(t)
+        if 'value' in self._tracks:
+            self.target(result.item() if result.ndim == 0 else result)
+        else:
+            self.target.local_transform = result
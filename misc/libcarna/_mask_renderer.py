@@ -52,3 +52,18 @@ class mask_renderer(libcarna.presets.MaskRenderingStage):
             color=self.color,
             filling=self.filling,
         )
+
+    def __reduce__(self):
+        color = self.color
+        return mask_renderer, (self.geometry_type,), dict(
+            enabled=self.enabled,
+            sample_rate=self.sample_rate,
+            color=(color.r, color.g, color.b, color.a),
+            filling=self.filling,
+        )
+
+    def __setstate__(self, state: dict):
+        self.enabled = state['enabled']
+        self.sample_rate = state['sample_rate']
+        self.color = libcarna.color(*state['color'])
+        self.filling = state['filling']
@@ -0,0 +1,213 @@
+import functools
+import hashlib
+import http.server
+import os
+import pathlib
+import re
+import tempfile
+import threading
+from typing import (
+    Any,
+    Iterable,
+)
+
+import numpy as np
+
+from ._encoding import (
+    QualityLiteral,
+    _resolve_encoder,
+    encode,
+)
+
+
+class media_cache:
+    """
+    Content-addressed cache of encoded media files (e.g., videos displayed by :func:`imshow`). Files are named by the
+    hash of their contents, so that identical media are stored only once.
+
+    Arguments:
+        directory: Directory of the cache. It is created if it does not exist. For media displayed in Jupyter
+            notebooks, a relative path (to the directory of the notebook) allows the notebook server to serve the
+            files, including range requests.
+    """
+
+    directory: pathlib.Path
+    """
+    Directory of the cache.
+    """
+
+    def __init__(self, directory: str | os.PathLike = 'libcarna_media'):
+        self.directory = pathlib.Path(directory)
+
+    def encode(
+            self,
+            frames: Iterable[np.ndarray] | np.ndarray,
+            format: str = 'h264',
+            fps: float = 25,
+            quality: QualityLiteral = 'high',
+        ) -> pathlib.Path:
+        """
+        Encode frames into the cache (see :func:`encode`). The frames are streamed to a temporary file in the cache
+        directory, that is renamed after the hash of its contents.
+
+        Returns:
+            The path of the cached file.
+        """
+        encoder_cls = _resolve_encoder(format)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(suffix=encoder_cls.extension, dir=self.directory, prefix='.')
+        os.close(fd)
+        try:
+            encode(frames, temp_path, format=format, fps=fps, quality=quality)
+            digest = hashlib.blake2b(digest_size=16)
+            with open(temp_path, 'rb') as fp:
+                for chunk in iter(functools.partial(fp.read, 1024 ** 2), b''):
+                    digest.update(chunk)
+            path = self.directory / f'{digest.hexdigest()}{encoder_cls.extension}'
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return path
+
+    def clear(self):
+        """
+        Remove all files from the cache.
+        """
+        if self.directory.is_dir():
+            for path in self.directory.iterdir():
+                if path.is_file():
+                    path.unlink()
+
+
+class _range_request_handler(http.server.SimpleHTTPRequestHandler):
+    """
+    Serve files with support for range requests, so that videos can start playing before they are fully transferred
+    (and can be seeked).
+    """
+
+    _range_pattern = re.compile(r'bytes=(\d*)-(\d*)$')
+
+    def send_head(self):
+        self._remaining = None
+        match = self._range_pattern.match(self.headers.get('Range', ''))
+        if match is None or match.groups() == ('', ''):
+            return super().send_head()
+        path = self.translate_path(self.path)
+        try:
+            fp = open(path, 'rb')
+        except OSError:
+            self.send_error(404, 'File not found')
+            return None
+
+        # Resolve the range (the end is inclusive, and the start may be omitted to request a suffix)
+        size = os.fstat(fp.fileno()).st_size
+        start, end = match.groups()
+        if start == '':
+            start, end = max(size - int(end), 0), size - 1
+        else:
+            start, end = int(start), min(int(end) if end else size - 1, size - 1)
+        if start >= size or start > end:
+            fp.close()
+            self.send_response(416)
+            self.send_header('Content-Range', f'bytes */{size}')
+            self.end_headers()
+            return None
+
+        self.send_response(206)
+        self.send_header('Content-Type', self.guess_type(path))
+        self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+        self.send_header('Content-Length', str(end - start + 1))
+        self.end_headers()
+        fp.seek(start)
+        self._remaining = end - start + 1
+        return fp
+
+    def copyfile(self, source, outputfile):
+        if self._remaining is None:
+            return super().copyfile(source, outputfile)
+        while self._remaining > 0:
+            chunk = source.read(min(self._remaining, 64 * 1024))
+            if not chunk:
+                break
+            outputfile.write(chunk)
+            self._remaining -= len(chunk)
+
+    def end_headers(self):
+        self.send_header('Accept-Ranges', 'bytes')
+        super().end_headers()
+
+    def log_message(self, *args: Any):
+        pass
+
+
+class media_server:
+    """
+    Local HTTP server, that serves the files of a :class:`media_cache` (with support for range requests). The server
+    runs on a background thread. It is only reachable by browsers that run on the same machine, unless `host` is
+    changed.
+
+    Arguments:
+        cache: The cache to serve.
+        host: Host name or IP address to listen on.
+        port: Port to listen on. If 0, a free port is chosen.
+    """
+
+    cache: media_cache
+    """
+    The served cache.
+    """
+
+    def __init__(self, cache: media_cache, host: str = '127.0.0.1', port: int = 0):
+        self.cache = cache
+        cache.directory.mkdir(parents=True, exist_ok=True)
+        handler = functools.partial(_range_request_handler, directory=str(cache.directory))
+        self._server = http.server.ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    @property
+    def port(self) -> int:
+        """
+        Port the server listens on.
+        """
+        return self._server.server_address[1]
+
+    def url(self, path: str | os.PathLike) -> str:
+        """
+        Get the URL of a file of the cache.
+        """
+        host = self._server.server_address[0]
+        return f'http://{host}:{self.port}/{pathlib.Path(path).name}'
+
+    def close(self):
+        """
+        Shut down the server.
+        """
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+
+# Default cache and server used by :func:`imshow`, created on first use
+_default_media_cache: media_cache | None = None
+_default_media_server: media_server | None = None
+_lock = threading.Lock()
+
+
+def _get_default_media_cache() -> media_cache:
+    global _default_media_cache
+    with _lock:
+        if _default_media_cache is None:
+            _default_media_cache = media_cache()
+        return _default_media_cache
+
+
+def _get_default_media_server() -> media_server:
+    global _default_media_server
+    cache = _get_default_media_cache()
+    with _lock:
+        if _default_media_server is None:
+            _default_media_server = media_server(cache)
+        return _default_media_server
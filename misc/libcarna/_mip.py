@@ -51,3 +51,15 @@ class mip(libcarna.presets.MIPStage):
             sample_rate=self.sample_rate,
             clim=None,  # uses the color limits from `cmap`
         )
+
+    def __reduce__(self):
+        return mip, (self.geometry_type,), dict(
+            enabled=self.enabled,
+            cmap=self.cmap.getstate(),
+            sample_rate=self.sample_rate,
+        )
+
+    def __setstate__(self, state: dict):
+        self.enabled = state['enabled']
+        self.cmap.setstate(state['cmap'])
+        self.sample_rate = state['sample_rate']
@@ -29,3 +29,11 @@ class opaque_renderer(libcarna.presets.OpaqueRenderingStage):
         Replicate the opaque renderer.
         """
         return opaque_renderer(self.geometry_type)
+
+    def __reduce__(self):
+        return opaque_renderer, (self.geometry_type,), dict(
+            enabled=self.enabled,
+        )
+
+    def __setstate__(self, state: dict):
+        self.enabled = state['enabled']
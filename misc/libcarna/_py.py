@@ -33,6 +33,8 @@ def _expand_module(module):
             target_name = 'mask_renderer'
         elif target_name == 'mesh_factory':
             target_name = 'meshes'
+        elif target_name == 'devices':
+            target_name = 'egl_devices'
         else:
             target_name = _replace_suffix(target_name, '_rendering_stage', '_renderer')
             if target_name != 'render_stage':
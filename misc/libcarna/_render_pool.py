@@ -0,0 +1,239 @@
+import gc
+import multiprocessing
+import multiprocessing.util
+import os
+from collections import deque
+from multiprocessing.shared_memory import SharedMemory
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+)
+
+import numpy as np
+
+import libcarna
+from ._alias import kwalias
+
+
+# State of the worker process: shared memory blocks, renderer, camera, root, animation (or `None`), and the values of
+# `t` of the frames of the animation (or `None`)
+_worker = None
+
+# Error raised while setting up the worker process (or `None`)
+_worker_error = None
+
+
+def _init_worker(
+        width: int,
+        height: int,
+        stages: list[libcarna.base.RenderStage],
+        background_color: tuple[int, int, int, int],
+        scene: Callable[..., tuple],
+        volumes: dict[str, tuple[str, tuple[int, ...], str]],
+    ):
+    """
+    Set up the renderer and build the scene in the current worker process.
+
+    Errors are not raised here, because the pool would replace the failed worker by a new one over and over again.
+    Instead, they are raised by the tasks of the worker (see :func:`_get_worker`), so that they reach the parent.
+    """
+    global _worker, _worker_error
+    shms = list()
+    multiprocessing.util.Finalize(None, _close_worker, args=(shms,), exitpriority=10)
+    try:
+        arrays = dict()
+        for key, (name, shape, dtype) in volumes.items():
+            shm = SharedMemory(name=name)
+            shms.append(shm)
+            arrays[key] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        r = libcarna.renderer(width, height, stages, background_color=libcarna.color(*background_color))
+        camera, root, *animation = scene(**arrays)
+        animation = animation[0] if len(animation) > 0 else None
+        frame_times = None if animation is None else animation.prepare()
+        _worker = (shms, r, camera, root, animation, frame_times)
+    except Exception as error:
+        _worker_error = error
+
+
+def _close_worker(shms: list[SharedMemory]):
+    """
+    Release the scene of the current worker process, and close its handles of the shared memory blocks.
+    """
+    global _worker
+    _worker = None
+    gc.collect()  # release the arrays, that use the shared memory blocks
+    for shm in shms:
+        try:
+            shm.close()
+        except BufferError:
+            pass  # the scene still uses the shared memory, it is released when the worker exits
+
+
+def _get_worker() -> tuple:
+    """
+    Get the state of the current worker process, or raise the error that occurred while setting it up.
+    """
+    if _worker_error is not None:
+        raise _worker_error
+    return _worker
+
+
+def _frame_count() -> int:
+    """
+    Get the number of frames of the animation in the current worker process.
+    """
+    animation = _get_worker()[4]
+    return 1 if animation is None else animation.n_frames
+
+
+def _render_frames(frames: range) -> list[np.ndarray]:
+    """
+    Render a range of frames in the current worker process.
+    """
+    _, r, camera, root, animation, frame_times = _get_worker()
+    if animation is None:
+        return [r.render(camera, root) for _ in frames]
+    rendered_frames = list()
+    for frame_idx in frames:
+        t = frame_times[frame_idx]
+        for step in animation.step_functions:
+            step(t)
+        rendered_frames.append(r.render(camera, root))
+    return rendered_frames
+
+
+class render_pool:
+    """
+    Render frames in parallel, using multiple worker processes that each use their own :class:`egl_context`.
+
+    Scene graphs cannot be transferred to other processes, so each worker builds its own replica of the scene by
+    calling `scene`. The volume arrays are transferred to the workers via shared memory, so they are not copied for
+    each of the workers. The stages are transferred by pickling them (this is supported by all stages of the
+    :mod:`libcarna` namespace, like :class:`dvr` and :class:`mip`).
+
+    Arguments:
+        width: Horizontal rendering resolution.
+        height: Vertical rendering resolution.
+        stages: List of stages to be added to the renderers of the workers.
+        scene: Function that builds the scene. It is called in each worker, using the arrays from `volumes` as keyword
+            arguments, and must return a tuple `(camera, root)`, or `(camera, root, animation)` where `animation` is an
+            :class:`animate` object. The function must be picklable, i.e. it must be defined at module level.
+        volumes: Arrays to be transferred to the workers via shared memory.
+        workers: Number of worker processes. Defaults to the number of CPUs.
+        background_color: Background color of the surface (aliases: `bgcolor`, `bgc`).
+
+    Example:
+
+        .. code-block:: python
+
+            def scene(data):
+                root = libcarna.node()
+                libcarna.volume(2, data, parent=root, spacing=(1, 1, 2))
+                camera = libcarna.camera(parent=root).frustum(fov=90, z_near=1, z_far=500).translate(z=100)
+                return camera, root, libcarna.animate(libcarna.animate.rotate_local(camera), n_frames=100)
+
+            with libcarna.render_pool(800, 600, [libcarna.mip(2)], scene, volumes=dict(data=data)) as pool:
+                frames = list(pool.render())
+    """
+
+    width: int
+    """
+    Horizontal rendering resolution.
+    """
+
+    height: int
+    """
+    Vertical rendering resolution.
+    """
+
+    workers: int
+    """
+    Number of worker processes.
+    """
+
+    @kwalias('background_color', 'bgcolor', 'bgc')
+    def __init__(
+            self,
+            width: int,
+            height: int,
+            stages: Iterable[libcarna.base.RenderStage],
+            scene: Callable[..., tuple],
+            *,
+            volumes: dict[str, np.ndarray] | None = None,
+            workers: int | None = None,
+            background_color: libcarna.color = libcarna.color.BLACK_NO_ALPHA,
+        ):
+        self.width = width
+        self.height = height
+        self.workers = workers or os.cpu_count()
+        assert self.workers > 0, f'Number of workers must be positive, got {self.workers}'
+
+        # Copy the volumes to shared memory
+        self._shms = list()
+        shared_volumes = dict()
+        for key, array in (volumes or dict()).items():
+            array = np.asarray(array)
+            shm = SharedMemory(create=True, size=max(array.nbytes, 1))
+            self._shms.append(shm)
+            np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+            shared_volumes[key] = (shm.name, array.shape, array.dtype.str)
+
+        # Start the workers (use "spawn", because EGL does not support being forked)
+        self._pool = multiprocessing.get_context('spawn').Pool(
+            self.workers,
+            initializer=_init_worker,
+            initargs=(
+                width,
+                height,
+                list(stages),
+                (background_color.r, background_color.g, background_color.b, background_color.a),
+                scene,
+                shared_volumes,
+            ),
+        )
+
+    def render(self, chunk_size: int = 1, queue_size: int | None = None) -> Iterable[np.ndarray]:
+        """
+        Render the frames of the animation (or a single frame, if the scene has no animation). The frames are yielded
+        in order.
+
+        The frames are distributed to the workers in ranges of consecutive frames. At most `queue_size` ranges are
+        pending at a time, so that the memory used by frames, that were rendered ahead of being consumed, is bounded.
+
+        Arguments:
+            chunk_size: Number of consecutive frames that are rendered by a worker at once. Larger values reduce the
+                communication overhead, smaller values improve load balancing.
+            queue_size: Maximum number of pending frame ranges. Defaults to twice the number of workers.
+        """
+        assert chunk_size > 0, f'chunk_size must be positive, got {chunk_size}'
+        queue_size = queue_size or 2 * self.workers
+        assert queue_size > 0, f'queue_size must be positive, got {queue_size}'
+        n_frames = self._pool.apply(_frame_count)
+        chunks = iter(range(start, min(start + chunk_size, n_frames)) for start in range(0, n_frames, chunk_size))
+        pending = deque()
+        for chunk in chunks:
+            pending.append(self._pool.apply_async(_render_frames, (chunk,)))
+            if len(pending) >= queue_size:
+                yield from pending.popleft().get()
+        while pending:
+            yield from pending.popleft().get()
+
+    def close(self):
+        """
+        Shut down the workers and release the shared memory.
+        """
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+        for shm in self._shms:
+            shm.close()
+            shm.unlink()
+        self._shms.clear()
+
+    def __enter__(self) -> 'render_pool':
+        return self
+
+    def __exit__(self, *args: Any):
+        self.close()
@@ -1,9 +1,21 @@
+import contextlib
+import time
+from collections import OrderedDict
 from typing import Iterable
 
 import numpy as np
 
 import libcarna
 from ._alias import kwalias
+from ._frame_cache import (
+    _scene_key,
+    frame_cache,
+)
+from ._timing import (
+    frame_stats,
+    timing_stats,
+)
+from ._trace import span
 
 
 class renderer:
@@ -15,8 +27,23 @@ class renderer:
         height: Vertical rendering resolution.
         stages: List of stages to be added to the frame renderer.
         background_color: Background color of the surface (aliases: `bgcolor`, `bgc`).
-        gl_context: OpenGL context to be used for rendering (alias: `ctx`). If `None`, a new :class:`egl_context` will
-            be created.
+        gl_context: OpenGL context to be used for rendering (alias: `ctx`). If `None`, the
+            :func:`default_egl_context` of the calling thread is used, so that renderers share volume textures and
+            shader programs.
+        max_surfaces: Maximum number of surfaces that are kept for rendering at different resolutions (see
+            :meth:`resize`). If more resolutions are used, the least recently used surfaces are released.
+        supersampling: Factor, by which the resolution used for rendering is larger than the resolution of the
+            rendered images (alias: `ss`). The rendered images are downsampled on the GPU, which reduces aliasing
+            artifacts (e.g., jagged mesh edges and stair-step artifacts of volume renderings) at the cost of
+            rendering more pixels. Must be a power of two (e.g., 2 or 4), so that each image pixel is the exact
+            average of the rendered pixels. Note that line widths are specified in rendered pixels, so lines become
+            thinner with supersampling.
+        cache: Cache of rendered frames. If not `None`, frames that are already in the cache are not rendered again.
+            Only stages from the :mod:`libcarna` namespace (e.g., :class:`dvr`, :class:`mip`) support caching.
+        timing: If `True`, the GPU time of each stage and the time of the read back are measured for each rendered
+            frame (see :attr:`last_frame_stats` and :attr:`timing_stats`). OpenGL timer queries are only issued if
+            this is enabled. The :attr:`~libcarna.base.RenderStage.timing` of the stages is only enabled while they
+            are rendered by this renderer.
     """
 
     width: int
@@ -34,8 +61,44 @@ class renderer:
     OpenGL context used for rendering.
     """
 
+    stages: list[libcarna.base.RenderStage]
+    """
+    Stages used for rendering.
+    """
+
+    background_color: libcarna.color
+    """
+    Background color of the surface.
+    """
+
+    supersampling: int
+    """
+    Factor, by which the resolution used for rendering is larger than the resolution of the rendered images.
+    """
+
+    cache: frame_cache | None
+    """
+    Cache of rendered frames (or `None`, if caching is disabled).
+    """
+
+    timing: bool
+    """
+    Whether the timings of the rendered frames are measured.
+    """
+
+    last_frame_stats: frame_stats | None
+    """
+    Timings of the most recently rendered frame (or `None`, if timing is disabled or no frame was rendered yet).
+    """
+
+    timing_stats: timing_stats
+    """
+    Rolling aggregates of the timings of the most recently rendered frames.
+    """
+
     @kwalias('background_color', 'bgcolor', 'bgc')
     @kwalias('gl_context', 'ctx')
+    @kwalias('supersampling', 'ss')
     def __init__(
             self,
             width: int,
@@ -43,40 +106,232 @@ class renderer:
             stages: Iterable[libcarna.base.RenderStage],
             background_color: libcarna.color = libcarna.color.BLACK_NO_ALPHA,
             gl_context: libcarna.gl_context | None = None,
+            *,
+            max_surfaces: int = 4,
+            supersampling: int = 1,
+            cache: frame_cache | None = None,
+            timing: bool = False,
         ):
-        self.gl_context = gl_context or libcarna.egl_context()
-        surface = libcarna.surface(self.gl_context, width, height)
-        frame_renderer = libcarna.frame_renderer(self.gl_context, surface.width, surface.height)
-        frame_renderer.set_background_color(background_color)
+        assert max_surfaces > 0, f'max_surfaces must be positive, got {max_surfaces}'
+        assert supersampling >= 1, f'supersampling must be at least 1, got {supersampling}'
+        assert supersampling & (supersampling - 1) == 0, f'supersampling must be a power of two, got {supersampling}'
+        self.gl_context = gl_context or libcarna.default_egl_context()
+        self.width = width
+        self.height = height
+        self.max_surfaces = max_surfaces
+        self.supersampling = supersampling
+        self.stages = list(stages)
+        self.background_color = background_color
+        self.cache = cache
+        self.timing = timing
+        self.last_frame_stats = None
+        self.timing_stats = timing_stats()
+        if timing:
+            with self._stage_timing():
+                pass  # fail early, if a stage does not support timing
+
+        # The frame renderer is private, because it must always be shaped like the surface that is rendered to
+        self._surfaces = OrderedDict()
+        self._frame_renderer = libcarna.frame_renderer(
+            self.gl_context,
+            width * supersampling,
+            height * supersampling,
+        )
+        self._frame_renderer.set_background_color(background_color)
 
         # Add stages to the frame renderer
         renderer_helper = None
-        for stage in stages:
+        for stage in self.stages:
             if renderer_helper is None:
-                renderer_helper = libcarna.frame_renderer_helper(frame_renderer)
+                renderer_helper = libcarna.frame_renderer_helper(self._frame_renderer)
             renderer_helper.add_stage(stage)
         if renderer_helper is not None:
             renderer_helper.commit()
 
-        # Build method for rendering, that hides the frame renderer (so that it cannot be reshaped, because this would
-        # require a new surface)
-        def render(camera: libcarna.base.Camera, root: libcarna.base.Node | None = None) -> np.ndarray:
-
-            # Update camera projection matrix to fit the aspect ratio of the surface
-            if hasattr(camera, 'update_projection'):
-                camera.update_projection(surface.width, surface.height)
-
-            # Perform the rendering
-            surface.begin()
-            frame_renderer.render(camera, root)
-            return surface.end()
-
-        self.render = render
+    def resize(self, width: int, height: int):
+        """
+        Change the rendering resolution. The stages and the OpenGL context are kept. Surfaces of recently used
+        resolutions are kept too, so that switching back and forth between resolutions is cheap.
+        """
         self.width = width
         self.height = height
 
-    def render(self, camera: libcarna.base.Camera, root: libcarna.base.Node | None = None) -> np.ndarray:
+    def _surface(self, width: int, height: int) -> libcarna.surface:
+        """
+        Get the surface for the given resolution, and shape the frame renderer accordingly.
+        """
+        surface = self._surfaces.pop((width, height), None)
+        if surface is None:
+            surface = libcarna.surface(self.gl_context, width, height, self.supersampling)
+            while len(self._surfaces) >= self.max_surfaces:
+                self._surfaces.popitem(last=False)
+        self._surfaces[(width, height)] = surface
+
+        # Reshape the frame renderer if the resolution has changed since the last rendering
+        render_size = (surface.render_width, surface.render_height)
+        if (self._frame_renderer.width, self._frame_renderer.height) != render_size:
+            self._frame_renderer.reshape(*render_size)
+        return surface
+
+    def render(
+            self,
+            camera: libcarna.base.Camera,
+            root: libcarna.base.Node | None = None,
+            *,
+            size: tuple[int, int] | None = None,
+        ) -> np.ndarray:
         """
         Render scene `root` from `camera` point of view to a NumPy array.
+
+        Arguments:
+            camera: The camera to render the scene from.
+            root: The root node of the scene. If `None`, the root of the scene graph of `camera` is used.
+            size: Resolution `(width, height)` to be used for this rendering only. If `None`, the resolution of the
+                renderer is used (see :meth:`resize`).
+        """
+        width, height = size or (self.width, self.height)
+
+        # Update camera projection matrix to fit the aspect ratio of the surface
+        if hasattr(camera, 'update_projection'):
+            with span('renderer.projection'):
+                camera.update_projection(width, height)
+
+        # Look up the frame in the cache
+        cache_key = None
+        if self.cache is not None:
+            with span('renderer.cache'):
+                cache_key = self._frame_key(camera, root, width, height)
+                frame = None if cache_key is None else self.cache.get(cache_key)
+            if frame is not None:
+                return frame
+
+        # Perform the rendering
+        surface = self._surface(width, height)
+        if self.timing:
+            frame = self._render_timed(surface, camera, root)
+        else:
+            with span('renderer.render', width=width, height=height):
+                surface.begin()
+                self._frame_renderer.render(camera, root)
+            with span('renderer.readback'):
+                frame = surface.end()
+
+        # Put the frame into the cache
+        if cache_key is not None:
+            self.cache.put(cache_key, frame)
+        return frame
+
+    def frame_key(
+            self,
+            camera: libcarna.base.Camera,
+            root: libcarna.base.Node | None = None,
+            *,
+            size: tuple[int, int] | None = None,
+        ) -> bytes | None:
+        """
+        Compute a key that identifies the frame, that would be rendered by :meth:`render` with the same arguments. Two
+        frames with the same key are identical (see :class:`frame_cache` for what is taken into account). Returns
+        `None` if a key cannot be computed, because some stage does not support it.
+
+        The geometry features of the scene (e.g., meshes and volume textures) are kept alive as long as the key is
+        referenced, so that features created later are not mistaken for them.
+        """
+        width, height = size or (self.width, self.height)
+        if hasattr(camera, 'update_projection'):
+            camera.update_projection(width, height)
+        return self._frame_key(camera, root, width, height)
+
+    def _frame_key(
+            self,
+            camera: libcarna.base.Camera,
+            root: libcarna.base.Node | None,
+            width: int,
+            height: int,
+        ) -> bytes | None:
+        background_color = self.background_color
+        return _scene_key(
+            camera,
+            root,
+            self.stages,
+            width,
+            height,
+            self.supersampling,
+            (background_color.r, background_color.g, background_color.b, background_color.a),
+        )
+
+    def warmup(self, root: libcarna.base.Node, camera: libcarna.base.Camera | None = None):
+        """
+        Prepare the rendering of scene `root` at the current resolution, so that the first call of :meth:`render` is
+        not slower than the following ones. This compiles the shader programs of the stages, uploads the volume
+        textures to the GPU, and sets up the surface and the off-screen buffers of the stages. The rendered frame is
+        discarded, and it is neither put into the :attr:`cache` nor included in the :attr:`timing_stats`.
+
+        Compiled shader programs are shared by all renderers of the same :attr:`gl_context` (and contexts sharing
+        objects with it, see :func:`default_egl_context`), as long as any of them is alive.
+
+        Arguments:
+            root: The root node of the scene.
+            camera: The camera to render the scene from. If `None`, a temporary camera is attached to `root`.
+        """
+        with span('renderer.warmup', width=self.width, height=self.height):
+            temporary_camera = None
+            if camera is None:
+                camera = temporary_camera = libcarna.camera(parent=root).frustum(fov=90, z_near=1e-3, z_far=1e6)
+            try:
+                if hasattr(camera, 'update_projection'):
+                    camera.update_projection(self.width, self.height)
+                surface = self._surface(self.width, self.height)
+                with self._stage_timing() if self.timing else contextlib.nullcontext():
+                    surface.begin()
+                    self._frame_renderer.render(camera, root)
+                    surface.end()
+            finally:
+                if temporary_camera is not None:
+                    temporary_camera.detach_from_parent()
+
+            # Discard the timings of the warm-up frame
+            if self.timing:
+                for stage in self.stages:
+                    stage.collect_gpu_time()
+
+    @contextlib.contextmanager
+    def _stage_timing(self):
+        """
+        Enable the timing of the stages, and restore the previous setting afterwards, so that the stages passed by the
+        caller are left as they were.
+        """
+        previous = [stage.timing for stage in self.stages]
+        try:
+            for stage in self.stages:
+                stage.timing = True
+            yield
+        finally:
+            for stage, timing in zip(self.stages, previous):
+                stage.timing = timing
+
+    def _render_timed(
+            self,
+            surface: libcarna.surface,
+            camera: libcarna.base.Camera,
+            root: libcarna.base.Node | None,
+        ) -> np.ndarray:
+        """
+        Render a frame and measure the timings.
         """
-        ...
+        with self._stage_timing():
+            t0 = time.perf_counter()
+            with span('renderer.render', width=surface.width, height=surface.height):
+                surface.begin()
+                self._frame_renderer.render(camera, root)
+            t1 = time.perf_counter()
+            with span('renderer.readback'):
+                frame = surface.end()
+            t2 = time.perf_counter()
+            gpu_times = [stage.collect_gpu_time() for stage in self.stages]
+        self.last_frame_stats = frame_stats(
+            stages=gpu_times,
+            render=(t1 - t0) * 1000,
+            readback=(t2 - t1) * 1000,
+        )
+        self.timing_stats.add(self.last_frame_stats)
+        return frame
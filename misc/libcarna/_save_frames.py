@@ -0,0 +1,146 @@
+import os
+import pathlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable
+
+import numpy as np
+from PIL import Image
+
+from ._trace import span
+
+
+def _npy_header(dtype: np.dtype, shape: tuple[int, ...], header_size: int | None = None) -> bytes:
+    """
+    Create the header of an ``.npy`` file (format version 1.0). If `header_size` is given, the header is padded to
+    that size, so that it can be replaced by a header with a different shape later.
+    """
+    header = repr(dict(descr=np.lib.format.dtype_to_descr(dtype), fortran_order=False, shape=shape))
+    prefix_size = len(np.lib.format.MAGIC_PREFIX) + 2 + 2  # magic string, version, and header length
+    if header_size is None:
+        header_size = prefix_size + len(header) + 1
+        header_size += -header_size % 64
+    padding = header_size - prefix_size - len(header) - 1
+    assert padding >= 0, f'Header exceeds {header_size} bytes'
+    header = (header + ' ' * padding + '\n').encode('latin1')
+    return np.lib.format.MAGIC_PREFIX + bytes([1, 0]) + len(header).to_bytes(2, 'little') + header
+
+
+def _save_npy(frames: Iterable[np.ndarray], path: pathlib.Path, n_frames: int | None) -> int:
+    """
+    Write frames into a `(T, H, W, C)` array in an ``.npy`` file.
+    """
+    frames = iter(frames)
+    first_frame = next(frames, None)
+    assert first_frame is not None, 'No frames to save'
+    first_frame = np.asarray(first_frame)
+
+    # Preallocate a memory-mapped array, if the number of frames is known in advance
+    if n_frames is not None:
+        shape = (n_frames,) + first_frame.shape
+        cube = np.lib.format.open_memmap(path, mode='w+', dtype=first_frame.dtype, shape=shape)
+        frame_count = 0
+        for frame_idx, frame in enumerate(_chain(first_frame, frames)):
+            frame = np.asarray(frame)
+            if frame_idx >= n_frames:
+                raise ValueError(f'Expected {n_frames} frames, got more')
+            _check_shape(frame, first_frame)
+            with span('save_frames.npy', frame=frame_idx):
+                cube[frame_idx] = frame
+            frame_count += 1
+        if frame_count != n_frames:
+            raise ValueError(f'Expected {n_frames} frames, got {frame_count}')
+        cube.flush()
+        del cube
+        return frame_count
+
+    # Otherwise, append the frames and write the final shape to the header, when all frames are written (the header
+    # is reserved for the largest possible number of frames)
+    header_size = len(_npy_header(first_frame.dtype, (np.iinfo(np.int64).max,) + first_frame.shape))
+    frame_count = 0
+    with open(path, 'wb') as fp:
+        fp.write(b'\0' * header_size)
+        for frame_idx, frame in enumerate(_chain(first_frame, frames)):
+            frame = np.asarray(frame)
+            _check_shape(frame, first_frame)
+            with span('save_frames.npy', frame=frame_idx):
+                fp.write(np.ascontiguousarray(frame, dtype=first_frame.dtype).tobytes())
+            frame_count += 1
+        fp.seek(0)
+        fp.write(_npy_header(first_frame.dtype, (frame_count,) + first_frame.shape, header_size))
+    return frame_count
+
+
+def _check_shape(frame: np.ndarray, first_frame: np.ndarray):
+    if frame.shape != first_frame.shape:
+        raise ValueError(f'Frame shape {frame.shape} differs from the shape of the first frame {first_frame.shape}')
+
+
+def _chain(first: np.ndarray, rest: Iterable[np.ndarray]) -> Iterable[np.ndarray]:
+    yield first
+    yield from rest
+
+
+def _save_image(frame: np.ndarray, path: str, frame_idx: int, compress_level: int):
+    with span('save_frames.image', frame=frame_idx):
+        image = Image.fromarray(np.asarray(frame))
+        if path.lower().endswith('.png'):
+            image.save(path, compress_level=compress_level)
+        elif path.lower().endswith('.webp'):
+            image.save(path, lossless=True, method=4)
+        else:
+            image.save(path)
+
+
+def save_frames(
+        frames: Iterable[np.ndarray] | np.ndarray,
+        path: str | os.PathLike,
+        workers: int | None = None,
+        n_frames: int | None = None,
+        compress_level: int = 6,
+    ) -> int:
+    """
+    Save frames (e.g., from :meth:`animate.render`) as an image sequence, or as a `(T, H, W, C)` array in an ``.npy``
+    file, while the next frames are being rendered.
+
+    Images are compressed by a pool of threads, and at most two frames per thread are kept in memory. An ``.npy`` file
+    is preallocated and memory-mapped if the number of frames is known in advance (`n_frames`, or the length of
+    `frames`), so that it can be read by :func:`numpy.load` with `mmap_mode` (e.g., by other tools) while it is
+    written. Otherwise, the frames are appended to the file, and the shape is written when all frames are written.
+
+    Arguments:
+        frames: Iterable of frames, or a `(T, H, W, C)` array.
+        path: Path of the ``.npy`` file, or a pattern of the image paths, that is formatted with the index of the
+            frame (e.g., ``'frames/{:04d}.png'``). The file format of the images is determined by the extension (e.g.,
+            ``.png``, ``.webp``, or any other format supported by Pillow). WebP images are saved without loss.
+        workers: Number of threads used for compressing images. Defaults to the number of CPUs.
+        n_frames: The number of frames, if known in advance (only used for ``.npy`` files).
+        compress_level: The compression level of PNG images (0-9). Lower levels are faster, but yield larger files.
+
+    Returns:
+        The number of saved frames.
+    """
+    path = str(path)
+    if n_frames is None and hasattr(frames, '__len__'):
+        n_frames = len(frames)
+    if path.lower().endswith('.npy'):
+        return _save_npy(frames, pathlib.Path(path), n_frames)
+
+    assert path.format(0) != path, f'The path of the images must contain a placeholder for the frame index: {path}'
+    workers = workers or os.cpu_count()
+    assert workers > 0, f'Number of workers must be positive, got {workers}'
+    frame_count = 0
+    pending = deque()
+    with ThreadPoolExecutor(workers) as executor:
+        for frame_idx, frame in enumerate(frames):
+            frame_path = path.format(frame_idx)
+            pathlib.Path(frame_path).parent.mkdir(parents=True, exist_ok=True)
+            pending.append(executor.submit(_save_image, frame, frame_path, frame_idx, compress_level))
+            frame_count += 1
+
+            # Limit the number of frames kept in memory
+            while len(pending) >= 2 * workers:
+                pending.popleft().result()
+        while pending:
+            pending.popleft().result()
+    return frame_count
@@ -0,0 +1,56 @@
+import os
+
+
+def driver_shader_cache(path: str, max_size: str = '1G') -> dict[str, str]:
+    """
+    Set defaults for the environment variables, that configure the on-disk shader cache of the OpenGL driver, so that
+    new processes (e.g., the workers of a :class:`render_pool`) can load the compiled shader programs of the stages
+    (e.g., :class:`dvr`, :class:`mip`, :class:`drr`) from `path` instead of compiling them. This matters most with
+    software rendering (llvmpipe), where shader compilation is expensive.
+
+    This function does not cache program binaries itself, it only points the cache of the driver to `path`. Mesa
+    drivers cache shaders by default (usually in ``~/.cache/mesa_shader_cache``), so this is mainly useful if that
+    directory does not persist between processes (e.g., in containers), or if a cache directory should be shared by
+    several machines. NVIDIA drivers use the directory too. The cache entries are keyed by the driver (including its
+    version) and the hash of the shader sources.
+
+    Environment variables that are already set (e.g., by the user) are left unchanged. The variables are read when the
+    driver is loaded, so this function must be called before the first OpenGL context is created. They are inherited
+    by child processes.
+
+    The defaults can also be set without changing any code, by setting the environment variable
+    ``LIBCARNA_PYTHON_SHADER_CACHE`` to the cache directory.
+
+    Arguments:
+        path: Directory of the cache. It is created if it does not exist.
+        max_size: Maximum size of the cache (e.g., `'512M'` or `'1G'`). Only supported by Mesa drivers.
+
+    Returns:
+        The values of the configuring environment variables (including those set by the user before).
+    """
+    path = os.path.abspath(os.path.expanduser(path))
+    os.makedirs(path, exist_ok=True)
+    defaults = {
+
+        # Mesa (the older variable names are used by Mesa before 21.x)
+        'MESA_SHADER_CACHE_DISABLE': 'false',
+        'MESA_SHADER_CACHE_DIR': path,
+        'MESA_SHADER_CACHE_MAX_SIZE': max_size,
+        'MESA_GLSL_CACHE_DISABLE': 'false',
+        'MESA_GLSL_CACHE_DIR': path,
+        'MESA_GLSL_CACHE_MAX_SIZE': max_size,
+
+        # NVIDIA
+        '__GL_SHADER_DISK_CACHE': '1',
+        '__GL_SHADER_DISK_CACHE_PATH': path,
+    }
+    return {key: os.environ.setdefault(key, value) for key, value in defaults.items()}
+
+
+def _shader_cache_from_environ():
+    """
+    Set the defaults of the driver shader cache if the environment variable ``LIBCARNA_PYTHON_SHADER_CACHE`` is set.
+    """
+    path = os.environ.get('LIBCARNA_PYTHON_SHADER_CACHE', '')
+    if path:
+        driver_shader_cache(path)
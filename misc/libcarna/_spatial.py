@@ -3,6 +3,7 @@ import numpy as np
 import libcarna
 from ._alias import kwalias
 from ._axes import AxisHint, resolve_axis_hint
+from ._trace import span
 from ._transform import transform
 from ._typing import (
     Literal,
@@ -23,6 +24,8 @@ def _transform_into_local(target: libcarna.base.Spatial, rhs: libcarna.base.Spat
 
 class _spatial_mixin:
 
+    __slots__ = ()
+
     @kwalias('degrees', 'deg')
     @staticmethod
     def rotation(axis: AxisHint, degrees: float) -> np.ndarray:
@@ -140,6 +143,67 @@ def _setup_spatial(spatial, parent: libcarna.base.Node | None = None, **kwargs):
         setattr(spatial, key, value)
 
 
+# The classes of the spatial objects declare their state as slots, but also a `__dict__`, so that arbitrary attributes
+# can be set (e.g., through the `**kwargs` of the factories). The `__dict__` is only created when such an attribute is
+# set.
+
+
+class _node(libcarna.base.Node, _spatial_mixin):
+
+    __slots__ = ('__dict__',)
+
+
+class _camera(libcarna.base.Camera, _spatial_mixin):
+
+    __slots__ = ('__dict__', 'update_projection')
+
+    def proj(self, projection: np.ndarray | Literal['frustum'], **kwargs) -> Self:
+        """
+        Set the projection matrix of the camera.
+        """
+        if isinstance(projection, np.ndarray):
+            self.projection = projection
+            self.update_projection = lambda *args, **kwargs: None
+
+        elif isinstance(projection, str) and projection == 'frustum':
+            fov_rad = libcarna.base.math.deg2rad(kwargs['fov'])
+            z_near = kwargs['z_near']
+            z_far = kwargs['z_far']
+
+            def update_projection(width: int, height: int):
+                self.projection = libcarna.base.math.frustum(fov_rad, height / width, z_near, z_far)
+
+            self.update_projection = update_projection
+
+        else:
+            raise ValueError(f'Unsupported projection type: {projection}')
+        return self
+
+    def frustum(self, fov: float, z_near: float, z_far: float) -> Self:
+        """
+        Set a projection matrix that is described by the frustum.
+        
+        Wrapper for :func:`libcarna.base.math.frustum` that ensures that the geometry of the frustum fits the
+        aspect ratio of the renderer.
+
+        Arguments:
+            fov: Field of view in degrees.
+            z_near: Near clipping plane.
+            z_far: Far clipping plane.
+        """
+        return self.proj('frustum', fov=fov, z_near=z_near, z_far=z_far)
+
+
+class _geometry(libcarna.base.Geometry, _spatial_mixin):
+
+    __slots__ = ('__dict__',)
+
+
+class _geometry_batch(libcarna.base.GeometryBatch, _spatial_mixin):
+
+    __slots__ = ('__dict__',)
+
+
 def node(tag: str | None = None, *, parent: libcarna.base.Node | None = None, **kwargs) -> libcarna.base.Node:
     """
     Create a :class:`carna.base.Node` object, that other spatial objects can be added to.
@@ -149,12 +213,7 @@ def node(tag: str | None = None, *, parent: libcarna.base.Node | None = None, **
         parent: Parent node to attach the spatial to, or `None`.
         **kwargs: Attributes to be set on the newly created object.
     """
-    class Node(libcarna.base.Node, _spatial_mixin):
-
-        def __init__(self, *args, **kwargs):
-            super().__init__(*args, **kwargs)
-
-    node = Node() if tag is None else Node(tag)
+    node = _node() if tag is None else _node(tag)
     _setup_spatial(node, parent, **kwargs)
     return node
 
@@ -168,47 +227,7 @@ def camera(tag: str | None = None, *, parent: libcarna.base.Node | None = None,
         parent: Parent node to attach the spatial to, or `None`.
         **kwargs: Attributes to be set on the newly created object.
     """
-    class Camera(libcarna.base.Camera, _spatial_mixin):
-        def __init__(self, *args, **kwargs):
-            super().__init__(*args, **kwargs)
-
-        def proj(self, projection: np.ndarray | Literal['frustum'], **kwargs) -> Self:
-            """
-            Set the projection matrix of the camera.
-            """
-            if isinstance(projection, np.ndarray):
-                self.projection = projection
-                self.update_projection = lambda *args, **kwargs: None
-
-            elif isinstance(projection, str) and projection == 'frustum':
-                fov_rad = libcarna.base.math.deg2rad(kwargs['fov'])
-                z_near = kwargs['z_near']
-                z_far = kwargs['z_far']
-
-                def update_projection(width: int, height: int):
-                    self.projection = libcarna.base.math.frustum(fov_rad, height / width, z_near, z_far)
-
-                self.update_projection = update_projection
-
-            else:
-                raise ValueError(f'Unsupported projection type: {projection}')
-            return self
-
-        def frustum(self, fov: float, z_near: float, z_far: float) -> Self:
-            """
-            Set a projection matrix that is described by the frustum.
-            
-            Wrapper for :func:`libcarna.base.math.frustum` that ensures that the geometry of the frustum fits the
-            aspect ratio of the renderer.
-
-            Arguments:
-                fov: Field of view in degrees.
-                z_near: Near clipping plane.
-                z_far: Far clipping plane.
-            """
-            return self.proj('frustum', fov=fov, z_near=z_near, z_far=z_far)
-
-    camera = Camera() if tag is None else Camera(tag)
+    camera = _camera() if tag is None else _camera(tag)
     _setup_spatial(camera, parent, **kwargs)
     return camera
 
@@ -233,12 +252,7 @@ def geometry(
         material: A material to be attached to this geometry object.
         **kwargs: Attributes to be set on the newly created object.
     """
-    class Geometry(libcarna.base.Geometry, _spatial_mixin):
-
-        def __init__(self, *args, **kwargs):
-            super().__init__(*args, **kwargs)
-
-    geometry = Geometry(geometry_type) if tag is None else Geometry(geometry_type, tag)
+    geometry = _geometry(geometry_type) if tag is None else _geometry(geometry_type, tag)
     _setup_spatial(geometry, parent, **kwargs)
     if mesh is not None:
         geometry.put_feature(libcarna.mesh_renderer.DEFAULT_ROLE_MESH, mesh)
@@ -247,6 +261,99 @@ def geometry(
     return geometry
 
 
+def geometries(
+        geometry_type: int,
+        transforms: np.ndarray,
+        tag: str | None = None,
+        *,
+        parent: libcarna.base.Node | None = None,
+        mesh: libcarna.base.GeometryFeature | None = None,
+        material: libcarna.base.Material | None = None,
+        **kwargs,
+    ) -> libcarna.base.GeometryBatch:
+    """
+    Create many geometry objects at once (e.g., markers), that share the same mesh and material. The geometries are
+    created by a single native call, and attached to a container node, that is returned. The geometries are not
+    exposed as individual objects, but their local transforms can be read and updated at once, using the
+    `local_transforms` property of the container node (an `(N, 4, 4)` array).
+
+    Arguments:
+        geometry_type: The type of the geometries.
+        transforms: The local transforms of the geometries, relative to the container node (an `(N, 4, 4)` array).
+        tag: An arbitrary string, that helps identifying the container node.
+        parent: Parent node to attach the container node to, or `None`.
+        mesh: A mesh to be attached to each geometry object.
+        material: A material to be attached to each geometry object.
+        **kwargs: Attributes to be set on the container node.
+
+    Example:
+
+        .. code-block:: python
+
+            positions = np.random.uniform(-50, 50, size=(10_000, 3))
+            transforms = np.tile(np.eye(4), (len(positions), 1, 1))
+            transforms[:, :3, 3] = positions
+            markers = libcarna.geometries(GEOMETRY_TYPE_OPAQUE, transforms, parent=root, mesh=ball, material=red)
+
+            # Move all markers at once
+            transforms[:, :3, 3] += 1
+            markers.local_transforms = transforms
+    """
+    transforms = np.asarray(transforms, dtype=np.float32)
+    assert transforms.ndim == 3 and transforms.shape[1:] == (4, 4), 'Transforms must be an (N, 4, 4) array.'
+    features = dict()
+    if mesh is not None:
+        features[libcarna.mesh_renderer.DEFAULT_ROLE_MESH] = mesh
+    if material is not None:
+        features[libcarna.mesh_renderer.DEFAULT_ROLE_MATERIAL] = material
+    with span('geometries.create', count=len(transforms)):
+        if tag is None:
+            batch = _geometry_batch(geometry_type, transforms, features)
+        else:
+            batch = _geometry_batch(geometry_type, transforms, features, tag)
+    _setup_spatial(batch, parent, **kwargs)
+    return batch
+
+
+class _volume_node(libcarna.base.Node, _spatial_mixin):
+
+    __slots__ = ('__dict__', 'extent', 'spacing', 'histogram', '_shape', '_raw2norm', '_norm2raw', '_dtype')
+
+    def transform_into_voxels_from(self, rhs: libcarna.base.Spatial) -> np.ndarray:
+        """
+        Compute the transformation from the local coordinate system of a spatial object `rhs` into the voxel
+        coordinate system of this volume.
+        """
+        return transform(
+            libcarna.base.math.scaling(np.subtract(self._shape, 1) / self.extent) @
+            libcarna.base.math.translation(self.extent / 2) @
+            self.transform_from(rhs).mat
+        )
+
+    def transform_from_voxels_into(self, lhs: libcarna.base.Spatial) -> np.ndarray:
+        """
+        Compute the transformation from the voxel coordinate system of this volume into the local coordinate system
+        of a spatial object `lhs`.
+        """
+        return transform(np.linalg.inv(self.transform_into_voxels_from(lhs).mat))
+
+    def normalized(self, array: np.ndarray) -> np.ndarray:
+        """
+        Convert raw array intensities to the normalized intensities in [0, 1] used for rendering.
+        """
+        return self._raw2norm(np.asarray(array))
+
+    def raw(self, array: np.ndarray) -> np.ndarray:
+        """
+        Convert normalized intensities in [0, 1] used for rendering to the raw array intensities.
+        """
+        return self._norm2raw(np.asarray(array)).astype(self._dtype)
+
+
+_HISTOGRAM_BINS = 256
+_HISTOGRAM_MAX_VOXELS = 2 ** 22
+
+
 def volume(
         geometry_type: int,
         array: np.ndarray,
@@ -263,6 +370,9 @@ def volume(
     Create a renderable representation of 3D data using the specified `geometry_type`, that can be put anywhere in the
     scene graph. The 3D volume is centered in the returned node.
 
+    The `histogram` attribute of the returned node is a histogram of the normalized intensities (256 bins, sampled on a
+    regular grid for large volumes), that is used for automatic transfer functions (e.g., ``dvr.cmap.auto(volume)``).
+
     Arguments:
         geometry_type: The type of the geometry.
         array: 3D data to be rendered.
@@ -274,30 +384,42 @@ def volume(
         extent: Specifies the spatial size of the whole volume. Mutually exclusive with `spacing`.
         **kwargs: Attributes to be set on the created node.
     """
-    assert array.ndim == 3, 'Array must be 3D data.'
-    assert (spacing is None) != (extent is None), 'Either spacing or extent must be provided.'
-    assert np.isnan(array).sum() == 0, 'Array must not contain NaN values.'
-    assert np.isinf(array).sum() == 0, 'Array must not contain inf values.'
+    with span('volume.validate', shape=array.shape, dtype=str(array.dtype)):
+        assert array.ndim == 3, 'Array must be 3D data.'
+        assert (spacing is None) != (extent is None), 'Either spacing or extent must be provided.'
+        assert np.isnan(array).sum() == 0, 'Array must not contain NaN values.'
+        assert np.isinf(array).sum() == 0, 'Array must not contain inf values.'
 
     # Preprocess the data based on the units
     array_dtype = array.dtype
-    match units:
-        case 'hu':
-            raw2norm = lambda array: (array + 1024) / 4095
-            norm2raw = lambda array: (array * 4095) - 1024
-            array = array.clip(-1024, +3071)
-        case 'raw':
-            array_offset = float(array.min())
-            array_factor = float(array.max() - array_offset)
-            if array_factor > 0:
-                raw2norm = lambda array: (array - array_offset) / array_factor
-                norm2raw = lambda array: (array * array_factor) + array_offset
-            else:
-                raw2norm = lambda array: np.full(fill_value=0, shape=array.shape, dtype=np.uint8)
-                norm2raw = lambda array: np.full(fill_value=array_offset, shape=array.shape, dtype=array_dtype)
-        case _:
-            raise ValueError(f'Unsupported units: "{units}"')
-    array = raw2norm(array)
+    with span('volume.normalize', units=units):
+        match units:
+            case 'hu':
+                raw2norm = lambda array: (array + 1024) / 4095
+                norm2raw = lambda array: (array * 4095) - 1024
+                array = array.clip(-1024, +3071)
+            case 'raw':
+                array_offset = float(array.min())
+                array_factor = float(array.max() - array_offset)
+                if array_factor > 0:
+                    raw2norm = lambda array: (array - array_offset) / array_factor
+                    norm2raw = lambda array: (array * array_factor) + array_offset
+                else:
+                    raw2norm = lambda array: np.full(fill_value=0, shape=array.shape, dtype=np.uint8)
+                    norm2raw = lambda array: np.full(fill_value=array_offset, shape=array.shape, dtype=array_dtype)
+            case _:
+                raise ValueError(f'Unsupported units: "{units}"')
+        array = raw2norm(array)
+
+    # Compute the histogram of the normalized intensities (used for automatic transfer functions), large volumes are
+    # sampled on a regular grid
+    with span('volume.histogram'):
+        step = max(int(np.ceil((array.size / _HISTOGRAM_MAX_VOXELS) ** (1 / 3))), 1)
+        sample = np.asarray(array[::step, ::step, ::step], np.float32)
+        histogram = np.bincount(
+            np.clip(np.round(sample.reshape(-1) * (_HISTOGRAM_BINS - 1)), 0, _HISTOGRAM_BINS - 1).astype(np.intp),
+            minlength=_HISTOGRAM_BINS,
+        )
 
     # Choose appropriate intensity component
     if array.dtype == np.uint8:
@@ -320,7 +442,8 @@ def volume(
     # Create the buffer and load the data
     volume_type = getattr(libcarna.helpers, helper_type_name)
     helper = volume_type(native_resolution=array.shape)
-    helper.load_intensities(array)
+    with span('volume.normals' if normals else 'volume.load', helper=helper_type_name):
+        helper.load_intensities(array)  # this also computes the normals, if normal mapping is used
 
     # Deduce the parameters for spacing and extent
     create_node_kwargs = dict()
@@ -334,47 +457,18 @@ def volume(
     # Create a wrapper node, so that it is safe to modify the `.local_transform` property (making such modifications
     # directly to the property of the node created by the wrapper is discouraged in the docs)
     # https://kostrykin.github.io/LibCarna/html/classLibCarna_1_1helpers_1_1VolumeGridHelper.html#ab03947088a1de662b7a468516e4b5e24
-    class WrapperNode(libcarna.base.Node, _spatial_mixin):
-
-        def __init__(self, *args, **kwargs):
-            super().__init__(*args, **kwargs)
-            self.extent  = extent
-            self.spacing = spacing
-
-        def transform_into_voxels_from(self, rhs: libcarna.base.Spatial) -> np.ndarray:
-            """
-            Compute the transformation from the local coordinate system of a spatial object `rhs` into the voxel
-            coordinate system of this volume.
-            """
-            return transform(
-                libcarna.base.math.scaling(np.subtract(array.shape, 1) / extent) @
-                libcarna.base.math.translation(extent / 2) @
-                self.transform_from(rhs).mat
-            )
-        
-        def transform_from_voxels_into(self, lhs: libcarna.base.Spatial) -> np.ndarray:
-            """
-            Compute the transformation from the voxel coordinate system of this volume into the local coordinate system
-            of a spatial object `lhs`.
-            """
-            return transform(np.linalg.inv(self.transform_into_voxels_from(lhs).mat))
-        
-        def normalized(self, array: np.ndarray) -> np.ndarray:
-            """
-            Convert raw array intensities to the normalized intensities in [0, 1] used for rendering.
-            """
-            return raw2norm(np.asarray(array))
-
-        def raw(self, array: np.ndarray) -> np.ndarray:
-            """
-            Convert normalized intensities in [0, 1] used for rendering to the raw array intensities.
-            """
-            return norm2raw(np.asarray(array)).astype(array_dtype)
-
-    wrapper_node = WrapperNode(tag) if tag is not None else WrapperNode()
+    wrapper_node = _volume_node(tag) if tag is not None else _volume_node()
+    wrapper_node.extent = extent
+    wrapper_node.spacing = spacing
+    wrapper_node.histogram = histogram
+    wrapper_node._shape = array.shape
+    wrapper_node._raw2norm = raw2norm
+    wrapper_node._norm2raw = norm2raw
+    wrapper_node._dtype = array_dtype
     _setup_spatial(wrapper_node, parent, **kwargs)
 
     # Create volume node
-    volume_node = helper.create_node(geometry_type=geometry_type, **create_node_kwargs)
+    with span('volume.create_node'):
+        volume_node = helper.create_node(geometry_type=geometry_type, **create_node_kwargs)
     wrapper_node.attach_child(volume_node)
     return wrapper_node
@@ -0,0 +1,94 @@
+from collections import deque
+
+import numpy as np
+
+
+class frame_stats:
+    """
+    Timings of a rendered frame, in milliseconds.
+
+    Arguments:
+        stages: GPU time of each stage (in the order of :attr:`renderer.stages`).
+        render: Wall-clock time spent issuing the rendering (this does not include waiting for the GPU).
+        readback: Wall-clock time spent reading the frame back from the GPU (this includes waiting for the GPU to
+            finish the rendering).
+    """
+
+    stages: list[float]
+    """
+    GPU time of each stage (in the order of :attr:`renderer.stages`).
+    """
+
+    render: float
+    """
+    Wall-clock time spent issuing the rendering (this does not include waiting for the GPU).
+    """
+
+    readback: float
+    """
+    Wall-clock time spent reading the frame back from the GPU (this includes waiting for the GPU to finish the
+    rendering).
+    """
+
+    def __init__(self, stages: list[float], render: float, readback: float):
+        self.stages = list(stages)
+        self.render = render
+        self.readback = readback
+
+    @property
+    def total(self) -> float:
+        """
+        Total wall-clock time of the frame.
+        """
+        return self.render + self.readback
+
+    def __repr__(self) -> str:
+        stages = ', '.join(f'{ms:.2f}' for ms in self.stages)
+        return f'frame_stats(stages=[{stages}], render={self.render:.2f}, readback={self.readback:.2f})'
+
+
+class timing_stats:
+    """
+    Rolling aggregates of the timings of the most recently rendered frames.
+
+    Arguments:
+        window: Number of frames to aggregate over.
+    """
+
+    def __init__(self, window: int = 100):
+        self._frames = deque(maxlen=window)
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def add(self, stats: frame_stats):
+        """
+        Add the timings of a frame (the oldest frame is dropped if the window is full).
+        """
+        self._frames.append(stats)
+
+    def _aggregate(self, func) -> frame_stats:
+        assert len(self._frames) > 0, 'No frames were rendered yet'
+        return frame_stats(
+            stages=func([stats.stages for stats in self._frames], axis=0),
+            render=func([stats.render for stats in self._frames]),
+            readback=func([stats.readback for stats in self._frames]),
+        )
+
+    def mean(self) -> frame_stats:
+        """
+        Mean timings of the frames within the window.
+        """
+        return self._aggregate(np.mean)
+
+    def max(self) -> frame_stats:
+        """
+        Maximum timings of the frames within the window.
+        """
+        return self._aggregate(np.max)
+
+    def percentile(self, q: float) -> frame_stats:
+        """
+        The `q`-th percentile of the timings of the frames within the window (e.g., `q=95`).
+        """
+        return self._aggregate(lambda values, **kwargs: np.percentile(values, q, **kwargs))
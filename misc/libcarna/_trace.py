@@ -0,0 +1,121 @@
+import atexit
+import contextlib
+import json
+import os
+import threading
+import time
+from typing import Any
+
+
+# Recorded trace events, or `None` if tracing is disabled
+_events: list[dict] | None = None
+_lock = threading.Lock()
+
+# Returned by :func:`span` if tracing is disabled, so that disabled tracing costs no more than a function call
+_null_span = contextlib.nullcontext()
+
+
+class _span:
+
+    __slots__ = ('name', 'category', 'args', 'start')
+
+    def __init__(self, name: str, category: str, args: dict):
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self) -> '_span':
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info: Any):
+        end = time.perf_counter_ns()
+        event = dict(
+            name=self.name,
+            cat=self.category,
+            ph='X',
+            ts=self.start / 1000,
+            dur=(end - self.start) / 1000,
+            pid=os.getpid(),
+            tid=threading.get_ident(),
+        )
+        if self.args:
+            event['args'] = self.args
+        with _lock:
+            if _events is not None:
+                _events.append(event)
+
+
+def span(name: str, category: str = 'libcarna', **args: Any) -> contextlib.AbstractContextManager:
+    """
+    Record a span (a "complete event" of the Chrome trace format) for the duration of the `with` block, if tracing is
+    enabled (see :class:`trace`).
+
+    Arguments:
+        name: Name of the span (e.g., `'volume.load'`).
+        category: Category of the span.
+        **args: Additional information to be recorded with the span.
+    """
+    if _events is None:
+        return _null_span
+    else:
+        return _span(name, category, args)
+
+
+def _write(path: str, events: list[dict]):
+    path = path.replace('{pid}', str(os.getpid()))  # other braces are kept as they are (unlike `str.format`)
+    with open(path, 'w') as fp:
+        json.dump(dict(traceEvents=events, displayTimeUnit='ms'), fp)
+
+
+class trace:
+    """
+    Context manager that records spans of the rendering pipeline (e.g., loading volumes, rendering, reading back, and
+    encoding frames) and writes them as a JSON file in the Chrome trace format, that can be viewed using
+    https://ui.perfetto.dev or ``chrome://tracing``.
+
+    Tracing can also be enabled for the whole lifetime of a process without changing any code, by setting the
+    environment variable ``LIBCARNA_PYTHON_TRACE`` to the output path. Since environment variables are inherited by
+    worker processes (e.g., of a :class:`render_pool`), the path can contain ``{pid}``, that is replaced by the process
+    ID.
+
+    Arguments:
+        path: Path of the JSON file to write (may contain ``{pid}``).
+
+    Example:
+
+        .. code-block:: python
+
+            with libcarna.trace('trace.json'):
+                frames = list(animation.render(r, camera))
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.events = None
+
+    def __enter__(self) -> 'trace':
+        global _events
+        with _lock:
+            self._outer_events = _events
+            self.events = _events = list()
+        return self
+
+    def __exit__(self, *exc_info: Any):
+        global _events
+        with _lock:
+            _events = self._outer_events
+            if _events is not None:
+                _events.extend(self.events)
+        _write(self.path, self.events)
+
+
+def _trace_from_environ():
+    """
+    Enable tracing if the environment variable ``LIBCARNA_PYTHON_TRACE`` is set.
+    """
+    path = os.environ.get('LIBCARNA_PYTHON_TRACE', '')
+    if path:
+        process_trace = trace(path)
+        process_trace.__enter__()
+        atexit.register(process_trace.__exit__, None, None, None)
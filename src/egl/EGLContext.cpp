@@ -6,6 +6,7 @@
 #include <EGL/eglext.h>
 #include <cstdlib>
 #include <unordered_set>
+#include <vector>
 
 // see: https://developer.nvidia.com/blog/egl-eye-opengl-visualization-without-x-server/
 
@@ -62,6 +63,55 @@ static const EGLint PBUFFER_ATTRIBS[] =
 
 
 
+// ----------------------------------------------------------------------------------
+// queryDevices
+// ----------------------------------------------------------------------------------
+
+static std::vector< EGLDeviceEXT > queryDevices()
+{
+    /* Load EGL extensions.
+     */
+    PFNEGLQUERYDEVICESEXTPROC eglQueryDevicesEXT = ( PFNEGLQUERYDEVICESEXTPROC ) eglGetProcAddress("eglQueryDevicesEXT");
+    if( eglQueryDevicesEXT == nullptr )
+    {
+        return std::vector< EGLDeviceEXT >();
+    }
+
+    /* Query EGL devices.
+     */
+    const static int MAX_DEVICES = 8;
+    EGLDeviceEXT eglDevices[ MAX_DEVICES ];
+    EGLint numDevices = 0;
+    if( eglQueryDevicesEXT( MAX_DEVICES, eglDevices, &numDevices ) != EGL_TRUE )
+    {
+        numDevices = 0;
+    }
+
+    std::stringstream msg;
+    msg << numDevices << " EGL device(s) found";
+    LibCarna::base::Log::instance().record( LibCarna::base::Log::debug, msg.str() );
+
+    return std::vector< EGLDeviceEXT >( eglDevices, eglDevices + numDevices );
+}
+
+
+
+// ----------------------------------------------------------------------------------
+// getDeviceDisplay
+// ----------------------------------------------------------------------------------
+
+static ::EGLDisplay getDeviceDisplay( EGLDeviceEXT eglDevice )
+{
+    PFNEGLGETPLATFORMDISPLAYEXTPROC eglGetPlatformDisplayEXT = ( PFNEGLGETPLATFORMDISPLAYEXTPROC ) eglGetProcAddress("eglGetPlatformDisplayEXT");
+    if( eglGetPlatformDisplayEXT == nullptr )
+    {
+        return EGL_NO_DISPLAY;
+    }
+    return eglGetPlatformDisplayEXT( EGL_PLATFORM_DEVICE_EXT, eglDevice, 0 );
+}
+
+
+
 // ----------------------------------------------------------------------------------
 // LibCarna :: egl :: EGLContext :: Details
 // ----------------------------------------------------------------------------------
@@ -69,13 +119,15 @@ static const EGLint PBUFFER_ATTRIBS[] =
 struct LibCarna::egl::EGLContext::Details
 {
     ::EGLDisplay eglDpy;
+    ::EGLConfig eglCfg;
     ::EGLSurface eglSurf;
     ::EGLContext eglCtx;
 
+    int device;
     std::string vendor;
     std::string renderer;
 
-    void selectDisplay();
+    void selectDisplay( int device );
     bool initializeDisplay();
     void activate() const;
 };
@@ -89,36 +141,36 @@ bool LibCarna::egl::EGLContext::Details::initializeDisplay()
 }
 
 
-void LibCarna::egl::EGLContext::Details::selectDisplay()
+void LibCarna::egl::EGLContext::Details::selectDisplay( int device )
 {
+    this->device = device;
+
+    /* Use the requested device, if any.
+     */
+    if( device >= 0 )
+    {
+        const std::vector< EGLDeviceEXT > eglDevices = queryDevices();
+        LIBCARNA_ASSERT_EX( device < static_cast< int >( eglDevices.size() ), "EGL device " << device << " does not exist" );
+        eglDpy = getDeviceDisplay( eglDevices[ device ] );
+        LIBCARNA_ASSERT_EX( eglDpy != EGL_NO_DISPLAY && initializeDisplay(), "EGL device " << device << " initialization failed" );
+        return;
+    }
+
     eglDpy = eglGetDisplay( EGL_DEFAULT_DISPLAY );
     if( eglDpy == EGL_NO_DISPLAY || !initializeDisplay() )
     {
         LibCarna::base::Log::instance().record( LibCarna::base::Log::warning, "EGL_DEFAULT_DISPLAY initialization failed" );
 
-        /* Load EGL extensions.
-         */
-        PFNEGLQUERYDEVICESEXTPROC eglQueryDevicesEXT = ( PFNEGLQUERYDEVICESEXTPROC ) eglGetProcAddress("eglQueryDevicesEXT");
-        PFNEGLGETPLATFORMDISPLAYEXTPROC eglGetPlatformDisplayEXT = ( PFNEGLGETPLATFORMDISPLAYEXTPROC ) eglGetProcAddress("eglGetPlatformDisplayEXT");
-
-        /* Query EGL devices.
-         */
-        const static int MAX_DEVICES = 8;
-        EGLDeviceEXT eglDevices[ MAX_DEVICES ];
-        EGLint numDevices;
-        eglQueryDevicesEXT( MAX_DEVICES, eglDevices, &numDevices );
-
-        std::stringstream msg;
-        msg << numDevices << " EGL device(s) found";
-        LibCarna::base::Log::instance().record( LibCarna::base::Log::debug, msg.str() );
-
         /* Try to get displays from the devices.
          */
-        for( unsigned int deviceIndex = 0; deviceIndex < numDevices; ++deviceIndex )
+        const std::vector< EGLDeviceEXT > eglDevices = queryDevices();
+        for( unsigned int deviceIndex = 0; deviceIndex < eglDevices.size(); ++deviceIndex )
         {
-            eglDpy = eglGetPlatformDisplayEXT( EGL_PLATFORM_DEVICE_EXT,  eglDevices[ deviceIndex ], 0 );
+            eglDpy = getDeviceDisplay( eglDevices[ deviceIndex ] );
             if( eglDpy != EGL_NO_DISPLAY && initializeDisplay() )
             {
+                this->device = deviceIndex;
+
                 std::stringstream msg;
                 msg << "Successfully initialized EGL display from device " << deviceIndex;
                 LibCarna::base::Log::instance().record( LibCarna::base::Log::debug, msg.str() );
@@ -152,28 +204,54 @@ LibCarna::egl::EGLContext::EGLContext( Details* _pimpl )
 }
 
 
-LibCarna::egl::EGLContext* LibCarna::egl::EGLContext::create()
+LibCarna::egl::EGLContext* LibCarna::egl::EGLContext::create( const EGLContext* share, int device )
 {
     using EGLContext = ::EGLContext;
     unsetenv( "DISPLAY" ); // see https://stackoverflow.com/q/67885750/1444073
 
     Details* const pimpl = new Details();
-    pimpl->selectDisplay();
-    LIBCARNA_ASSERT( pimpl->eglDpy != EGL_NO_DISPLAY );
+    ::EGLContext shareContext = EGL_NO_CONTEXT;
+    if( share != nullptr )
+    {
+        /* Objects can only be shared between contexts of the same display.
+         */
+        LIBCARNA_ASSERT_EX( device < 0 || device == share->pimpl->device, "Objects cannot be shared across EGL devices" );
+        pimpl->eglDpy = share->pimpl->eglDpy;
+        pimpl->eglCfg = share->pimpl->eglCfg;
+        pimpl->device = share->pimpl->device;
+        shareContext  = share->pimpl->eglCtx;
+
+        eglBindAPI( EGL_OPENGL_API );
+        REPORT_EGL_ERROR;
+    }
+    else
+    {
+        pimpl->selectDisplay( device );
+        LIBCARNA_ASSERT( pimpl->eglDpy != EGL_NO_DISPLAY );
 
-    eglBindAPI( EGL_OPENGL_API );
-    REPORT_EGL_ERROR;
+        eglBindAPI( EGL_OPENGL_API );
+        REPORT_EGL_ERROR;
 
-    EGLint numConfigs;
-    EGLConfig eglCfg;
-    const EGLBoolean chooseConfig = eglChooseConfig( pimpl->eglDpy, CONFIG_ATTRIBS, &eglCfg, 1, &numConfigs );
-    LIBCARNA_ASSERT( chooseConfig == EGL_TRUE );
+        EGLint numConfigs;
+        const EGLBoolean chooseConfig = eglChooseConfig( pimpl->eglDpy, CONFIG_ATTRIBS, &pimpl->eglCfg, 1, &numConfigs );
+        LIBCARNA_ASSERT( chooseConfig == EGL_TRUE );
 
-    pimpl->eglSurf = eglCreatePbufferSurface( pimpl->eglDpy, eglCfg, PBUFFER_ATTRIBS );
+        /* Share objects with any existing context of the same display.
+         */
+        for( const LibCarna::egl::EGLContext* const instance : eglContextInstances )
+        {
+            if( instance->pimpl->eglDpy == pimpl->eglDpy )
+            {
+                shareContext = instance->pimpl->eglCtx;
+                break;
+            }
+        }
+    }
+
+    pimpl->eglSurf = eglCreatePbufferSurface( pimpl->eglDpy, pimpl->eglCfg, PBUFFER_ATTRIBS );
     LIBCARNA_ASSERT( pimpl->eglSurf != EGL_NO_SURFACE );
 
-    const ::EGLContext shareContext = eglContextInstances.empty() ? EGL_NO_CONTEXT : ( *eglContextInstances.begin() )->pimpl->eglCtx;
-    pimpl->eglCtx = eglCreateContext( pimpl->eglDpy, eglCfg, shareContext, NULL );
+    pimpl->eglCtx = eglCreateContext( pimpl->eglDpy, pimpl->eglCfg, shareContext, NULL );
     LIBCARNA_ASSERT( pimpl->eglCtx != EGL_NO_CONTEXT );
 
     pimpl->activate();
@@ -211,3 +289,68 @@ const std::string& LibCarna::egl::EGLContext::renderer() const
 {
     return pimpl->renderer;
 }
+
+
+int LibCarna::egl::EGLContext::device() const
+{
+    return pimpl->device;
+}
+
+
+std::vector< LibCarna::egl::EGLContext::Device > LibCarna::egl::EGLContext::devices()
+{
+    unsetenv( "DISPLAY" ); // see https://stackoverflow.com/q/67885750/1444073
+    std::vector< Device > devices;
+
+    /* Remember the current context, so that it can be restored afterwards.
+     */
+    const ::EGLDisplay currentDpy = eglGetCurrentDisplay();
+    const ::EGLSurface currentDrawSurf = eglGetCurrentSurface( EGL_DRAW );
+    const ::EGLSurface currentReadSurf = eglGetCurrentSurface( EGL_READ );
+    const ::EGLContext currentCtx = eglGetCurrentContext();
+
+    const std::vector< EGLDeviceEXT > eglDevices = queryDevices();
+    for( unsigned int deviceIndex = 0; deviceIndex < eglDevices.size(); ++deviceIndex )
+    {
+        /* Create a temporary context to query the vendor and renderer strings (skip devices that are not usable).
+         */
+        const ::EGLDisplay eglDpy = getDeviceDisplay( eglDevices[ deviceIndex ] );
+        EGLint major, minor;
+        if( eglDpy == EGL_NO_DISPLAY || eglInitialize( eglDpy, &major, &minor ) != EGL_TRUE )
+        {
+            continue;
+        }
+        eglBindAPI( EGL_OPENGL_API );
+
+        EGLint numConfigs = 0;
+        ::EGLConfig eglCfg;
+        if( eglChooseConfig( eglDpy, CONFIG_ATTRIBS, &eglCfg, 1, &numConfigs ) != EGL_TRUE || numConfigs == 0 )
+        {
+            continue;
+        }
+
+        const ::EGLSurface eglSurf = eglCreatePbufferSurface( eglDpy, eglCfg, PBUFFER_ATTRIBS );
+        const ::EGLContext eglCtx = eglCreateContext( eglDpy, eglCfg, EGL_NO_CONTEXT, NULL );
+        if( eglSurf != EGL_NO_SURFACE && eglCtx != EGL_NO_CONTEXT && eglMakeCurrent( eglDpy, eglSurf, eglSurf, eglCtx ) == EGL_TRUE )
+        {
+            Device dev;
+            dev.index    = deviceIndex;
+            dev.vendor   = ( const char* ) glGetString( GL_VENDOR   );
+            dev.renderer = ( const char* ) glGetString( GL_RENDERER );
+            devices.push_back( dev );
+            eglMakeCurrent( eglDpy, EGL_NO_SURFACE, EGL_NO_SURFACE, EGL_NO_CONTEXT );
+        }
+        if( eglCtx  != EGL_NO_CONTEXT ) eglDestroyContext( eglDpy, eglCtx  );
+        if( eglSurf != EGL_NO_SURFACE ) eglDestroySurface( eglDpy, eglSurf );
+    }
+
+    /* Restore the previously current context.
+     */
+    if( currentCtx != EGL_NO_CONTEXT )
+    {
+        eglMakeCurrent( currentDpy, currentDrawSurf, currentReadSurf, currentCtx );
+    }
+    eglGetError(); // reset the error state
+
+    return devices;
+}
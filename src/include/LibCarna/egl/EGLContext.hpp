@@ -2,6 +2,8 @@
 
 #include <LibCarna/base/GLContext.hpp>
 #include <LibCarna/base/noncopyable.hpp>
+#include <string>
+#include <vector>
 
 namespace LibCarna
 {
@@ -27,7 +29,27 @@ class EGLContext : public base::GLContext
 
 public:
 
-    static EGLContext* create();
+    /* Describes an EGL device.
+     */
+    struct Device
+    {
+        unsigned int index;
+        std::string vendor;
+        std::string renderer;
+    };
+
+    /* Lists the EGL devices, that can be used for rendering (see \ref create).
+     */
+    static std::vector< Device > devices();
+
+    /* Creates a new EGL context. If \a share is not `nullptr`, the new context shares its objects (e.g., textures and
+     * shader programs) with \a share, and uses the same display. Otherwise, the new context shares its objects with
+     * any existing context on the same display (if there is one).
+     *
+     * If \a device is non-negative, the context is created on the EGL device with that index (see \ref devices).
+     * Otherwise, the default display is used, or the first EGL device that can be initialized.
+     */
+    static EGLContext* create( const EGLContext* share = nullptr, int device = -1 );
 
     virtual ~EGLContext();
 
@@ -35,6 +57,10 @@ public:
 
     const std::string& renderer() const;
 
+    /* Index of the EGL device, that the context was created on, or -1 if the default display is used.
+     */
+    int device() const;
+
 protected:
 
     virtual void activate() const;
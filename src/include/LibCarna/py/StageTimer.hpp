@@ -0,0 +1,112 @@
+#pragma once
+
+#include <vector>
+
+#include <LibCarna/base/GLContext.hpp>
+#include <LibCarna/base/RenderStage.hpp>
+#include <LibCarna/base/RenderTask.hpp>
+#include <LibCarna/base/Viewport.hpp>
+#include <LibCarna/base/math.hpp>
+#include <LibCarna/base/noncopyable.hpp>
+
+namespace LibCarna
+{
+
+namespace py
+{
+
+
+
+// ----------------------------------------------------------------------------------
+// StageTimer
+// ----------------------------------------------------------------------------------
+
+/* Measures the GPU time of render passes using OpenGL timer queries. Does nothing, unless \a enabled is set.
+ */
+class StageTimer
+{
+
+    NON_COPYABLE
+
+    /* Query objects, that are re-used from frame to frame.
+     */
+    std::vector< unsigned int > queries;
+
+    /* The OpenGL context, that the queries were created in (query objects are not shared between contexts).
+     */
+    const LibCarna::base::GLContext* queryContext;
+
+    /* Number of queries issued since the last call of \a collectTiming.
+     */
+    std::size_t issuedQueries;
+
+    bool running;
+
+public:
+
+    StageTimer();
+
+    virtual ~StageTimer();
+
+    bool enabled;
+
+    void beginTiming();
+
+    void endTiming();
+
+    /* Returns the GPU time of all render passes since the last call, in milliseconds. Waits for the queries, if their
+     * results are not available yet (which is never the case after a frame was read back).
+     */
+    double collectTiming();
+
+}; // StageTimer
+
+
+
+// ----------------------------------------------------------------------------------
+// TimedRenderStage
+// ----------------------------------------------------------------------------------
+
+/* Render stage, that measures the GPU time of its render passes (see \a StageTimer).
+ */
+template< typename RenderStageType >
+class TimedRenderStage : public RenderStageType, public StageTimer
+{
+
+public:
+
+    template< typename... Args >
+    explicit TimedRenderStage( Args... args );
+
+    virtual void renderPass
+        ( const LibCarna::base::math::Matrix4f& viewTransform
+        , LibCarna::base::RenderTask& rt
+        , const LibCarna::base::Viewport& vp ) override;
+
+}; // TimedRenderStage
+
+
+template< typename RenderStageType >
+template< typename... Args >
+TimedRenderStage< RenderStageType >::TimedRenderStage( Args... args )
+    : RenderStageType::RenderStageType( args... )
+{
+}
+
+
+template< typename RenderStageType >
+void TimedRenderStage< RenderStageType >::renderPass
+    ( const LibCarna::base::math::Matrix4f& viewTransform
+    , LibCarna::base::RenderTask& rt
+    , const LibCarna::base::Viewport& vp )
+{
+    beginTiming();
+    RenderStageType::renderPass( viewTransform, rt, vp );
+    endTiming();
+}
+
+
+
+}  // namespace LibCarna :: py
+
+}  // namespace LibCarna
@@ -29,7 +29,11 @@ class Surface
 
 public:
 
-    Surface( const LibCarna::py::base::GLContextView& contextView, unsigned int width, unsigned int height );
+    Surface
+        ( const LibCarna::py::base::GLContextView& contextView
+        , unsigned int width
+        , unsigned int height
+        , unsigned int supersampling = 1 );
 
     virtual ~Surface();
 
@@ -37,6 +41,15 @@ public:
 
     unsigned int height() const;
 
+    /* Factor, by which the resolution used for rendering is larger than the resolution of the surface. The rendered
+     * image is downsampled on the GPU before it is read back.
+     */
+    unsigned int supersampling() const;
+
+    unsigned int renderWidth() const;
+
+    unsigned int renderHeight() const;
+
     const std::shared_ptr< const LibCarna::py::base::GLContextView > contextView;
 
     void begin() const;
@@ -1,5 +1,9 @@
 #pragma once
 
+#include <map>
+#include <memory>
+#include <vector>
+
 #include <LibCarna/LibCarna.hpp>
 #include <LibCarna/base/Node.hpp>
 #include <LibCarna/base/Material.hpp>
@@ -197,6 +201,75 @@ public:
 
 
 
+// ----------------------------------------------------------------------------------
+// FeaturePin
+// ----------------------------------------------------------------------------------
+
+class FeaturePin
+{
+
+    /* Holds the geometry feature, so that it is not deleted while the pin exists.
+     */
+    const std::unique_ptr< LibCarna::base::Geometry > holder;
+
+public:
+
+    /* Returns the pin of a geometry feature. A new pin is created, if the feature is not pinned currently.
+     */
+    static std::shared_ptr< FeaturePin > of( LibCarna::base::GeometryFeature& geometryFeature );
+
+    explicit FeaturePin( LibCarna::base::GeometryFeature& geometryFeature );
+
+    ~FeaturePin();
+
+    /* The pinned geometry feature.
+     */
+    LibCarna::base::GeometryFeature& geometryFeature;
+
+    /* Identifies the pinned geometry feature. Unlike the address of the feature, the ID is never re-used for other
+     * features, because the feature cannot be deleted (and its address cannot be re-used) while the pin exists.
+     */
+    const std::size_t id;
+
+}; // FeaturePin
+
+
+
+// ----------------------------------------------------------------------------------
+// GeometryBatchView
+// ----------------------------------------------------------------------------------
+
+class GeometryBatchView : public NodeView
+{
+
+public:
+
+    /* Creates a node with one child geometry per local transform. The geometries are owned by the node, and they are
+     * not exposed as individual views (so that creating them does not require any per-geometry Python objects). Since
+     * the geometries cannot be reached from Python, and no other children can be attached to the node (see
+     * \a NodeView::attachChild), the geometries cannot be detached or deleted while the node exists.
+     */
+    GeometryBatchView
+        ( unsigned int geometryType
+        , const std::vector< LibCarna::base::math::Matrix4f >& localTransforms
+        , const std::map< unsigned int, std::shared_ptr< GeometryFeatureView > >& features
+        , const std::string& tag );
+
+    /* The child geometries, in the order of their local transforms.
+     */
+    std::vector< LibCarna::base::Geometry* > geometries;
+
+    /* Returns the child geometries, after verifying that the children of the node were not changed (so that the
+     * pointers are still valid).
+     */
+    const std::vector< LibCarna::base::Geometry* >& checkedGeometries();
+
+    const unsigned int geometryType;
+
+}; // GeometryBatchView
+
+
+
 // ----------------------------------------------------------------------------------
 // MaterialView
 // ----------------------------------------------------------------------------------
@@ -23,7 +23,10 @@ class EGLContextView : public LibCarna::py::base::GLContextView
 
 public:
 
-    EGLContextView();
+    /* Creates a new EGL context, that shares its objects with \a share (if it is not `nullptr`). If \a device is
+     * non-negative, the context is created on the EGL device with that index.
+     */
+    explicit EGLContextView( const EGLContextView* share = nullptr, int device = -1 );
 
     LibCarna::egl::EGLContext& eglContext() const;
 
@@ -0,0 +1,95 @@
+#include <LibCarna/py/StageTimer.hpp>
+#include <LibCarna/base/glew.hpp>
+
+using namespace LibCarna::py;
+
+
+
+// ----------------------------------------------------------------------------------
+// StageTimer
+// ----------------------------------------------------------------------------------
+
+StageTimer::StageTimer()
+    : queryContext( nullptr )
+    , issuedQueries( 0 )
+    , running( false )
+    , enabled( false )
+{
+}
+
+
+StageTimer::~StageTimer()
+{
+    /* The queries are only created during rendering, so the render stage is owned by a frame renderer, which keeps the
+     * context alive. However, another context might be current when the render stage is released, so the queries are
+     * deleted in their own context, and the current context is restored afterwards.
+     */
+    if( !queries.empty() )
+    {
+        const LibCarna::base::GLContext* previousContext = nullptr;
+        try
+        {
+            previousContext = &LibCarna::base::GLContext::current();
+        }
+        catch( const LibCarna::base::AssertionFailure& )
+        {
+            /* No context is current, so there is nothing to restore.
+             */
+        }
+        if( previousContext != queryContext )
+        {
+            queryContext->makeCurrent();
+        }
+        glDeleteQueries( static_cast< GLsizei >( queries.size() ), queries.data() );
+        if( previousContext != nullptr && previousContext != queryContext )
+        {
+            previousContext->makeCurrent();
+        }
+    }
+}
+
+
+void StageTimer::beginTiming()
+{
+    if( !enabled )
+    {
+        return;
+    }
+    if( queries.empty() )
+    {
+        queryContext = &LibCarna::base::GLContext::current();
+    }
+    if( issuedQueries == queries.size() )
+    {
+        queries.push_back( 0 );
+        glGenQueries( 1, &queries.back() );
+    }
+    glBeginQuery( GL_TIME_ELAPSED, queries[ issuedQueries ] );
+    running = true;
+}
+
+
+void StageTimer::endTiming()
+{
+    if( !running )
+    {
+        return;
+    }
+    glEndQuery( GL_TIME_ELAPSED );
+    running = false;
+    ++issuedQueries;
+}
+
+
+double StageTimer::collectTiming()
+{
+    GLuint64 nanoseconds = 0;
+    for( std::size_t queryIdx = 0; queryIdx < issuedQueries; ++queryIdx )
+    {
+        GLuint64 result = 0;
+        glGetQueryObjectui64v( queries[ queryIdx ], GL_QUERY_RESULT, &result );
+        nanoseconds += result;
+    }
+    issuedQueries = 0;
+    return nanoseconds / 1e6;
+}
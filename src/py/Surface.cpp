@@ -1,3 +1,5 @@
+#include <vector>
+
 #include <LibCarna/py/Surface.hpp>
 #include <LibCarna/base/Framebuffer.hpp>
 #include <LibCarna/base/GLContext.hpp>
@@ -30,26 +32,58 @@ static LibCarna::base::Texture< 2 >* createRenderTexture( const LibCarna::base::
 
 struct Surface::Details
 {
-    Details( const LibCarna::base::GLContext& glContext, unsigned int width, unsigned int height );
+    Details
+        ( const LibCarna::base::GLContext& glContext
+        , unsigned int width
+        , unsigned int height
+        , unsigned int supersampling );
 
     const LibCarna::base::GLContext& glContext;
+    const unsigned int width;
+    const unsigned int height;
+    const unsigned int supersampling;
     const std::size_t frameSize;
     const std::unique_ptr< unsigned char[] > frame;
     const std::unique_ptr< LibCarna::base::Texture< 2 > > renderTexture;
     const std::unique_ptr< LibCarna::base::Framebuffer > fbo;
     std::unique_ptr< LibCarna::base::Framebuffer::Binding > fboBinding;
 
+    /* Chain of framebuffers used for downsampling, if supersampling is used. Each step halves the resolution, so that
+     * linear filtering yields the average of 2x2 pixels. The last framebuffer has the resolution of the surface.
+     */
+    std::vector< std::unique_ptr< LibCarna::base::Texture< 2 > > > downsampleTextures;
+    std::vector< std::unique_ptr< LibCarna::base::Framebuffer > > downsampleFbos;
+
     void grabFrame();
 };
 
 
-Surface::Details::Details( const LibCarna::base::GLContext& glContext, unsigned int width, unsigned int height )
+Surface::Details::Details
+        ( const LibCarna::base::GLContext& glContext
+        , unsigned int width
+        , unsigned int height
+        , unsigned int supersampling )
     : glContext( glContext )
+    , width( width )
+    , height( height )
+    , supersampling( supersampling )
     , frameSize( width * height * 3 )
     , frame( new unsigned char[ frameSize ] )
     , renderTexture( createRenderTexture( glContext ) )
-    , fbo( new LibCarna::base::Framebuffer( width, height, *renderTexture ) )
+    , fbo( new LibCarna::base::Framebuffer( width * supersampling, height * supersampling, *renderTexture ) )
 {
+    LIBCARNA_ASSERT_EX( supersampling >= 1, "Supersampling factor must be at least 1." );
+    LIBCARNA_ASSERT_EX(
+        ( supersampling & ( supersampling - 1 ) ) == 0,
+        "Supersampling factor must be a power of two (other factors cannot be downsampled by exact averages)." );
+    for( unsigned int factor = supersampling; factor > 1; )
+    {
+        factor /= 2;
+        downsampleTextures.emplace_back( createRenderTexture( glContext ) );
+        downsampleFbos.emplace_back(
+            new LibCarna::base::Framebuffer( width * factor, height * factor, *downsampleTextures.back() )
+        );
+    }
 }
 
 
@@ -57,8 +91,23 @@ void Surface::Details::grabFrame()
 {
     glContext.makeCurrent();
 
+    /* Downsample the rendered image on the GPU.
+     */
+    const LibCarna::base::Framebuffer* source = fbo.get();
+    for( const auto& target : downsampleFbos )
+    {
+        glBindFramebuffer( GL_READ_FRAMEBUFFER, source->id );
+        glBindFramebuffer( GL_DRAW_FRAMEBUFFER, target->id );
+        glBlitFramebuffer
+            ( 0, 0, source->width(), source->height()
+            , 0, 0, target->width(), target->height()
+            , GL_COLOR_BUFFER_BIT, GL_LINEAR );
+        source = target.get();
+    }
+    glBindFramebuffer( GL_READ_FRAMEBUFFER, source->id );
+
     glReadBuffer( GL_COLOR_ATTACHMENT0_EXT );
-    glReadPixels( 0, 0, this->fbo->width(), this->fbo->height(), GL_RGB, GL_UNSIGNED_BYTE, frame.get() );
+    glReadPixels( 0, 0, width, height, GL_RGB, GL_UNSIGNED_BYTE, frame.get() );
 }
 
 
@@ -67,8 +116,12 @@ void Surface::Details::grabFrame()
 // Surface
 // ----------------------------------------------------------------------------------
 
-Surface::Surface( const LibCarna::py::base::GLContextView& contextView, unsigned int width, unsigned int height )
-    : pimpl( new Details( *contextView.context, width, height ) )
+Surface::Surface
+        ( const LibCarna::py::base::GLContextView& contextView
+        , unsigned int width
+        , unsigned int height
+        , unsigned int supersampling )
+    : pimpl( new Details( *contextView.context, width, height, supersampling ) )
     , contextView( contextView.shared_from_this() )
     , size( pimpl->frameSize )
 {
@@ -83,11 +136,29 @@ Surface::~Surface()
 
 unsigned int Surface::width() const
 {
-    return pimpl->fbo->width();
+    return pimpl->width;
 }
 
 
 unsigned int Surface::height() const
+{
+    return pimpl->height;
+}
+
+
+unsigned int Surface::supersampling() const
+{
+    return pimpl->supersampling;
+}
+
+
+unsigned int Surface::renderWidth() const
+{
+    return pimpl->fbo->width();
+}
+
+
+unsigned int Surface::renderHeight() const
 {
     return pimpl->fbo->height();
 }
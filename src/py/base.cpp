@@ -1,7 +1,11 @@
+#include <algorithm>
+#include <cmath>
 #include <memory>
+#include <unordered_map>
 
 #include <pybind11/pybind11.h>
 #include <pybind11/eigen.h>
+#include <pybind11/numpy.h>
 #include <pybind11/stl.h>
 
 namespace py = pybind11;
@@ -22,6 +26,7 @@ using namespace pybind11::literals; // enables the _a literal
 #include <LibCarna/base/MeshRenderingStage.hpp>
 #include <LibCarna/py/base.hpp>
 #include <LibCarna/py/Surface.hpp>
+#include <LibCarna/py/StageTimer.hpp>
 #include <LibCarna/py/log.hpp>
 
 using namespace LibCarna::py;
@@ -102,6 +107,12 @@ void NodeView::attachChild( SpatialView& child )
      */
     LIBCARNA_ASSERT_EX( !child.spatial->hasParent(), "Child already has a parent." );
 
+    /* The children of geometry batches are exclusively the geometries of the batch (see \a GeometryBatchView).
+     */
+    LIBCARNA_ASSERT_EX(
+        dynamic_cast< const GeometryBatchView* >( this ) == nullptr,
+        "Geometry batches cannot have other children." );
+
     /* Check for circular relations (verify that `this` is not a child of `child`).
      */
     bool circular = false;
@@ -150,6 +161,44 @@ LibCarna::base::Geometry& GeometryView::geometry()
 
 
 
+// ----------------------------------------------------------------------------------
+// GeometryBatchView
+// ----------------------------------------------------------------------------------
+
+GeometryBatchView::GeometryBatchView
+    ( unsigned int geometryType
+    , const std::vector< LibCarna::base::math::Matrix4f >& localTransforms
+    , const std::map< unsigned int, std::shared_ptr< GeometryFeatureView > >& features
+    , const std::string& tag )
+
+    : NodeView::NodeView( new LibCarna::base::Node( tag ) )
+    , geometryType( geometryType )
+{
+    geometries.reserve( localTransforms.size() );
+    for( const auto& localTransform : localTransforms )
+    {
+        LibCarna::base::Geometry* const geometry = new LibCarna::base::Geometry( geometryType );
+        geometry->localTransform = localTransform;
+        for( const auto& feature : features )
+        {
+            geometry->putFeature( feature.first, feature.second->geometryFeature );
+        }
+        node().attachChild( geometry );
+        geometries.push_back( geometry );
+    }
+}
+
+
+const std::vector< LibCarna::base::Geometry* >& GeometryBatchView::checkedGeometries()
+{
+    LIBCARNA_ASSERT_EX(
+        node().children() == geometries.size(),
+        "The geometries of the batch were changed outside of the batch." );
+    return geometries;
+}
+
+
+
 // ----------------------------------------------------------------------------------
 // GeometryFeatureView
 // ----------------------------------------------------------------------------------
@@ -167,6 +216,46 @@ GeometryFeatureView::~GeometryFeatureView()
 
 
 
+// ----------------------------------------------------------------------------------
+// FeaturePin
+// ----------------------------------------------------------------------------------
+
+/* The current pins of the geometry features (the pins remove themselves when they are deleted).
+ */
+static std::unordered_map< const LibCarna::base::GeometryFeature*, std::weak_ptr< FeaturePin > > featurePins;
+
+static std::size_t nextFeaturePinId = 0;
+
+
+std::shared_ptr< FeaturePin > FeaturePin::of( LibCarna::base::GeometryFeature& geometryFeature )
+{
+    std::weak_ptr< FeaturePin >& pin = featurePins[ &geometryFeature ];
+    if( auto existingPin = pin.lock() )
+    {
+        return existingPin;
+    }
+    std::shared_ptr< FeaturePin > newPin( new FeaturePin( geometryFeature ) );
+    pin = newPin;
+    return newPin;
+}
+
+
+FeaturePin::FeaturePin( LibCarna::base::GeometryFeature& geometryFeature )
+    : holder( new LibCarna::base::Geometry( 0 ) )
+    , geometryFeature( geometryFeature )
+    , id( nextFeaturePinId++ )
+{
+    holder->putFeature( 0, geometryFeature );
+}
+
+
+FeaturePin::~FeaturePin()
+{
+    featurePins.erase( &geometryFeature );
+}
+
+
+
 // ----------------------------------------------------------------------------------
 // MaterialView
 // ----------------------------------------------------------------------------------
@@ -269,6 +358,84 @@ ColorMapView::ColorMapView
 
 
 
+// ----------------------------------------------------------------------------------
+// matricesFromArray
+// ----------------------------------------------------------------------------------
+
+typedef py::array_t< float, py::array::c_style | py::array::forcecast > MatrixArray;
+
+
+static void checkMatrixArray( const MatrixArray& array )
+{
+    LIBCARNA_ASSERT_EX(
+        array.ndim() == 3 && array.shape( 1 ) == 4 && array.shape( 2 ) == 4,
+        "Transforms must be an (N, 4, 4) array."
+    );
+}
+
+
+static std::vector< LibCarna::base::math::Matrix4f > matricesFromArray( const MatrixArray& array )
+{
+    checkMatrixArray( array );
+    const auto data = array.unchecked< 3 >();
+    std::vector< LibCarna::base::math::Matrix4f > matrices( data.shape( 0 ) );
+    for( py::ssize_t i = 0; i < data.shape( 0 ); ++i )
+    {
+        for( int row = 0; row < 4; ++row )
+        {
+            for( int col = 0; col < 4; ++col )
+            {
+                matrices[ i ]( row, col ) = data( i, row, col );
+            }
+        }
+    }
+    return matrices;
+}
+
+
+
+// ----------------------------------------------------------------------------------
+// colorsFromArray
+// ----------------------------------------------------------------------------------
+
+static std::vector< LibCarna::base::Color > colorsFromArray( const py::array& lut )
+{
+    LIBCARNA_ASSERT_EX( lut.ndim() == 2 && lut.shape( 1 ) == 4, "Color lookup table must be an (N, 4) array." );
+    LIBCARNA_ASSERT_EX( lut.shape( 0 ) >= 2, "Color lookup table must have at least two colors." );
+    std::vector< LibCarna::base::Color > colors( lut.shape( 0 ) );
+    if( lut.dtype().is( py::dtype::of< unsigned char >() ) )
+    {
+        const auto rgba = lut.unchecked< unsigned char, 2 >();
+        for( py::ssize_t i = 0; i < rgba.shape( 0 ); ++i )
+        {
+            colors[ i ] = LibCarna::base::Color( rgba( i, 0 ), rgba( i, 1 ), rgba( i, 2 ), rgba( i, 3 ) );
+        }
+    }
+    else
+    {
+        /* Floating point values are expected in the range from 0 to 1. Other types are rejected, because it would be
+         * ambiguous whether, e.g., integers are in the range from 0 to 1 or from 0 to 255.
+         */
+        LIBCARNA_ASSERT_EX(
+            lut.dtype().kind() == 'f',
+            "Color lookup table must be of type uint8 (0 to 255) or floating point (0 to 1)." );
+        const auto lutf = py::array_t< float, py::array::c_style | py::array::forcecast >::ensure( lut );
+        const auto rgba = lutf.unchecked< 2 >();
+        const auto toByte = []( float value )
+        {
+            return static_cast< unsigned char >( std::lround( std::clamp( value, 0.f, 1.f ) * 255 ) );
+        };
+        for( py::ssize_t i = 0; i < rgba.shape( 0 ); ++i )
+        {
+            colors[ i ] = LibCarna::base::Color
+                ( toByte( rgba( i, 0 ) ), toByte( rgba( i, 1 ) ), toByte( rgba( i, 2 ) ), toByte( rgba( i, 3 ) ) );
+        }
+    }
+    return colors;
+}
+
+
+
 // ----------------------------------------------------------------------------------
 // configureLog
 // ----------------------------------------------------------------------------------
@@ -310,6 +477,64 @@ PYBIND11_MODULE( base, m )
     py::class_< GLContextView, std::shared_ptr< GLContextView > >( m, "GLContext" )
         .doc() = "Wraps and represents an OpenGL context.";
 
+    py::class_< FeaturePin, std::shared_ptr< FeaturePin > >( m, "FeaturePin" )
+        .def_readonly( "id", &FeaturePin::id )
+        .doc() = "Keeps a geometry feature alive, so that its ID is not re-used for other features.";
+
+    m.def( "scene_state",
+        []( CameraView& camera, NodeView* root )
+        {
+            /* Serialize everything that the rendering of a frame depends on, except for the render stages: The view and
+             * projection matrices of the camera, the world transforms of all spatial objects in the scene, and the
+             * geometry types and features of the geometries. Features are identified by the IDs of their pins, that
+             * are returned along with the state, so that the IDs are not re-used while the state is in use.
+             */
+            LibCarna::base::Node& rootNode = root == nullptr ? camera.camera().findRoot() : root->node();
+            rootNode.updateWorldTransform();
+            std::string state;
+            const auto appendMatrix = [ &state ]( const LibCarna::base::math::Matrix4f& matrix )
+            {
+                state.append( reinterpret_cast< const char* >( matrix.data() ), sizeof( float ) * 16 );
+            };
+            appendMatrix( camera.camera().viewTransform() );
+            appendMatrix( camera.camera().projection() );
+            appendMatrix( rootNode.worldTransform() );
+            std::map< const LibCarna::base::GeometryFeature*, std::shared_ptr< FeaturePin > > pins;
+            rootNode.visitChildren(
+                true,
+                [ &state, &appendMatrix, &pins ]( const LibCarna::base::Spatial& spatial )
+                {
+                    appendMatrix( spatial.worldTransform() );
+                    if( const auto* const geometry = dynamic_cast< const LibCarna::base::Geometry* >( &spatial ) )
+                    {
+                        const std::size_t record[ 2 ] = { geometry->geometryType, geometry->featuresCount() };
+                        state.append( reinterpret_cast< const char* >( record ), sizeof( record ) );
+                        geometry->visitFeatures(
+                            [ &state, &pins ]( LibCarna::base::GeometryFeature& feature, unsigned int role )
+                            {
+                                std::shared_ptr< FeaturePin >& pin = pins[ &feature ];
+                                if( pin.get() == nullptr )
+                                {
+                                    pin = FeaturePin::of( feature );
+                                }
+                                const std::size_t record[ 2 ] = { role, pin->id };
+                                state.append( reinterpret_cast< const char* >( record ), sizeof( record ) );
+                            }
+                        );
+                    }
+                }
+            );
+            std::vector< std::shared_ptr< FeaturePin > > pinList;
+            pinList.reserve( pins.size() );
+            for( const auto& pin : pins )
+            {
+                pinList.push_back( pin.second );
+            }
+            return py::make_tuple( py::bytes( state ), pinList );
+        },
+        "camera"_a, "root"_a = nullptr
+    );
+
     py::class_< SpatialView, std::shared_ptr< SpatialView > >( m, "Spatial" )
         .def_property_readonly( "has_parent",
             VIEW_DELEGATE( SpatialView, spatial->hasParent() )
@@ -390,6 +615,70 @@ PYBIND11_MODULE( base, m )
             VIEW_DELEGATE( GeometryView, geometry().hasFeature( feature.geometryFeature ), GeometryFeatureView& feature )
         );
 
+    py::class_< GeometryBatchView, std::shared_ptr< GeometryBatchView >, NodeView >( m, "GeometryBatch" )
+        .def( py::init(
+                []
+                    ( unsigned int geometryType
+                    , const MatrixArray& localTransforms
+                    , const std::map< unsigned int, std::shared_ptr< GeometryFeatureView > >& features
+                    , const std::string& tag )
+                {
+                    return std::make_shared< GeometryBatchView >
+                        ( geometryType, matricesFromArray( localTransforms ), features, tag );
+                }
+            ),
+            "geometry_type"_a,
+            "local_transforms"_a,
+            "features"_a = std::map< unsigned int, std::shared_ptr< GeometryFeatureView > >(),
+            "tag"_a = ""
+        )
+        .def_readonly( "geometry_type", &GeometryBatchView::geometryType )
+        .def( "__len__",
+            VIEW_DELEGATE( GeometryBatchView, geometries.size() )
+        )
+        .def_property( "local_transforms",
+            []( GeometryBatchView& self )
+            {
+                const auto& geometries = self.checkedGeometries();
+                const auto count = static_cast< py::ssize_t >( geometries.size() );
+                py::array_t< float > localTransforms( { count, py::ssize_t( 4 ), py::ssize_t( 4 ) } );
+                auto data = localTransforms.mutable_unchecked< 3 >();
+                for( py::ssize_t i = 0; i < count; ++i )
+                {
+                    const LibCarna::base::math::Matrix4f& localTransform = geometries[ i ]->localTransform;
+                    for( int row = 0; row < 4; ++row )
+                    {
+                        for( int col = 0; col < 4; ++col )
+                        {
+                            data( i, row, col ) = localTransform( row, col );
+                        }
+                    }
+                }
+                return localTransforms;
+            },
+            []( GeometryBatchView& self, const MatrixArray& localTransforms )
+            {
+                checkMatrixArray( localTransforms );
+                const auto& geometries = self.checkedGeometries();
+                LIBCARNA_ASSERT_EX(
+                    localTransforms.shape( 0 ) == static_cast< py::ssize_t >( geometries.size() ),
+                    "Number of transforms must match the number of geometries."
+                );
+                const auto data = localTransforms.unchecked< 3 >();
+                for( std::size_t i = 0; i < geometries.size(); ++i )
+                {
+                    LibCarna::base::math::Matrix4f& localTransform = geometries[ i ]->localTransform;
+                    for( int row = 0; row < 4; ++row )
+                    {
+                        for( int col = 0; col < 4; ++col )
+                        {
+                            localTransform( row, col ) = data( i, row, col );
+                        }
+                    }
+                }
+            }
+        );
+
     py::class_< MaterialView, std::shared_ptr< MaterialView >, GeometryFeatureView >( m, "Material" )
         .def( py::init< const std::string& >(), "shader_name"_a )
         .def( "__setitem__", &MaterialView::setParameter< LibCarna::base::math::Vector4f > )
@@ -411,9 +700,14 @@ PYBIND11_MODULE( base, m )
         );
 
     py::class_< Surface >( m, "Surface" )
-        .def( py::init< const GLContextView&, unsigned int, unsigned int >(), "gl_context"_a, "width"_a, "height"_a )
+        .def( py::init< const GLContextView&, unsigned int, unsigned int, unsigned int >(),
+            "gl_context"_a, "width"_a, "height"_a, "supersampling"_a = 1
+        )
         .def_property_readonly( "width", &Surface::width )
         .def_property_readonly( "height", &Surface::height )
+        .def_property_readonly( "supersampling", &Surface::supersampling )
+        .def_property_readonly( "render_width", &Surface::renderWidth )
+        .def_property_readonly( "render_height", &Surface::renderHeight )
         .def( "begin", &Surface::begin )
         .def( "end", &Surface::end );
     
@@ -424,6 +718,30 @@ PYBIND11_MODULE( base, m )
         )
         .def_property_readonly( "renderer",
             VIEW_DELEGATE( RenderStageView, ownedBy.get() )
+        )
+        .def_property( "timing",
+            []( RenderStageView& self )
+            {
+                const StageTimer* const timer = dynamic_cast< const StageTimer* >( self.renderStage );
+                return timer != nullptr && timer->enabled;
+            },
+            []( RenderStageView& self, bool enabled )
+            {
+                StageTimer* const timer = dynamic_cast< StageTimer* >( self.renderStage );
+                LIBCARNA_ASSERT_EX( timer != nullptr || !enabled, "Render stage does not support timing." );
+                if( timer != nullptr )
+                {
+                    timer->enabled = enabled;
+                }
+            }
+        )
+        .def( "collect_gpu_time",
+            []( RenderStageView& self )
+            {
+                StageTimer* const timer = dynamic_cast< StageTimer* >( self.renderStage );
+                LIBCARNA_ASSERT_EX( timer != nullptr, "Render stage does not support timing." );
+                return timer->collectTiming();
+            }
         );
 
     py::class_< MeshRenderingStageView, std::shared_ptr< MeshRenderingStageView >, RenderStageView >( m, "MeshRenderingStage" )
@@ -603,10 +921,34 @@ PYBIND11_MODULE( base, m )
                 , const std::vector< LibCarna::base::Color >& colors ),
             "colors"_a
         )
+        .def( "write_lut",
+            []( const std::shared_ptr< ColorMapView >& self, const py::array& lut )
+            {
+                self->colorMap.writeLinearSpline( colorsFromArray( lut ) );
+                return self;
+            },
+            "lut"_a
+        )
         .def_property_readonly(
             "color_list",
             VIEW_DELEGATE( ColorMapView, colorMap.getColorList() )
         )
+        .def( "to_array",
+            []( const std::shared_ptr< ColorMapView >& self )
+            {
+                const auto& colors = self->colorMap.getColorList();
+                py::array_t< unsigned char > rgba( { static_cast< py::ssize_t >( colors.size() ), py::ssize_t( 4 ) } );
+                auto data = rgba.mutable_unchecked< 2 >();
+                for( std::size_t i = 0; i < colors.size(); ++i )
+                {
+                    data( i, 0 ) = colors[ i ].r;
+                    data( i, 1 ) = colors[ i ].g;
+                    data( i, 2 ) = colors[ i ].b;
+                    data( i, 3 ) = colors[ i ].a;
+                }
+                return rgba;
+            }
+        )
         .def_property(
             "minimum_intensity",
             VIEW_DELEGATE
@@ -2,6 +2,7 @@
 
 #include <pybind11/pybind11.h>
 #include <pybind11/eigen.h>
+#include <pybind11/stl.h>
 
 namespace py = pybind11;
 
@@ -17,8 +18,10 @@ using namespace LibCarna::py::egl;
 // EGLContextView
 // ----------------------------------------------------------------------------------
 
-EGLContextView::EGLContextView()
-    : LibCarna::py::base::GLContextView( LibCarna::egl::EGLContext::create() )
+EGLContextView::EGLContextView( const EGLContextView* share, int device )
+    : LibCarna::py::base::GLContextView(
+        LibCarna::egl::EGLContext::create( share == nullptr ? nullptr : &share->eglContext(), device )
+    )
 {
 }
 
@@ -37,10 +40,34 @@ LibCarna::egl::EGLContext& EGLContextView::eglContext() const
 PYBIND11_MODULE( egl, m )
 {
 
+    py::class_< LibCarna::egl::EGLContext::Device >( m, "EGLDevice" )
+        .def_readonly( "index", &LibCarna::egl::EGLContext::Device::index )
+        .def_readonly( "vendor", &LibCarna::egl::EGLContext::Device::vendor )
+        .def_readonly( "renderer", &LibCarna::egl::EGLContext::Device::renderer )
+        .def( "__repr__", []( const LibCarna::egl::EGLContext::Device& self )
+            {
+                return "<EGLDevice " + std::to_string( self.index ) + ": " + self.vendor + ", " + self.renderer + ">";
+            }
+        )
+        .doc() = "An EGL device, that can be used for rendering (see :func:`devices`).";
+
+    m.def( "devices", &LibCarna::egl::EGLContext::devices, R"(List the EGL devices, that can be used for rendering.
+
+    Devices that cannot be initialized are omitted. Use the :attr:`EGLDevice.index` to create an :class:`EGLContext` on
+    a specific device.)" );
+
     py::class_< EGLContextView, std::shared_ptr< EGLContextView >, LibCarna::py::base::GLContextView >( m, "EGLContext" )
-        .def( py::init<>() )
+        .def( py::init< const EGLContextView*, int >(), "share"_a = nullptr, "device"_a = -1 )
         .def_property_readonly( "vendor", VIEW_DELEGATE( EGLContextView, eglContext().vendor() ) )
         .def_property_readonly( "renderer", VIEW_DELEGATE( EGLContextView, eglContext().renderer() ) )
-        .doc() = "Create a :class:`carna.base.GLContext` using EGL (useful for off-screen rendering).";
+        .def_property_readonly( "device", VIEW_DELEGATE( EGLContextView, eglContext().device() ) )
+        .doc() = R"(Create a :class:`carna.base.GLContext` using EGL (useful for off-screen rendering).
+
+        Arguments:
+            share: Context to share objects (e.g., volume textures and shader programs) with. If `None`, objects are
+                shared with any existing context on the same device.
+            device: Index of the EGL device to create the context on (see :func:`devices`). If negative, the default
+                display is used, or the first EGL device that can be initialized. Must be negative or equal to the
+                device of `share`, if `share` is given.)";
 
 }
\ No newline at end of file
@@ -13,6 +13,7 @@ using namespace pybind11::literals; // enables the _a literal
 #include <LibCarna/presets/DVRStage.hpp>
 #include <LibCarna/presets/DRRStage.hpp>
 #include <LibCarna/py/presets.hpp>
+#include <LibCarna/py/StageTimer.hpp>
 /*
 #include <LibCarna/base/GLContext.hpp>
 #include <LibCarna/base/ManagedMesh.hpp>
@@ -31,7 +32,7 @@ using namespace LibCarna::py::presets;
 // ----------------------------------------------------------------------------------
 
 OpaqueRenderingStageView::OpaqueRenderingStageView( unsigned int geometryType )
-    : MeshRenderingStageView::MeshRenderingStageView( new LibCarna::presets::OpaqueRenderingStage( geometryType ) )
+    : MeshRenderingStageView::MeshRenderingStageView( new TimedRenderStage< LibCarna::presets::OpaqueRenderingStage >( geometryType ) )
 {
 }
 
@@ -69,7 +70,7 @@ LibCarna::presets::VolumeRenderingStage& VolumeRenderingStageView::volumeRenderi
 
 MaskRenderingStageView::MaskRenderingStageView( unsigned int geometryType, unsigned int maskRole )
     : VolumeRenderingStageView::VolumeRenderingStageView(
-        new LibCarna::presets::MaskRenderingStage( geometryType, maskRole )
+        new TimedRenderStage< LibCarna::presets::MaskRenderingStage >( geometryType, maskRole )
     )
 {
 }
@@ -91,7 +92,7 @@ const static auto MIP_STAGE__ROLE_INTENSITIES = LibCarna::presets::MIPStage::ROL
 
 MIPStageView::MIPStageView( unsigned int geometryType, unsigned int colorMapResolution )
     : VolumeRenderingStageView::VolumeRenderingStageView(
-        new LibCarna::presets::MIPStage( geometryType, colorMapResolution )
+        new TimedRenderStage< LibCarna::presets::MIPStage >( geometryType, colorMapResolution )
     )
 {
 }
@@ -124,7 +125,7 @@ CuttingPlanesStageView::CuttingPlanesStageView
     , unsigned int colorMapResolution )
 
     : RenderStageView::RenderStageView(
-        new LibCarna::presets::CuttingPlanesStage( volumeGeometryType, planeGeometryType, colorMapResolution )
+        new TimedRenderStage< LibCarna::presets::CuttingPlanesStage >( volumeGeometryType, planeGeometryType, colorMapResolution )
     )
 {
 }
@@ -154,7 +155,7 @@ const static auto DVR_STAGE__ROLE_NORMALS     = LibCarna::presets::DVRStage::ROL
 
 DVRStageView::DVRStageView( unsigned int geometryType, unsigned int colorMapResolution )
     : VolumeRenderingStageView::VolumeRenderingStageView(
-        new LibCarna::presets::DVRStage( geometryType, colorMapResolution )
+        new TimedRenderStage< LibCarna::presets::DVRStage >( geometryType, colorMapResolution )
     )
 {
 }
@@ -183,7 +184,7 @@ const static auto DRR_STAGE__ROLE_INTENSITIES = LibCarna::presets::DRRStage::ROL
 
 DRRStageView::DRRStageView( unsigned int geometryType )
     : VolumeRenderingStageView::VolumeRenderingStageView(
-        new LibCarna::presets::DRRStage( geometryType )
+        new TimedRenderStage< LibCarna::presets::DRRStage >( geometryType )
     )
 {
 }
@@ -0,0 +1,45 @@
+import numpy as np
+
+import libcarna
+from . import testsuite
+
+
+class animate(testsuite.LibCarnaTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.root, self.camera = testsuite.toy_scene()
+        self.r = libcarna.renderer(80, 60, [libcarna.mip(testsuite.GEOMETRY_TYPE_VOLUME, cmap='jet')])
+
+    def test__render__reuse_frames(self):
+        # Hold the camera for the first half, then rotate it, and return to the initial state at `t=1`
+        camera_keyframes = libcarna.keyframes(self.camera, easing='step')
+        camera_keyframes.key(0, rotation=(1, 0, 0, 0))
+        camera_keyframes.key(0.5, rotation=libcarna.math.rotation((0, 1, 0), radians=np.pi / 2))
+        camera_keyframes.key(0.75, rotation=(1, 0, 0, 0))
+        animation = libcarna.animate(camera_keyframes, n_frames=8)
+
+        expected = list(animation.render(self.r, self.camera))
+        self.assertEqual(animation.reused_frames, 0)
+        actual = list(animation.render(self.r, self.camera, reuse_frames=True))
+        self.assertEqual(animation.reused_frames, 6)
+        self.assertEqual(len(actual), len(expected))
+        for frame_actual, frame_expected in zip(actual, expected):
+            np.testing.assert_array_equal(frame_actual, frame_expected)
+        self.assertIsNot(actual[1], actual[2])
+
+    def test__render__reuse_frames__frame_cache(self):
+        camera_keyframes = libcarna.keyframes(self.camera, easing='step')
+        camera_keyframes.key(0, rotation=(1, 0, 0, 0))
+        camera_keyframes.key(0.5, rotation=libcarna.math.rotation((0, 1, 0), radians=np.pi / 2))
+        camera_keyframes.key(0.75, rotation=(1, 0, 0, 0))
+        animation = libcarna.animate(camera_keyframes, n_frames=8)
+
+        # Only the most recent frame fits into the cache, so the frames at `t=1` are rendered again
+        cache = libcarna.frame_cache(max_bytes=80 * 60 * 3)
+        expected = list(animation.render(self.r, self.camera))
+        actual = list(animation.render(self.r, self.camera, reuse_frames=cache))
+        self.assertEqual(animation.reused_frames, 5)
+        self.assertEqual(len(cache), 1)
+        for frame_actual, frame_expected in zip(actual, expected):
+            np.testing.assert_array_equal(frame_actual, frame_expected)
@@ -208,6 +208,26 @@ class MeshFactory(testsuite.LibCarnaTestCase):
         del point
 
 
+class Surface(testsuite.LibCarnaTestCase):
+
+    def test__supersampling(self):
+        ctx = libcarna.egl_context()
+        for supersampling in (1, 2, 4):
+            with self.subTest(supersampling=supersampling):
+                surface = libcarna.base.Surface(ctx, 80, 60, supersampling)
+                self.assertEqual((surface.width, surface.height), (80, 60))
+                self.assertEqual((surface.render_width, surface.render_height), (80 * supersampling, 60 * supersampling))
+                surface.begin()
+                self.assertEqual(surface.end().shape, (60, 80, 3))
+
+    def test__supersampling__invalid(self):
+        ctx = libcarna.egl_context()
+        for supersampling in (3, 6):
+            with self.subTest(supersampling=supersampling):
+                with self.assertRaises(libcarna.base.AssertionFailure):
+                    libcarna.base.Surface(ctx, 80, 60, supersampling)
+
+
 class MeshRenderingStage(testsuite.LibCarnaTestCase):
 
     def test(self):
@@ -0,0 +1,30 @@
+import numpy as np
+
+import libcarna
+from libcarna import _colorbar
+from . import testsuite
+
+
+class colorbar(testsuite.LibCarnaTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.colors = np.array([[255, 0, 0, 255], [0, 255, 0, 128], [0, 0, 255, 0]], np.uint8)
+
+    def test__toarray(self):
+        cb = _colorbar.colorbar(self.colors, 0, 100)
+        np.testing.assert_array_equal(cb.toarray(), self.colors[::-1, None, :])
+
+    def test__colorlist(self):
+        colorlist = [libcarna.color(*color) for color in self.colors.tolist()]
+        cb1 = _colorbar.colorbar(colorlist, 0, 100)
+        cb2 = _colorbar.colorbar(self.colors, 0, 100)
+        np.testing.assert_array_equal(cb1.toarray(), cb2.toarray())
+        self.assertEqual(cb2.colorlist, colorlist)
+
+    def test__tohtml(self):
+        cb1 = _colorbar.colorbar(self.colors, 0, 100, label='HU')
+        cb2 = _colorbar.colorbar(self.colors.copy(), 0, 100, label='HU')
+        self.assertIs(cb1.tohtml(), cb2.tohtml())
+        self.assertIn('HU', cb1.tohtml())
+        self.assertNotEqual(cb1.tohtml(), _colorbar.colorbar(self.colors, 0, 200, label='HU').tohtml())
@@ -1,3 +1,7 @@
+import pickle
+
+import numpy as np
+
 import libcarna
 from . import testsuite
 
@@ -19,3 +23,99 @@ class dvr(testsuite.LibCarnaTestCase):
         self.assertEqual(dvr2.sample_rate, 400)
         self.assertEqual(dvr2.translucency, 1)
         self.assertEqual(dvr2.diffuse_light, 0.5)
+
+    def test__cmap__auto(self):
+        GEOMETRY_TYPE_VOLUME = 1
+        rng = np.random.default_rng(0)
+        array = np.concatenate([rng.normal(100, 5, 20_000), rng.normal(500, 20, 5_000)]).reshape(25, 40, 25)
+        volume = libcarna.volume(GEOMETRY_TYPE_VOLUME, array, spacing=(1, 1, 1))
+        self.assertEqual(volume.histogram.sum(), array.size)
+        dvr = libcarna.dvr(GEOMETRY_TYPE_VOLUME, cmap='jet')
+        for mode in ('tissue', 'percentile'):
+            with self.subTest(mode=mode):
+                cmin, cmax = dvr.cmap.auto(volume, mode=mode)
+                self.assertLess(cmin, cmax)
+                if mode == 'tissue':
+                    self.assertGreater(cmin, 120)
+                    self.assertLess(cmin, 450)
+                    self.assertGreater(cmax, 500)
+                colors = dvr.cmap.colormap.to_array()
+                self.assertEqual(colors[0, 3], 0)
+                self.assertEqual(colors[-1, 3], 255)
+                self.assertEqual(dvr.cmap.cmap_name, 'jet')
+
+    def test__preintegration(self):
+        GEOMETRY_TYPE_VOLUME = 1
+        dvr1 = libcarna.dvr(GEOMETRY_TYPE_VOLUME, cmap='viridis')
+        dvr2 = libcarna.dvr(GEOMETRY_TYPE_VOLUME, cmap='viridis', preint=20)  # integrates over 0.1 at sample rate 200
+        transparent, opaque = libcarna.color(255, 0, 0, 0), libcarna.color(255, 0, 0, 255)
+        for dvr in (dvr1, dvr2):
+            dvr.cmap.linear_spline(*([transparent] * 20 + [opaque] + [transparent] * 20))
+        colors1 = dvr1.cmap.colormap.to_array()
+        colors2 = dvr2.cmap.colormap.to_array()
+
+        # The narrow peak of opacity is spread over a wider interval, without changing the color
+        self.assertGreater((colors2[:, 3] > 0).sum(), (colors1[:, 3] > 0).sum())
+        self.assertLess(colors2[:, 3].max(), colors1[:, 3].max())
+        np.testing.assert_array_equal(colors2[colors2[:, 3] > 0, :3], [[255, 0, 0]] * (colors2[:, 3] > 0).sum())
+
+        # Replication and pickling pre-integrate the original color map (not the pre-integrated one)
+        np.testing.assert_array_equal(dvr2.replicate().cmap.colormap.to_array(), colors2)
+        np.testing.assert_array_equal(pickle.loads(pickle.dumps(dvr2)).cmap.colormap.to_array(), colors2)
+        np.testing.assert_array_equal(dvr2.cmap.getstate()['colors'], colors1)
+
+        # Higher sample rates require less pre-integration
+        dvr2.sample_rate = 400
+        colors3 = dvr2.cmap.colormap.to_array()
+        self.assertLess((colors3[:, 3] > 0).sum(), (colors2[:, 3] > 0).sum())
+        self.assertGreater((colors3[:, 3] > 0).sum(), (colors1[:, 3] > 0).sum())
+        dvr2.sample_rate = 200
+        np.testing.assert_array_equal(dvr2.cmap.colormap.to_array(), colors2)
+
+        # Linear segments are written to the original color map, and the result is pre-integrated
+        for dvr in (dvr1, dvr2):
+            dvr.cmap.linear_segment(0, 0.2, opaque, opaque)
+        self.assertEqual(dvr2.cmap.colormap.to_array()[0, 3], 255)
+        np.testing.assert_array_equal(dvr2.cmap.getstate()['colors'], dvr1.cmap.colormap.to_array())
+
+        # Color maps written directly are pre-integrated by the next update
+        dvr2.color_map.write_linear_spline([transparent] * 20 + [opaque] + [transparent] * 20)
+        dvr2.sample_rate = 200
+        np.testing.assert_array_equal(dvr2.cmap.colormap.to_array(), colors2)
+
+    def test__preintegration__n_samples(self):
+        GEOMETRY_TYPE_VOLUME = 1
+        dvr1 = libcarna.dvr(GEOMETRY_TYPE_VOLUME, preint=20)
+        dvr2 = libcarna.dvr(GEOMETRY_TYPE_VOLUME, preint=20)
+        dvr1.cmap('viridis', n_samples=50, ramp=(0.4, 0.6))
+        dvr2.cmap('viridis', n_samples=200, ramp=(0.4, 0.6))
+        colors1 = dvr1.cmap.colormap.to_array().astype(int)
+        colors2 = dvr2.cmap.colormap.to_array().astype(int)
+        self.assertLessEqual(np.abs(colors1 - colors2).max(), 3)
+
+    def test__preintegration__bar(self):
+        GEOMETRY_TYPE_VOLUME = 1
+        volume = libcarna.volume(GEOMETRY_TYPE_VOLUME, np.linspace(0, 1, 1000).reshape(10, 10, 10), spacing=(1, 1, 1))
+        dvr1 = libcarna.dvr(GEOMETRY_TYPE_VOLUME, cmap='viridis')
+        dvr2 = libcarna.dvr(GEOMETRY_TYPE_VOLUME, cmap='viridis', preint=20)
+        for dvr in (dvr1, dvr2):
+            dvr.cmap.linear_spline(libcarna.color(255, 0, 0, 0), libcarna.color(255, 0, 0, 255), ramp=(0.4, 0.6))
+        np.testing.assert_array_equal(dvr2.cmap.bar(volume).colors, dvr1.cmap.bar(volume).colors)
+
+    def test__preintegration__low_sample_rate(self):
+        """
+        Test that a narrow feature of the color map is not missed at a low sample rate, if pre-integration is used.
+        """
+        GEOMETRY_TYPE_VOLUME = 1
+        z, y, x = np.mgrid[-1:1:64j, -1:1:64j, -1:1:64j]
+        root = libcarna.node()
+        libcarna.volume(GEOMETRY_TYPE_VOLUME, np.sqrt(x ** 2 + y ** 2 + z ** 2), parent=root, spacing=(1, 1, 1))
+        camera = libcarna.camera(parent=root).frustum(fov=90, z_near=1, z_far=500).translate(z=100)
+        transparent, opaque = libcarna.color(255, 255, 255, 0), libcarna.color(255, 255, 255, 255)
+        coverage = dict()
+        for preintegration in (0, 4):
+            dvr = libcarna.dvr(GEOMETRY_TYPE_VOLUME, sr=10, preint=preintegration, diffuse=0)
+            dvr.cmap.linear_spline(*([transparent] * 20 + [opaque] + [transparent] * 20))  # thin spherical shell
+            frame = libcarna.renderer(80, 80, [dvr]).render(camera)
+            coverage[preintegration] = (frame.max(axis=2) > 0).sum()
+        self.assertGreater(coverage[4], coverage[0])
@@ -1,5 +1,7 @@
 import gc
+import threading
 
+import libcarna
 import libcarna.egl
 
 from . import testsuite
@@ -39,3 +41,58 @@ class EGLContext(testsuite.LibCarnaTestCase):
         ctx = libcarna.egl.EGLContext()
         self.assertIsInstance(ctx.renderer, str)
         self.assertGreater(len(ctx.renderer), 0)
+
+    def test__share(self):
+        """
+        Test creation of an EGL context that shares objects with another EGL context.
+        """
+        ctx1 = libcarna.egl.EGLContext()
+        ctx2 = libcarna.egl.EGLContext(share=ctx1)
+        self.assertEqual(ctx1.renderer, ctx2.renderer)
+        del ctx1
+        gc.collect()
+        del ctx2
+
+
+    def test__device(self):
+        """
+        Test creation of an EGL context on a specific EGL device.
+        """
+        for device in libcarna.egl.devices():
+            with self.subTest(device=device.index):
+                ctx = libcarna.egl.EGLContext(device=device.index)
+                self.assertEqual(ctx.device, device.index)
+                self.assertEqual(ctx.vendor, device.vendor)
+                self.assertEqual(ctx.renderer, device.renderer)
+
+
+class devices(testsuite.LibCarnaTestCase):
+
+    def test(self):
+        devices = libcarna.egl_devices()
+        self.assertIsInstance(devices, list)
+        for device in devices:
+            self.assertIsInstance(device.vendor, str)
+            self.assertIsInstance(device.renderer, str)
+
+
+class default_egl_context(testsuite.LibCarnaTestCase):
+
+    def test__same_thread(self):
+        ctx1 = libcarna.default_egl_context()
+        ctx2 = libcarna.default_egl_context()
+        self.assertIs(ctx1, ctx2)
+
+    def test__other_thread(self):
+        ctx1 = libcarna.default_egl_context()
+        ctx2 = list()
+        thread = threading.Thread(target=lambda: ctx2.append(libcarna.default_egl_context()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(ctx1, ctx2[0])
+
+    def test__renderer(self):
+        r1 = libcarna.renderer(10, 10, [])
+        r2 = libcarna.renderer(20, 20, [])
+        self.assertIs(r1.gl_context, libcarna.default_egl_context())
+        self.assertIs(r2.gl_context, libcarna.default_egl_context())
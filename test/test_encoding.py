@@ -0,0 +1,223 @@
+import io
+import pathlib
+import tempfile
+import unittest.mock
+
+import numpy as np
+from PIL import Image, ImageSequence
+
+import libcarna
+from . import testsuite
+
+
+def _read_image(buf: bytes, mode: str | None = None) -> np.ndarray:
+    with Image.open(io.BytesIO(buf)) as im:
+        return np.array([np.array(frame.convert(mode or im.mode)) for frame in ImageSequence.Iterator(im)])
+
+
+def _encode_apng(frames: list[np.ndarray], **kwargs) -> bytes:
+    buf = io.BytesIO()
+    with libcarna.apng_encoder(buf, **kwargs) as encoder:
+        for frame in frames:
+            encoder.write(frame)
+    return buf.getvalue()
+
+
+class apng_encoder(testsuite.LibCarnaTestCase):
+
+    def test(self):
+        for channels in (3, 4):
+            with self.subTest(channels=channels):
+                frames = testsuite.random_frames(5, channels)
+                buf = io.BytesIO()
+                with libcarna.apng_encoder(buf, fps=10) as encoder:
+                    for frame in frames:
+                        encoder.write(frame)
+                np.testing.assert_array_equal(_read_image(buf.getvalue()), frames)
+
+    def test__n_frames(self):
+        frames = testsuite.random_frames(3)
+        buf = io.BytesIO()
+        with libcarna.apng_encoder(buf, n_frames=3) as encoder:
+            for frame in frames:
+                encoder.write(frame)
+        np.testing.assert_array_equal(_read_image(buf.getvalue()), frames)
+
+    def test__delta(self):
+        frames = [np.zeros((30, 40, 3), np.uint8) for _ in range(4)]
+        frames[1][5:10, 20:25] = testsuite.random_frames(1)[0][:5, :5]
+        frames[2][5:10, 20:25] = frames[1][5:10, 20:25]
+        frames[3][:] = 255
+        buf = _encode_apng(frames, palette_frames=0)
+        np.testing.assert_array_equal(_read_image(buf), frames)
+
+    def test__palette(self):
+        rng = np.random.default_rng(0)
+        for channels, n_colors in ((3, 2), (3, 5), (4, 200)):
+            with self.subTest(channels=channels, n_colors=n_colors):
+                colors = rng.integers(0, 256, size=(n_colors, channels), dtype=np.uint8)
+                frames = [colors[rng.integers(0, n_colors, size=(30, 40))] for _ in range(3)]
+                buf = _encode_apng(frames)
+                self.assertLess(len(buf), len(_encode_apng(frames, palette_frames=0)))
+                np.testing.assert_array_equal(_read_image(buf, 'RGBA' if channels == 4 else 'RGB'), frames)
+
+    def test__palette__unseekable(self):
+        class unseekable(io.BytesIO):
+            def seekable(self):
+                return False
+        frames = [np.full((30, 40, 3), value, np.uint8) for value in (0, 128, 255)]
+        buf = unseekable()
+        with libcarna.apng_encoder(buf, workers=2) as encoder:
+            for frame in frames:
+                encoder.write(frame)
+        np.testing.assert_array_equal(_read_image(buf.getvalue(), 'RGB'), frames)
+
+    def test__palette__too_many_colors(self):
+        frames = testsuite.random_frames(40)
+        frames[:35] = [np.zeros_like(frame) for frame in frames[:35]]
+        buf = _encode_apng(frames, palette_frames=32, workers=2)
+        np.testing.assert_array_equal(_read_image(buf), frames)
+
+
+class h264_encoder(testsuite.LibCarnaTestCase):
+
+    def test(self):
+        frames = testsuite.random_frames(5)
+        buf = io.BytesIO()
+        with libcarna.h264_encoder(buf) as encoder:
+            for frame in frames:
+                encoder.write(frame)
+        self.assertEqual(buf.getvalue()[4:8], b'ftyp')
+
+    def test__path(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            path = pathlib.Path(tempdir) / 'video.mp4'
+            with libcarna.h264_encoder(path) as encoder:
+                for frame in testsuite.random_frames(5):
+                    encoder.write(frame)
+            self.assertGreater(path.stat().st_size, 0)
+
+
+class encode(testsuite.LibCarnaTestCase):
+
+    def test__generator(self):
+        frames = testsuite.random_frames(10)
+        buf = io.BytesIO()
+        libcarna.encode((frame for frame in frames), buf, format='apng', queue_size=2)
+        np.testing.assert_array_equal(_read_image(buf.getvalue()), frames)
+
+    def test__single_frame(self):
+        frame = testsuite.random_frames(1)[0]
+        buf = io.BytesIO()
+        libcarna.encode(frame, buf, format='apng')
+        np.testing.assert_array_equal(_read_image(buf.getvalue()), [frame])
+
+    def test__error(self):
+        frames = testsuite.random_frames(2) + [np.zeros((10, 10, 3), np.uint8)]  # frame shape differs
+        with self.assertRaises(AssertionError):
+            libcarna.encode(frames, io.BytesIO(), format='apng')
+
+    def test__unknown_format(self):
+        with self.assertRaises(ValueError):
+            libcarna.encode(testsuite.random_frames(1), io.BytesIO(), format='unknown')
+
+    def test__error_before_first_frame(self):
+        for format in ('apng', 'h264'):
+            with self.subTest(format=format):
+                with self.assertRaisesRegex(KeyError, 'original'):
+                    with libcarna.encoders[format](io.BytesIO()):
+                        raise KeyError('original')
+                with self.assertRaisesRegex(KeyError, 'original'):
+                    with libcarna.video_writer(io.BytesIO(), format=format):
+                        raise KeyError('original')
+                with self.assertRaisesRegex(ValueError, 'No frames'):
+                    with libcarna.encoders[format](io.BytesIO()):
+                        pass
+
+    def test__no_frames(self):
+        for format in ('apng', 'h264', 'smallest'):
+            with self.subTest(format=format):
+                buf = io.BytesIO()
+                with self.assertRaisesRegex(ValueError, 'No frames'):
+                    libcarna.encode([], buf, format=format)
+                self.assertEqual(buf.getvalue(), b'')
+
+
+class encoders(testsuite.LibCarnaTestCase):
+
+    def test__builtin(self):
+        for format in ('gif', 'h264', 'vp9', 'webp'):
+            with self.subTest(format=format):
+                encoder_cls = libcarna.encoders[format]
+                for quality in ('low', 'lossless'):
+                    buf = io.BytesIO()
+                    libcarna.encode(testsuite.random_frames(3), buf, format=format, quality=quality)
+                    self.assertGreater(len(buf.getvalue()), 0)
+                    self.assertTrue(issubclass(encoder_cls, libcarna.encoder))
+
+    def test__webp__lossless(self):
+        frames = testsuite.random_frames(3, channels=4)
+        buf = io.BytesIO()
+        libcarna.encode(frames, buf, format='webp', quality='lossless')
+        np.testing.assert_array_equal(_read_image(buf.getvalue()), frames)
+
+    def test__register_encoder(self):
+
+        @libcarna.register_encoder('test')
+        class test_encoder(libcarna.encoder):
+
+            extension = '.bin'
+            mimetype = 'application/octet-stream'
+            html_element = 'img'
+
+            def write(self, frame):
+                self.target.write(frame.tobytes())
+
+            def close(self):
+                pass
+
+        try:
+            frames = testsuite.random_frames(2)
+            buf = io.BytesIO()
+            libcarna.encode(frames, buf, format='test')
+            self.assertEqual(buf.getvalue(), b''.join(frame.tobytes() for frame in frames))
+        finally:
+            del libcarna.encoders['test']
+
+    def test__abstract(self):
+
+        class incomplete_encoder(libcarna.encoder):
+
+            def write(self, frame):
+                pass
+
+        with self.assertRaises(TypeError):
+            incomplete_encoder(io.BytesIO())
+
+
+class select_format(testsuite.LibCarnaTestCase):
+
+    def test__lossless(self):
+        format = libcarna.select_format(testsuite.random_frames(2), quality='lossless')
+        self.assertTrue(libcarna.encoders[format].lossless)
+
+    def test__html_element(self):
+        format = libcarna.select_format(testsuite.random_frames(1), html_element='img')
+        self.assertEqual(libcarna.encoders[format].html_element, 'img')
+
+    def test__quality(self):
+        for quality in ('high', 'lossless'):
+            with self.subTest(quality=quality):
+                format = libcarna.select_format(testsuite.random_frames(2), quality=quality)
+                self.assertFalse(libcarna.encoders[format].palette)
+
+    def test__without_ffmpeg(self):
+        with unittest.mock.patch('libcarna._encoding._ffmpeg_executable', side_effect=FileNotFoundError):
+            format = libcarna.select_format(testsuite.random_frames(1), html_element='img')
+        self.assertEqual(format, 'apng')
+
+    def test__smallest(self):
+        frames = testsuite.random_frames(3)
+        buf = io.BytesIO()
+        format = libcarna.encode(frames, buf, format='smallest')
+        self.assertIn(format, libcarna.encoders)
@@ -0,0 +1,74 @@
+import numpy as np
+
+import libcarna
+from . import testsuite
+
+
+class keyframes(testsuite.LibCarnaTestCase):
+
+    def test__transforms(self):
+        node = libcarna.node()
+        rotation = libcarna.math.rotation((0, 1, 0), radians=np.pi / 2)
+        kf = libcarna.keyframes(node)
+        kf.key(0, position=(0, 0, 0))
+        kf.key(1, position=(10, 0, 0), rotation=rotation, scale=2)
+        transforms = kf.transforms([0, 0.5, 1])
+        self.assertEqual(transforms.shape, (3, 4, 4))
+
+        # Keyframes are reproduced exactly
+        np.testing.assert_allclose(transforms[0], np.eye(4), atol=1e-6)
+        np.testing.assert_allclose(transforms[2][:3, :3], np.asarray(rotation)[:3, :3] * 2, atol=1e-6)
+        np.testing.assert_allclose(transforms[2][:3, 3], (10, 0, 0), atol=1e-6)
+
+        # Rotation is interpolated spherically, position and scale linearly
+        expected = np.asarray(libcarna.math.rotation((0, 1, 0), radians=np.pi / 4))[:3, :3] * 1.5
+        np.testing.assert_allclose(transforms[1][:3, :3], expected, atol=1e-6)
+        np.testing.assert_allclose(transforms[1][:3, 3], (5, 0, 0), atol=1e-6)
+
+    def test__transforms__default(self):
+        node = libcarna.node()
+        node.local_transform = libcarna.math.translation((1, 2, 3))
+        kf = libcarna.keyframes(node).key(0, scale=1).key(1, scale=3)
+        transforms = kf.transforms([0.5])
+        np.testing.assert_allclose(transforms[0][:3, 3], (1, 2, 3), atol=1e-6)
+        np.testing.assert_allclose(transforms[0][:3, :3], np.eye(3) * 2, atol=1e-6)
+
+    def test__transforms__zero_scale(self):
+        rotation = np.asarray(libcarna.math.rotation((0, 1, 0), radians=np.pi / 2))
+        for factors in ((0, 1, 1), (0, 0, 1), (0, 0, 0)):
+            with self.subTest(factors=factors):
+                node = libcarna.node()
+                node.local_transform = rotation @ np.diag(factors + (1,))
+                kf = libcarna.keyframes(node).key(0, scale=factors).key(1, scale=2)
+                transforms = kf.transforms([0, 1])
+                np.testing.assert_allclose(transforms[0], np.asarray(node.local_transform), atol=1e-6)
+
+                # The rotation is completed to a proper rotation, that is exact if at most one axis has zero scale
+                rotation1 = transforms[1][:3, :3] / 2
+                np.testing.assert_allclose(rotation1 @ rotation1.T, np.eye(3), atol=1e-6)
+                self.assertAlmostEqual(np.linalg.det(rotation1), 1, places=6)
+                if sum(factors) >= 2:
+                    np.testing.assert_allclose(rotation1, rotation[:3, :3], atol=1e-6)
+
+    def test__values(self):
+        kf = libcarna.keyframes(lambda value: None)
+        kf.key(0, value=(0, 1)).key(0.5, value=(1, 2), easing='step').key(1, value=(0, 0))
+        values = kf.values([0, 0.25, 0.5, 0.75, 1])
+        np.testing.assert_allclose(values, [(0, 1), (0.5, 1.5), (1, 2), (1, 2), (0, 0)])
+
+    def test__easing(self):
+        kf = libcarna.keyframes(lambda value: None, easing='ease_in_out').key(0, value=0).key(1, value=1)
+        values = kf.values([0, 0.25, 0.5, 0.75, 1])
+        np.testing.assert_allclose(values, [0, 0.15625, 0.5, 0.84375, 1])
+
+    def test__animate(self):
+        node = libcarna.node()
+        values = list()
+        node_kf = libcarna.keyframes(node).key(0, position=(0, 0, 0)).key(1, position=(4, 0, 0))
+        value_kf = libcarna.keyframes(values.append).key(0, value=0).key(1, value=1)
+        animation = libcarna.animate(node_kf, value_kf, n_frames=4)
+        for t in animation.prepare():
+            for step in animation.step_functions:
+                step(t)
+            self.assertAlmostEqual(np.asarray(node.local_transform)[0, 3], 4 * t, places=5)
+        np.testing.assert_allclose(values, [0.25, 0.5, 0.75, 1])
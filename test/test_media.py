@@ -0,0 +1,52 @@
+import tempfile
+import urllib.request
+
+import libcarna
+from . import testsuite
+
+
+class media_cache(testsuite.LibCarnaTestCase):
+
+    def test__encode(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            cache = libcarna.media_cache(tempdir)
+            path1 = cache.encode(testsuite.random_frames(3), format='apng')
+            path2 = cache.encode(testsuite.random_frames(3), format='apng')
+            self.assertEqual(path1, path2)
+            self.assertEqual(path1.suffix, '.png')
+            self.assertEqual(list(cache.directory.iterdir()), [path1])
+            cache.clear()
+            self.assertEqual(list(cache.directory.iterdir()), [])
+
+
+class media_server(testsuite.LibCarnaTestCase):
+
+    def test__range_request(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            cache = libcarna.media_cache(tempdir)
+            path = cache.encode(testsuite.random_frames(3), format='apng')
+            data = path.read_bytes()
+            server = libcarna.media_server(cache)
+            try:
+                url = server.url(path)
+
+                # Full request
+                with urllib.request.urlopen(url) as response:
+                    self.assertEqual(response.status, 200)
+                    self.assertEqual(response.headers['Accept-Ranges'], 'bytes')
+                    self.assertEqual(response.read(), data)
+
+                # Range request
+                request = urllib.request.Request(url, headers={'Range': 'bytes=10-99'})
+                with urllib.request.urlopen(request) as response:
+                    self.assertEqual(response.status, 206)
+                    self.assertEqual(response.headers['Content-Range'], f'bytes 10-99/{len(data)}')
+                    self.assertEqual(response.read(), data[10:100])
+
+                # Suffix range request
+                request = urllib.request.Request(url, headers={'Range': 'bytes=-20'})
+                with urllib.request.urlopen(request) as response:
+                    self.assertEqual(response.read(), data[-20:])
+
+            finally:
+                server.close()
@@ -1,3 +1,6 @@
+import matplotlib as mpl
+import numpy as np
+
 import libcarna
 from . import testsuite
 
@@ -15,3 +18,28 @@ class mip(testsuite.LibCarnaTestCase):
         self.assertEqual(mip2.geometry_type, GEOMETRY_TYPE_VOLUME)
         self.assertEqual(mip2.cmap.colormap.color_list, mip1.cmap.colormap.color_list)
         self.assertEqual(mip2.sample_rate, 400)
+
+    def test__cmap__cached(self):
+        GEOMETRY_TYPE_VOLUME = 1
+        mip1 = libcarna.mip(GEOMETRY_TYPE_VOLUME, cmap='jet')
+        mip1.cmap('viridis', ramp=[0, 0.5])
+        mip2 = libcarna.mip(GEOMETRY_TYPE_VOLUME, cmap='jet')
+        mip2.cmap('viridis', ramp=(0, 0.5))
+        self.assertEqual(mip2.cmap.colormap.color_list, mip1.cmap.colormap.color_list)
+        self.assertEqual(len(mip2.cmap.colormap.color_list), 50)
+
+        # Cached colors must not depend on the ramp of other calls
+        mip2.cmap('viridis')
+        self.assertNotEqual(mip2.cmap.colormap.color_list, mip1.cmap.colormap.color_list)
+
+    def test__cmap__quantization(self):
+        """
+        Test that the sampled colors are quantized exactly like colors created by `libcarna.color`.
+        """
+        mip = libcarna.mip(1, cmap='viridis')
+        expected = [libcarna.color(mpl.colormaps['viridis'](t)) for t in np.linspace(0, 1, 50)]
+        self.assertEqual(mip.cmap.colormap.color_list, expected)
+
+    def test__cmap__unknown(self):
+        with self.assertRaises(ValueError):
+            libcarna.mip(1, cmap='no such colormap')
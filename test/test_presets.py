@@ -97,6 +97,42 @@ class ColorMapMixin:
         self.assertEqual(cmap.color_list[len(cmap.color_list) // 2], libcarna.color.GREEN)
         self.assertEqual(cmap.color_list[-1], libcarna.color.BLUE)
 
+    def test__color_map__write_lut(self):
+        rs = self.create()
+        cmap = rs.color_map
+        for lut in (
+            np.array([[255, 0, 0, 255], [0, 255, 0, 255], [0, 0, 255, 255]], np.uint8),
+            np.array([[1, 0, 0, 1], [0, 1, 0, 1], [0, 0, 1, 1]], np.float32),
+            np.array([[1, 0, 0, 1], [0, 1, 0, 1], [0, 0, 1, 1]], np.float64),
+        ):
+            with self.subTest(dtype=lut.dtype):
+                cmap.write_lut(lut)
+                self.assertEqual(cmap.color_list[0], libcarna.color.RED)
+                self.assertEqual(cmap.color_list[len(cmap.color_list) // 2], libcarna.color.GREEN)
+                self.assertEqual(cmap.color_list[-1], libcarna.color.BLUE)
+
+    def test__color_map__write_lut__invalid(self):
+        rs = self.create()
+        with self.assertRaises(Exception):
+            rs.color_map.write_lut(np.zeros((3, 3), np.uint8))
+
+    def test__color_map__write_lut__integer(self):
+        rs = self.create()
+        for dtype in (np.int32, np.int64, np.uint16, bool):
+            with self.subTest(dtype=dtype):
+                lut = np.array([[255, 0, 0, 255], [0, 0, 255, 255]]).astype(dtype)
+                with self.assertRaises(libcarna.base.AssertionFailure):
+                    rs.color_map.write_lut(lut)
+
+    def test__color_map__to_array(self):
+        rs = self.create()
+        cmap = rs.color_map
+        cmap.write_linear_spline([libcarna.color.RED, libcarna.color.GREEN, libcarna.color.BLUE])
+        lut = cmap.to_array()
+        self.assertEqual(lut.dtype, np.uint8)
+        self.assertEqual(lut.shape, (len(cmap.color_list), 4))
+        np.testing.assert_array_equal(lut, [(color.r, color.g, color.b, color.a) for color in cmap.color_list])
+
     def test__color_map__clear(self):
         rs = self.create()
         cmap = rs.color_map
@@ -0,0 +1,87 @@
+import pickle
+
+import numpy as np
+
+import libcarna
+from . import testsuite
+
+
+def _scene(data):
+    root, camera = testsuite.toy_scene(data)
+    return camera, root, libcarna.animate(libcarna.animate.rotate_local(camera), n_frames=4)
+
+
+def _failing_scene(data):
+    raise ValueError('Invalid scene')
+
+
+class render_pool(testsuite.LibCarnaTestCase):
+
+    def test__render(self):
+        data = libcarna.data.toy()
+        stages = [libcarna.mip(testsuite.GEOMETRY_TYPE_VOLUME, cmap='jet', clim=(0.1, 0.9))]
+
+        # Render the frames in parallel
+        with libcarna.render_pool(200, 150, stages, _scene, volumes=dict(data=data), workers=2) as pool:
+            actual = list(pool.render())
+
+        # Render the frames sequentially
+        r = libcarna.renderer(200, 150, [stage.replicate() for stage in stages])
+        camera, root, animation = _scene(data)
+        expected = list(animation.render(r, camera, root))
+
+        self.assertEqual(len(actual), len(expected))
+        for frame_actual, frame_expected in zip(actual, expected):
+            np.testing.assert_array_equal(frame_actual, frame_expected)
+
+    def test__render__chunks(self):
+        data = libcarna.data.toy()
+        stages = [libcarna.mip(testsuite.GEOMETRY_TYPE_VOLUME, cmap='jet', clim=(0.1, 0.9))]
+        with libcarna.render_pool(200, 150, stages, _scene, volumes=dict(data=data), workers=2) as pool:
+            expected = list(pool.render())
+            for chunk_size, queue_size in ((3, 1), (2, 2), (10, None)):
+                with self.subTest(chunk_size=chunk_size, queue_size=queue_size):
+                    actual = list(pool.render(chunk_size=chunk_size, queue_size=queue_size))
+                    self.assertEqual(len(actual), len(expected))
+                    for frame_actual, frame_expected in zip(actual, expected):
+                        np.testing.assert_array_equal(frame_actual, frame_expected)
+
+    def test__render__scene_error(self):
+        data = libcarna.data.toy()
+        stages = [libcarna.mip(testsuite.GEOMETRY_TYPE_VOLUME)]
+        with libcarna.render_pool(200, 150, stages, _failing_scene, volumes=dict(data=data), workers=2) as pool:
+            with self.assertRaisesRegex(ValueError, 'Invalid scene'):
+                list(pool.render())
+
+
+class pickling(testsuite.LibCarnaTestCase):
+
+    def test__dvr(self):
+        dvr1 = libcarna.dvr(
+            testsuite.GEOMETRY_TYPE_VOLUME, cmap='viridis', clim=(0.2, 0.8), sr=400, transl=1, diffuse=0.5,
+        )
+        dvr1.enabled = False
+        dvr2 = pickle.loads(pickle.dumps(dvr1))
+        self.assertIsInstance(dvr2, libcarna.dvr)
+        self.assertEqual(dvr2.geometry_type, testsuite.GEOMETRY_TYPE_VOLUME)
+        self.assertEqual(dvr2.enabled, False)
+        self.assertAlmostEqual(dvr2.cmap.limits()[0], 0.2)
+        self.assertAlmostEqual(dvr2.cmap.limits()[1], 0.8)
+        self.assertEqual(dvr2.sample_rate, 400)
+        self.assertEqual(dvr2.translucency, 1)
+        self.assertEqual(dvr2.diffuse_light, 0.5)
+        np.testing.assert_allclose(
+            [(c.r, c.g, c.b, c.a) for c in dvr2.cmap.colormap.color_list],
+            [(c.r, c.g, c.b, c.a) for c in dvr1.cmap.colormap.color_list],
+            atol=1,
+        )
+
+    def test__mask_renderer(self):
+        mask_renderer1 = libcarna.mask_renderer(
+            testsuite.GEOMETRY_TYPE_VOLUME, sr=500, color=libcarna.color.RED, fill=True,
+        )
+        mask_renderer2 = pickle.loads(pickle.dumps(mask_renderer1))
+        self.assertIsInstance(mask_renderer2, libcarna.mask_renderer)
+        self.assertEqual(mask_renderer2.sample_rate, 500)
+        self.assertEqual(mask_renderer2.color, libcarna.color.RED)
+        self.assertEqual(mask_renderer2.filling, True)
@@ -0,0 +1,119 @@
+import numpy as np
+
+import libcarna
+from . import testsuite
+
+
+class renderer(testsuite.LibCarnaTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.root, self.camera = testsuite.toy_scene()
+        self.stages = [libcarna.mip(testsuite.GEOMETRY_TYPE_VOLUME, cmap='jet')]
+
+    def test__resize(self):
+        r = libcarna.renderer(200, 150, self.stages, max_surfaces=2)
+        expected = libcarna.renderer(120, 90, [stage.replicate() for stage in self.stages]).render(self.camera)
+        self.assertEqual(r.render(self.camera).shape, (150, 200, 3))
+        r.resize(120, 90)
+        self.assertEqual((r.width, r.height), (120, 90))
+        np.testing.assert_array_equal(r.render(self.camera), expected)
+        r.resize(200, 150)
+        self.assertEqual(r.render(self.camera).shape, (150, 200, 3))
+
+    def test__render__size(self):
+        r = libcarna.renderer(200, 150, self.stages, max_surfaces=2)
+        for size in ((200, 150), (120, 90), (60, 45), (200, 150)):
+            with self.subTest(size=size):
+                self.assertEqual(r.render(self.camera, size=size).shape, (size[1], size[0], 3))
+                self.assertLessEqual(len(r._surfaces), 2)
+        self.assertEqual((r.width, r.height), (200, 150))
+
+    def test__cache(self):
+        cache = libcarna.frame_cache()
+        r = libcarna.renderer(200, 150, self.stages, cache=cache)
+        frame1 = r.render(self.camera)
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (0, 1, 1))
+
+        # Render the same frame again (cache hit)
+        np.testing.assert_array_equal(r.render(self.camera), frame1)
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (1, 1, 1))
+        self.assertEqual(cache.hit_rate, 0.5)
+
+        # Change the camera (cache miss)
+        self.camera.rotate('y', 10)
+        r.render(self.camera)
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (1, 2, 2))
+
+        # Change a stage parameter (cache miss)
+        self.stages[0].cmap.limits(0.2, 0.8)
+        r.render(self.camera)
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (1, 3, 3))
+
+    def test__frame_key__replaced_feature(self):
+        """
+        Test that a feature, that is created after another feature was deleted (possibly at the same address), is not
+        mistaken for the deleted feature.
+        """
+        r = libcarna.renderer(200, 150, self.stages)
+        geometry = libcarna.geometry(testsuite.GEOMETRY_TYPE_VOLUME + 1, parent=self.root)
+        keys = list()
+        for _ in range(2):
+            mesh = libcarna.meshes.create_box(1, 1, 1)
+            geometry.put_feature(0, mesh)
+            keys.append(r.frame_key(self.camera))
+            self.assertEqual(r.frame_key(self.camera), keys[-1])
+            geometry.remove_feature(0)
+            del mesh
+        self.assertNotEqual(keys[0], keys[1])
+
+    def test__cache__eviction(self):
+        cache = libcarna.frame_cache(max_bytes=2 * 200 * 150 * 3)
+        r = libcarna.renderer(200, 150, self.stages, cache=cache)
+        for _ in range(3):
+            self.camera.rotate('y', 10)
+            r.render(self.camera)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.evictions, 1)
+        self.assertEqual(cache.nbytes, 2 * 200 * 150 * 3)
+
+    def test__supersampling(self):
+        r = libcarna.renderer(200, 150, self.stages, ss=2)
+        self.assertEqual(r.supersampling, 2)
+        self.assertEqual(r.render(self.camera).shape, (150, 200, 3))
+        self.assertEqual(r.render(self.camera, size=(60, 45)).shape, (45, 60, 3))
+
+    def test__supersampling__invalid(self):
+        with self.assertRaises(AssertionError):
+            libcarna.renderer(200, 150, self.stages, ss=3)
+
+    def test__timing(self):
+        r = libcarna.renderer(200, 150, self.stages, timing=True)
+        self.assertIsNone(r.last_frame_stats)
+        for _ in range(3):
+            r.render(self.camera)
+        stats = r.last_frame_stats
+        self.assertEqual(len(stats.stages), 1)
+        self.assertGreater(stats.stages[0], 0)
+        self.assertGreaterEqual(stats.readback, 0)
+        self.assertAlmostEqual(stats.total, stats.render + stats.readback)
+        self.assertEqual(len(r.timing_stats), 3)
+        self.assertGreaterEqual(r.timing_stats.max().stages[0], r.timing_stats.mean().stages[0])
+        self.assertFalse(self.stages[0].timing)  # only enabled while rendering
+
+    def test__timing__disabled(self):
+        r = libcarna.renderer(200, 150, self.stages)
+        r.render(self.camera)
+        self.assertFalse(self.stages[0].timing)
+        self.assertIsNone(r.last_frame_stats)
+        self.assertEqual(len(r.timing_stats), 0)
+
+    def test__warmup(self):
+        r = libcarna.renderer(200, 150, self.stages, timing=True)
+        children = self.root.children()
+        r.warmup(self.root, self.camera)
+        r.warmup(self.root)
+        self.assertEqual(self.root.children(), children)
+        self.assertEqual(len(r.timing_stats), 0)
+        expected = libcarna.renderer(200, 150, [stage.replicate() for stage in self.stages]).render(self.camera)
+        np.testing.assert_array_equal(r.render(self.camera), expected)
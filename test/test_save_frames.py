@@ -0,0 +1,47 @@
+import pathlib
+import tempfile
+
+import numpy as np
+from PIL import Image
+
+import libcarna
+from . import testsuite
+
+
+class save_frames(testsuite.LibCarnaTestCase):
+
+    def test__images(self):
+        frames = testsuite.random_frames(5)
+        for extension in ('png', 'webp'):
+            with self.subTest(extension=extension), tempfile.TemporaryDirectory() as tempdir:
+                pattern = str(pathlib.Path(tempdir) / 'frames' / f'{{:03d}}.{extension}')
+                self.assertEqual(libcarna.save_frames(iter(frames), pattern, workers=2), 5)
+                for frame_idx, frame in enumerate(frames):
+                    with Image.open(pattern.format(frame_idx)) as im:
+                        np.testing.assert_array_equal(np.array(im.convert('RGB')), frame)
+
+    def test__npy(self):
+        frames = testsuite.random_frames(5)
+        for n_frames in (None, 5):
+            with self.subTest(n_frames=n_frames), tempfile.TemporaryDirectory() as tempdir:
+                path = pathlib.Path(tempdir) / 'frames.npy'
+                self.assertEqual(libcarna.save_frames(iter(frames), path, n_frames=n_frames), 5)
+                np.testing.assert_array_equal(np.load(path, mmap_mode='r'), frames)
+
+    def test__npy__array(self):
+        frames = np.array(testsuite.random_frames(3))
+        with tempfile.TemporaryDirectory() as tempdir:
+            path = pathlib.Path(tempdir) / 'frames.npy'
+            libcarna.save_frames(frames, path)
+            np.testing.assert_array_equal(np.load(path), frames)
+
+    def test__npy__invalid(self):
+        frames = testsuite.random_frames(3)
+        for n_frames in (None, 2, 3, 4):
+            with self.subTest(n_frames=n_frames), tempfile.TemporaryDirectory() as tempdir:
+                path = pathlib.Path(tempdir) / 'frames.npy'
+                if n_frames is not None and n_frames != len(frames):
+                    with self.assertRaisesRegex(ValueError, f'Expected {n_frames} frames'):
+                        libcarna.save_frames(iter(frames), path, n_frames=n_frames)
+                with self.assertRaisesRegex(ValueError, 'Frame shape'):
+                    libcarna.save_frames(iter([frames[0], frames[1][:, :, :1]]), path, n_frames=n_frames)
@@ -0,0 +1,48 @@
+import os
+import pathlib
+import tempfile
+import unittest.mock
+
+import libcarna
+from . import testsuite
+
+
+class driver_shader_cache(testsuite.LibCarnaTestCase):
+
+    def test(self):
+        with tempfile.TemporaryDirectory() as tempdir, unittest.mock.patch.dict(os.environ, clear=True):
+            path = pathlib.Path(tempdir) / 'shaders'
+            config = libcarna.driver_shader_cache(str(path), max_size='64M')
+            self.assertTrue(path.is_dir())
+            for key in ('MESA_SHADER_CACHE_DIR', 'MESA_GLSL_CACHE_DIR', '__GL_SHADER_DISK_CACHE_PATH'):
+                with self.subTest(key=key):
+                    self.assertEqual(os.environ[key], str(path))
+                    self.assertEqual(config[key], str(path))
+            self.assertEqual(os.environ['MESA_SHADER_CACHE_MAX_SIZE'], '64M')
+            self.assertEqual(os.environ['MESA_SHADER_CACHE_DISABLE'], 'false')
+            self.assertEqual(os.environ['__GL_SHADER_DISK_CACHE'], '1')
+            self.assertNotIn('__GL_SHADER_DISK_CACHE_SKIP_CLEANUP', os.environ)
+
+    def test__user_environ(self):
+        with tempfile.TemporaryDirectory() as tempdir, unittest.mock.patch.dict(os.environ, clear=True):
+            os.environ['MESA_SHADER_CACHE_DIR'] = '/user/mesa'
+            os.environ['MESA_SHADER_CACHE_MAX_SIZE'] = '2G'
+            os.environ['__GL_SHADER_DISK_CACHE'] = '0'
+            path = pathlib.Path(tempdir) / 'shaders'
+            config = libcarna.driver_shader_cache(str(path), max_size='64M')
+            self.assertEqual(os.environ['MESA_SHADER_CACHE_DIR'], '/user/mesa')
+            self.assertEqual(os.environ['MESA_SHADER_CACHE_MAX_SIZE'], '2G')
+            self.assertEqual(os.environ['__GL_SHADER_DISK_CACHE'], '0')
+            self.assertEqual(config['MESA_SHADER_CACHE_DIR'], '/user/mesa')
+
+            # Variables not set by the user are still set
+            self.assertEqual(os.environ['MESA_GLSL_CACHE_DIR'], str(path))
+            self.assertEqual(os.environ['__GL_SHADER_DISK_CACHE_PATH'], str(path))
+
+    def test__from_environ(self):
+        with tempfile.TemporaryDirectory() as tempdir, unittest.mock.patch.dict(os.environ, clear=True):
+            path = pathlib.Path(tempdir) / 'shaders'
+            os.environ['LIBCARNA_PYTHON_SHADER_CACHE'] = str(path)
+            libcarna._shader_cache._shader_cache_from_environ()
+            self.assertTrue(path.is_dir())
+            self.assertEqual(os.environ['MESA_SHADER_CACHE_DIR'], str(path))
@@ -31,6 +31,31 @@ class node(testsuite.LibCarnaTestCase):
             np.linalg.inv(self.node2.world_transform) @ self.node1.world_transform,
         )
 
+    def test__type(self):
+        """
+        Test that the spatial factories share their classes across calls.
+        """
+        self.assertIs(type(self.node1), type(self.node2))
+        self.assertIs(type(libcarna.camera()), type(libcarna.camera()))
+        self.assertIs(type(libcarna.geometry(1)), type(libcarna.geometry(1)))
+
+    def test__attributes(self):
+        """
+        Test that arbitrary attributes can be set on the objects created by the spatial factories.
+        """
+        for factory in (libcarna.node, libcarna.camera, lambda **kwargs: libcarna.geometry(1, **kwargs)):
+            spatial = factory(foo=1)
+            with self.subTest(spatial=type(spatial)):
+                self.assertEqual(spatial.foo, 1)
+                spatial.bar = 2
+                self.assertEqual(spatial.bar, 2)
+
+    def test__camera__update_projection(self):
+        camera = libcarna.camera()
+        self.assertFalse(hasattr(camera, 'update_projection'))
+        camera.frustum(fov=90, z_near=1, z_far=100)
+        camera.update_projection(200, 100)
+
 
 class volume(testsuite.LibCarnaTestCase):
 
@@ -54,6 +79,10 @@ class volume(testsuite.LibCarnaTestCase):
             (32., 24., 5.,),
         )
 
+    def test__attributes(self):
+        self.volume.meta = dict(modality='CT')
+        self.assertEqual(self.volume.meta, dict(modality='CT'))
+
     def test__extent(self):
         np.testing.assert_array_almost_equal(
             self.volume.extent,
@@ -201,3 +230,59 @@ class volume(testsuite.LibCarnaTestCase):
         np.testing.assert_array_almost_equal(
             volume.raw([0, 0.5, 1]), [-3, -3, -3],
         )
+
+
+class geometries(testsuite.LibCarnaTestCase):
+
+    GEOMETRY_TYPE_OPAQUE = 2
+
+    def setUp(self):
+        super().setUp()
+        self.root = libcarna.node()
+        self.transforms = np.tile(np.eye(4, dtype=np.float32), (3, 1, 1))
+        self.transforms[:, :3, 3] = [(1, 2, 3), (4, 5, 6), (7, 8, 9)]
+        self.mesh = libcarna.meshes.create_box(1, 1, 1)
+        self.material = libcarna.material('solid', color=libcarna.color.RED)
+
+    def test(self):
+        batch = libcarna.geometries(
+            self.GEOMETRY_TYPE_OPAQUE,
+            self.transforms,
+            'markers',
+            parent=self.root,
+            mesh=self.mesh,
+            material=self.material,
+        )
+        self.assertEqual(len(batch), 3)
+        self.assertEqual(batch.children(), 3)
+        self.assertEqual(batch.tag, 'markers')
+        self.assertEqual(batch.geometry_type, self.GEOMETRY_TYPE_OPAQUE)
+        self.assertTrue(batch.has_parent)
+        np.testing.assert_array_equal(batch.local_transforms, self.transforms)
+
+    def test__local_transforms(self):
+        batch = libcarna.geometries(self.GEOMETRY_TYPE_OPAQUE, self.transforms, parent=self.root)
+        self.transforms[:, :3, 3] += 1
+        batch.local_transforms = self.transforms
+        np.testing.assert_array_equal(batch.local_transforms, self.transforms)
+        with self.assertRaises(Exception):
+            batch.local_transforms = self.transforms[:2]
+
+    def test__invalid_transforms(self):
+        with self.assertRaises(AssertionError):
+            libcarna.geometries(self.GEOMETRY_TYPE_OPAQUE, np.zeros((3, 3, 3)))
+
+    def test__children(self):
+        batch = libcarna.geometries(self.GEOMETRY_TYPE_OPAQUE, self.transforms, parent=self.root)
+
+        # Other children cannot be attached to the batch, so the geometries of the batch are its only children
+        geometry = libcarna.geometry(self.GEOMETRY_TYPE_OPAQUE)
+        with self.assertRaises(libcarna.base.AssertionFailure):
+            batch.attach_child(geometry)
+        self.assertFalse(geometry.has_parent)
+        self.assertEqual(batch.children(), 3)
+
+        # Detaching the batch keeps its geometries
+        batch.detach_from_parent()
+        del self.root
+        np.testing.assert_array_equal(batch.local_transforms, self.transforms)
@@ -0,0 +1,49 @@
+import json
+import os
+import pathlib
+import tempfile
+import unittest.mock
+
+import libcarna
+from . import testsuite
+
+
+class trace(testsuite.LibCarnaTestCase):
+
+    def test(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            path = pathlib.Path(tempdir) / 'trace.json'
+            with libcarna.trace(str(path)):
+                root, camera = testsuite.toy_scene()
+                r = libcarna.renderer(80, 60, [libcarna.mip(testsuite.GEOMETRY_TYPE_VOLUME)])
+                list(libcarna.animate(libcarna.animate.rotate_local(camera), n_frames=2).render(r, camera))
+            with open(path) as fp:
+                events = json.load(fp)['traceEvents']
+        names = [event['name'] for event in events]
+        for name in (
+            'volume.validate',
+            'volume.normalize',
+            'volume.load',
+            'volume.create_node',
+            'renderer.projection',
+            'renderer.render',
+            'renderer.readback',
+            'animate.step',
+        ):
+            with self.subTest(name=name):
+                self.assertIn(name, names)
+        self.assertEqual(names.count('animate.step'), 2)
+        for event in events:
+            self.assertEqual(event['ph'], 'X')
+            self.assertGreaterEqual(event['dur'], 0)
+
+    def test__path(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            with libcarna.trace(str(pathlib.Path(tempdir) / 'trace-{pid}-{name}.json')):
+                pass
+            self.assertTrue((pathlib.Path(tempdir) / f'trace-{os.getpid()}-{{name}}.json').is_file())
+
+    def test__disabled(self):
+        with unittest.mock.patch('libcarna._trace._events', None):  # tracing may be enabled by the environment
+            with libcarna.span('test') as span1, libcarna.span('test') as span2:
+                self.assertIs(span1, span2)
@@ -14,6 +14,11 @@ from apng import APNG
 from numpngw import write_apng
 from PIL import Image
 
+import libcarna
+
+
+GEOMETRY_TYPE_VOLUME = 2
+
 
 def _imread(path: str) -> np.ndarray:
     """
@@ -51,6 +56,28 @@ def _imsave(path: str, array: np.ndarray):
         plt.imsave(path, array)
 
 
+def toy_scene(data: np.ndarray | None = None) -> tuple[libcarna.base.Node, libcarna.base.Camera]:
+    """
+    Create a scene with a volume (the toy data, by default) and a camera, that looks at the volume from `z=100`.
+
+    Returns:
+        The root node of the scene and the camera.
+    """
+    root = libcarna.node()
+    data = libcarna.data.toy() if data is None else data
+    libcarna.volume(GEOMETRY_TYPE_VOLUME, data, parent=root, spacing=(1, 1, 2))
+    camera = libcarna.camera(parent=root).frustum(fov=90, z_near=1, z_far=500).translate(z=100)
+    return root, camera
+
+
+def random_frames(n_frames: int, channels: int = 3) -> list[np.ndarray]:
+    """
+    Create a reproducible sequence of random 30x40 frames (e.g., for testing encoders).
+    """
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 256, size=(30, 40, channels), dtype=np.uint8) for _ in range(n_frames)]
+
+
 class LibCarnaTestCase(unittest.TestCase):
 
     pass